@@ -0,0 +1,33 @@
+"""Cascade deletes for questions and answer options
+
+Revision ID: 5b0e2c9d7f31
+Revises: a49468686ff3
+Create Date: 2026-10-18 10:12:41.318520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e2c9d7f31'
+down_revision: Union[str, None] = 'a49468686ff3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # constraints were created without a name, so they have the default PostgreSQL name
+    op.drop_constraint('questions_quiz_id_fkey', 'questions', type_='foreignkey')
+    op.create_foreign_key('questions_quiz_id_fkey', 'questions', 'quizzes', ['quiz_id'], ['id'], ondelete='CASCADE')
+    op.drop_constraint('answer_options_question_id_fkey', 'answer_options', type_='foreignkey')
+    op.create_foreign_key('answer_options_question_id_fkey', 'answer_options', 'questions', ['question_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    op.drop_constraint('answer_options_question_id_fkey', 'answer_options', type_='foreignkey')
+    op.create_foreign_key('answer_options_question_id_fkey', 'answer_options', 'questions', ['question_id'], ['id'])
+    op.drop_constraint('questions_quiz_id_fkey', 'questions', type_='foreignkey')
+    op.create_foreign_key('questions_quiz_id_fkey', 'questions', 'quizzes', ['quiz_id'], ['id'])
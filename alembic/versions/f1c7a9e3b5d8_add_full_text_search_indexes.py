@@ -0,0 +1,93 @@
+"""Add full-text search indexes of quizzes and questions
+
+Revision ID: f1c7a9e3b5d8
+Revises: b83d6f2e1a54
+Create Date: 2026-10-18 20:14:36.502813
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7a9e3b5d8'
+down_revision: Union[str, None] = 'b83d6f2e1a54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# copy of the DDL in app.models.search at this revision (later changes to the
+# indexes need their own migration)
+POSTGRESQL_DDL = [
+    "ALTER TABLE quizzes ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (setweight(to_tsvector('english', title), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+    'CREATE INDEX IF NOT EXISTS ix_quizzes_search_vector '
+    'ON quizzes USING GIN (search_vector)',
+    "ALTER TABLE questions ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', content)) STORED",
+    'CREATE INDEX IF NOT EXISTS ix_questions_search_vector '
+    'ON questions USING GIN (search_vector)',
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS quizzes_fts USING fts5(title, description, "
+    "content='quizzes', content_rowid='id', tokenize='porter unicode61')",
+    'CREATE TRIGGER IF NOT EXISTS quizzes_fts_insert AFTER INSERT ON quizzes BEGIN '
+    'INSERT INTO quizzes_fts (rowid, title, description) '
+    'VALUES (new.id, new.title, new.description); END',
+    "CREATE TRIGGER IF NOT EXISTS quizzes_fts_delete AFTER DELETE ON quizzes BEGIN "
+    "INSERT INTO quizzes_fts (quizzes_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS quizzes_fts_update "
+    "AFTER UPDATE OF title, description ON quizzes BEGIN "
+    "INSERT INTO quizzes_fts (quizzes_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO quizzes_fts (rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(content, "
+    "quiz_id UNINDEXED, content='questions', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    'CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON questions '
+    'BEGIN INSERT INTO questions_fts (rowid, content, quiz_id) '
+    'VALUES (new.id, new.content, new.quiz_id); END',
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_delete AFTER DELETE ON questions "
+    "BEGIN INSERT INTO questions_fts (questions_fts, rowid, content, quiz_id) "
+    "VALUES ('delete', old.id, old.content, old.quiz_id); END",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_update "
+    "AFTER UPDATE OF content, quiz_id ON questions BEGIN "
+    "INSERT INTO questions_fts (questions_fts, rowid, content, quiz_id) "
+    "VALUES ('delete', old.id, old.content, old.quiz_id); "
+    "INSERT INTO questions_fts (rowid, content, quiz_id) "
+    "VALUES (new.id, new.content, new.quiz_id); END",
+]
+
+
+def upgrade() -> None:
+    # not supported by autogenerate (generated tsvector columns and FTS5 tables)
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # the generated columns are computed for the existing rows
+        for statement in POSTGRESQL_DDL:
+            op.execute(statement)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        # index the existing rows
+        op.execute("INSERT INTO quizzes_fts (quizzes_fts) VALUES ('rebuild')")
+        op.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_questions_search_vector', table_name='questions')
+        op.drop_column('questions', 'search_vector')
+        op.drop_index('ix_quizzes_search_vector', table_name='quizzes')
+        op.drop_column('quizzes', 'search_vector')
+    elif dialect == 'sqlite':
+        for table in ('quizzes', 'questions'):
+            for event in ('insert', 'delete', 'update'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{event}')
+        op.execute('DROP TABLE IF EXISTS quizzes_fts')
+        op.execute('DROP TABLE IF EXISTS questions_fts')
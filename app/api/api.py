@@ -1,8 +1,11 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import login, question, quiz
+from app.api.endpoints import attempt, login, metrics, question, quiz
 
 api_router = APIRouter()
 api_router.include_router(quiz.router)
 api_router.include_router(question.router)
+api_router.include_router(attempt.router)
+api_router.include_router(attempt.user_router)
 api_router.include_router(login.router)
+api_router.include_router(metrics.router)
@@ -1,26 +1,50 @@
+from time import time
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 import app.models as models
-from app.core.security import decode_token
+import app.schemas as schemas
+from app.core.security import decode_token, principal_cache, token_cache
 from app.core.settings import Settings, get_settings
 from app.models.database import AsyncSessionDep
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/tokens")
 
 
-async def get_current_user(
-    db: AsyncSessionDep,
+async def get_current_user_id(
     token: Annotated[str, Depends(oauth2_scheme)],
     settings: Annotated[Settings, Depends(get_settings)],
-) -> models.User:
-    token_data = decode_token(token=token, settings=settings)
-    user = await models.User.get(db=db, id=int(token_data.sub))
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
+) -> int:
+    """
+    Get the id of the authenticated user from the access token, without checking
+    the user in the database (enough to filter queries by owner).
+    """
+    user_id = token_cache.get(token)
+    if user_id is None:
+        token_data = decode_token(token=token, settings=settings)
+        user_id = int(token_data.sub)
+        # never keep a token in the cache after it has expired
+        ttl = token_data.exp - time() if token_data.exp else None
+        token_cache.set(token, user_id, ttl_sec=ttl)
+
+    return user_id
+
+
+async def get_current_user(
+    db: AsyncSessionDep,
+    user_id: Annotated[int, Depends(get_current_user_id)],
+) -> schemas.UserReturn:
+    user = principal_cache.get(user_id)
+    if user is None:
+        db_user = await models.User.get(db=db, id=user_id)
+        if not db_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+
+        user = schemas.UserReturn.model_validate(db_user)
+        principal_cache.set(user_id, user)
 
     return user
@@ -0,0 +1,165 @@
+from dataclasses import asdict
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+import app.models as models
+import app.schemas as schemas
+from app.api.dependencies import get_current_user_id
+from app.core.leaderboard import LeaderboardEntry, LeaderboardsDep
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.percentiles import ScoreHistogramsDep
+from app.core.scoring import InvalidAnswersError, get_answer_key
+from app.core.settings import get_settings
+from app.models.attempt_writer import AttemptWriterDep
+from app.models.database import AsyncReadSessionDep, SessionFactoryDep
+
+router = APIRouter(prefix="/quizzes", tags=["attempt"])
+user_router = APIRouter(prefix="/users", tags=["attempt"])
+settings = get_settings()
+
+
+@router.post(
+    "/{quiz_id}/answers",
+    response_model=schemas.QuizAttemptResult,
+    status_code=status.HTTP_201_CREATED,
+    summary="Submit answers to a quiz",
+    response_description="The scored attempt, with the percentage of lower scores",
+)
+async def submit_answers(
+    quiz_id: int,
+    attempt: schemas.QuizAttemptCreate,
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    session_factory: SessionFactoryDep,
+    writer: AttemptWriterDep,
+    leaderboards: LeaderboardsDep,
+    histograms: ScoreHistogramsDep,
+) -> Any:
+    """
+    The answers are validated and scored right away, and the attempt is written
+    together with other attempts submitted at the same time. The response is only
+    sent once the attempt has been committed.
+
+    The percentile is computed from a histogram of the scores kept in memory, which
+    is exact with the default SCORE_BUCKET_WIDTH=1 (attempts submitted to other
+    processes may take up to SCORE_HISTOGRAM_TTL_SEC seconds to be included).
+    """
+    # the session is closed before waiting for the attempt to be written, so its
+    # connection is not kept while the writer needs one from the same pool
+    async with session_factory() as db:
+        # the answer key is only read from the database when the quiz changed
+        answer_key = await get_answer_key(db=db, quiz_id=quiz_id)
+    if answer_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found"
+        )
+    try:
+        score = answer_key.score(attempt.answers)
+    except InvalidAnswersError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        ) from e
+
+    scored = schemas.QuizAttemptScored(
+        quiz_id=quiz_id, user_id=user_id, score=score, answers=attempt.answers
+    )
+    attempt_id, attempted_at = await writer.submit(scored)
+    leaderboards.record(
+        quiz_id,
+        LeaderboardEntry(
+            attempt_id=attempt_id,
+            user_id=user_id,
+            score=score,
+            attempted_at=attempted_at,
+        ),
+    )
+    histograms.record(quiz_id, score)
+
+    return {
+        "id": attempt_id,
+        "quiz_id": quiz_id,
+        "user_id": user_id,
+        "score": score,
+        "attempted_at": attempted_at,
+        "percentile": await histograms.percentile(quiz_id, score),
+    }
+
+
+@router.get(
+    "/{quiz_id}/leaderboard",
+    response_model=list[schemas.LeaderboardEntryReturn],
+    status_code=status.HTTP_200_OK,
+    summary="Get the best attempts of a quiz",
+    response_description="The best attempts, from best to worst",
+)
+async def get_leaderboard(
+    quiz_id: int,
+    leaderboards: LeaderboardsDep,
+    limit: Annotated[int, Query(ge=1, le=settings.LEADERBOARD_SIZE)] = 10,
+) -> Any:
+    """
+    Attempts are ranked by score, and the oldest attempt goes first on ties.
+    The leaderboard is served from memory, attempts submitted to other processes
+    may take up to LEADERBOARD_TTL_SEC seconds to show up.
+    """
+    entries = await leaderboards.top(quiz_id, limit)
+    if entries is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found"
+        )
+
+    return [
+        {"rank": rank, **asdict(entry)} for rank, entry in enumerate(entries, start=1)
+    ]
+
+
+@user_router.get(
+    "/{user_id}/quizzes/attempts",
+    response_model=list[schemas.QuizAttemptHistory],
+    status_code=status.HTTP_200_OK,
+    summary="Get the quiz attempts of a user",
+    response_description="The attempts of the user, from newest to oldest",
+)
+async def get_user_attempts(
+    user_id: int,
+    current_user_id: Annotated[int, Depends(get_current_user_id)],
+    db: AsyncReadSessionDep,
+    response: Response,
+    limit: Annotated[int, Query(ge=1, le=100)] = 25,
+    cursor: Annotated[str | None, Query()] = None,
+    include_quiz_title: bool = False,
+) -> Any:
+    """
+    Users can only get their own attempts. Pages are requested with the cursor
+    returned in the X-Next-Cursor header of the previous page, and quiz titles are
+    only included if include_quiz_title is true.
+    """
+    if user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Attempts do not belong to current user",
+        )
+
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from exc
+
+    attempts = await models.QuizAttempt.get_by_user(
+        db=db,
+        user_id=user_id,
+        limit=limit,
+        after=after,
+        with_quiz_title=include_quiz_title,
+    )
+    if len(attempts) == limit:
+        last = attempts[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            last["attempted_at"], last["id"]
+        )
+
+    return attempts
@@ -5,7 +5,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 
 import app.models as models
 import app.schemas as schemas
-from app.core.security import create_access_token, verify_password
+from app.core.security import create_access_token, verify_password_async
 from app.models.database import AsyncSessionDep
 
 router = APIRouter(prefix="", tags=["login"])
@@ -31,7 +31,7 @@ async def get_access_token_from_username(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect username or password",
         )
-    if not verify_password(
+    if not await verify_password_async(
         plain_password=form_data.password, hashed_password=user.password_hash
     ):
         raise HTTPException(
@@ -0,0 +1,40 @@
+from typing import Any
+
+from fastapi import APIRouter, status
+
+from app.core.leaderboard import leaderboards
+from app.core.percentiles import score_histograms
+from app.core.response_cache import response_cache
+from app.core.scoring import answer_key_cache
+from app.core.security import hashing_pool, principal_cache, token_cache
+from app.models.attempt_writer import attempt_writer
+from app.models.database import async_engine
+from app.models.pool import get_pool_metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    summary="Get internal runtime metrics",
+    response_description="Metrics of the worker pools and caches of this process",
+)
+async def get_metrics() -> Any:
+    """
+    Metrics are process-local, so each worker process reports its own values.
+    """
+    return {
+        "hashing_pool": hashing_pool.stats.as_dict(),
+        "token_cache": token_cache.as_dict(),
+        "principal_cache": principal_cache.as_dict(),
+        "answer_key_cache": answer_key_cache.as_dict(),
+        "leaderboards": leaderboards.as_dict(),
+        "score_histograms": score_histograms.as_dict(),
+        "response_cache": response_cache.as_dict(),
+        "db_pool": get_pool_metrics(async_engine.pool),
+        "attempt_writer": {
+            "pending": attempt_writer.pending,
+            **attempt_writer.stats.as_dict(),
+        },
+    }
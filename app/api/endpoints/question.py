@@ -1,35 +1,36 @@
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from pydantic import TypeAdapter
 from sqlalchemy.exc import IntegrityError
 
 import app.models as models
 import app.schemas as schemas
-from app.api.dependencies import get_current_user
-from app.models.database import AsyncSessionDep
+from app.api.dependencies import get_current_user_id
+from app.core.etag import etag_matches, not_modified, weak_etag
+from app.core.response_cache import CachedResponse, response_cache, to_json
+from app.models.database import AsyncSessionDep, ReadSessionFactoryDep
 
 router = APIRouter(prefix="/questions", tags=["question"])
 
+question_adapter = TypeAdapter(schemas.QuestionReturn)
+answer_options_adapter = TypeAdapter(list[schemas.AnswerOptionReturn])
 
-async def get_question_from_id(
-    question_id: int, db: AsyncSessionDep
+
+async def get_question_check_user(
+    question_id: int,
+    user_id: Annotated[int, Depends(get_current_user_id)],
+    db: AsyncSessionDep,
 ) -> models.Question:
-    question = await models.Question.get(db=db, id=question_id)
-    if not question:
+    # question and quiz owner in a single query
+    result = await models.Question.get_with_quiz_owner(db=db, id=question_id)
+    if not result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Question not found"
         )
 
-    return question
-
-
-async def get_question_check_user(
-    question: Annotated[models.Question, Depends(get_question_from_id)],
-    user: Annotated[models.User, Depends(get_current_user)],
-    db: AsyncSessionDep,
-) -> models.Question:
-    quiz_author_id = await models.Quiz.get_quiz_created_by(db=db, id=question.quiz_id)
-    if quiz_author_id != user.id:
+    question, quiz_author_id = result
+    if quiz_author_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Quiz does not belong to current user",
@@ -46,9 +47,40 @@ async def get_question_check_user(
     response_description="The requested question (if it exists)",
 )
 async def get_question(
-    question: Annotated[models.Question, Depends(get_question_from_id)]
+    question_id: int,
+    session_factory: ReadSessionFactoryDep,
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> Any:
-    return question
+    """
+    The response has a weak ETag, and 304 Not Modified is returned (without loading
+    the question) if it is given in the If-None-Match header and the question did
+    not change.
+    """
+    key = ("question", question_id)
+    if cached := response_cache.get(key):
+        return cached.to_response(if_none_match)
+
+    generation = response_cache.generation
+    async with session_factory() as db:
+        if if_none_match:
+            updated_at = await models.Question.get_updated_at(db=db, id=question_id)
+            etag = weak_etag(question_id, updated_at)
+            if updated_at is not None and etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+        question = await models.Question.get(db=db, id=question_id)
+    if not question:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Question not found"
+        )
+
+    etag = weak_etag(question.id, question.updated_at)
+    response = CachedResponse(to_json(question_adapter, question), {"ETag": etag})
+    # questions are deleted with their quiz
+    tags = [("question", question_id), ("quiz", question.quiz_id)]
+    return response_cache.set(
+        key, response, tags=tags, generation=generation
+    ).to_response()
 
 
 @router.put(
@@ -116,12 +148,22 @@ async def add_answer_option(
 )
 async def get_question_answer_options(
     question_id: int,
-    db: AsyncSessionDep,
+    session_factory: ReadSessionFactoryDep,
 ) -> Any:
-    question = await models.Question.get_with_answers(db=db, id=question_id)
+    key = ("question_options", question_id)
+    if cached := response_cache.get(key):
+        return cached.to_response()
+
+    generation = response_cache.generation
+    async with session_factory() as db:
+        question = await models.Question.get_with_answers(db=db, id=question_id)
     if not question:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Question not found"
         )
 
-    return question.answer_options
+    response = CachedResponse(to_json(answer_options_adapter, question.answer_options))
+    tags = [("question", question_id), ("quiz", question.quiz_id)]
+    return response_cache.set(
+        key, response, tags=tags, generation=generation
+    ).to_response()
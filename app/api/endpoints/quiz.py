@@ -1,29 +1,51 @@
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.exc import IntegrityError
 
 import app.models as models
 import app.schemas as schemas
-from app.api.dependencies import get_current_user
-from app.models.database import AsyncSessionDep
+from app.api.dependencies import get_current_user, get_current_user_id
+from app.core.etag import etag_matches, not_modified, weak_etag
+from app.core.export import export_quizzes_ndjson
+from app.core.importer import (
+    ImportFormat,
+    ImportValidationError,
+    guess_format,
+    import_quizzes,
+)
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.response_cache import CachedResponse, response_cache, to_json
+from app.models.database import (
+    AsyncReadSessionDep,
+    AsyncSessionDep,
+    ReadSessionFactoryDep,
+)
 
 router = APIRouter(prefix="/quizzes", tags=["quiz"])
 
+MAX_BATCH_QUESTIONS = 1000
 
-async def get_quiz_from_id(quiz_id: int, db: AsyncSessionDep) -> models.Quiz:
-    quiz = await models.Quiz.get(db=db, id=quiz_id)
-    if not quiz:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found"
-        )
-
-    return quiz
+quiz_adapter = TypeAdapter(schemas.QuizReturn)
+quizzes_adapter = TypeAdapter(list[schemas.QuizReturn])
+questions_adapter = TypeAdapter(list[schemas.QuestionReturn])
+quiz_full_adapter = TypeAdapter(schemas.QuizFull)
 
 
 async def get_quiz_check_user(
     quiz_id: int,
-    user: Annotated[models.User, Depends(get_current_user)],
+    user_id: Annotated[int, Depends(get_current_user_id)],
     db: AsyncSessionDep,
 ) -> models.Quiz:
     quiz = await models.Quiz.get(db=db, id=quiz_id)
@@ -32,7 +54,7 @@ async def get_quiz_check_user(
             status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found"
         )
 
-    if quiz.created_by != user.id:
+    if quiz.created_by != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Quiz does not belong to current user",
@@ -51,7 +73,7 @@ async def get_quiz_check_user(
 async def create_quiz(
     db: AsyncSessionDep,
     quiz: schemas.QuizCreate,
-    current_user: Annotated[models.User, Depends(get_current_user)],
+    current_user: Annotated[schemas.UserReturn, Depends(get_current_user)],
 ) -> Any:
     quiz.created_by = current_user.id
     new_quiz = await models.Quiz.create(db=db, quiz=quiz)
@@ -66,12 +88,117 @@ async def create_quiz(
     response_description="The list of quizzes",
 )
 async def get_quizzes(
-    db: AsyncSessionDep,
+    session_factory: ReadSessionFactoryDep,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(ge=0)] = 25,
+    cursor: Annotated[str | None, Query()] = None,
+) -> Any:
+    """
+    Quizzes can be paginated with offset/limit, or with the cursor returned in the
+    X-Next-Cursor header of the previous page (in that case the offset is ignored).
+    Cursors are much faster for deep pages, because no rows have to be skipped.
+    """
+    key = ("quizzes", offset, limit, cursor)
+    if cached := response_cache.get(key):
+        return cached.to_response()
+
+    generation = response_cache.generation
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from exc
+
+    async with session_factory() as db:
+        # dicts instead of entities, they are only serialized
+        quizzes = await models.Quiz.get_multiple_rows(
+            offset=offset, limit=limit, after=after, db=db
+        )
+    headers = {}
+    if quizzes and len(quizzes) == limit:
+        last = quizzes[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last["created_at"], last["id"])
+
+    response = CachedResponse(to_json(quizzes_adapter, quizzes), headers)
+    # any new, updated or deleted quiz can change every page
+    return response_cache.set(
+        key, response, tags=["quizzes"], generation=generation
+    ).to_response()
+
+
+@router.get(
+    "/search",
+    response_model=list[schemas.QuizSearchResult],
+    status_code=status.HTTP_200_OK,
+    summary="Search quizzes by their title, description and questions",
+    response_description="The matching quizzes, from most to least relevant",
+)
+async def search_quizzes(
+    db: AsyncReadSessionDep,
+    q: Annotated[str, Query(min_length=1, max_length=256)],
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=100)] = 25,
 ) -> Any:
-    quizzes = await models.Quiz.get_multiple(offset=offset, limit=limit, db=db)
-    return quizzes
+    """
+    Full-text search (with stemming, e.g. "planets" also matches "planet"), using
+    the full-text index of the database. Every word of the query must appear in
+    the title and description of the quiz or in one of its questions.
+    """
+    return await models.Quiz.search(db=db, query=q, offset=offset, limit=limit)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Export all the quizzes as NDJSON",
+    response_description="One quiz per line, with its questions and answer options",
+)
+async def export_quizzes(session_factory: ReadSessionFactoryDep) -> Any:
+    """
+    The quizzes are read in batches from a server-side cursor and streamed as they
+    are serialized, so memory does not depend on the number of quizzes.
+    """
+    return StreamingResponse(
+        export_quizzes_ndjson(session_factory=session_factory),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post(
+    "/import",
+    status_code=status.HTTP_201_CREATED,
+    summary="Import quizzes (with their questions and answer options) from a file",
+    response_description="The number of imported rows",
+)
+async def import_quizzes_from_file(
+    db: AsyncSessionDep,
+    file: UploadFile,
+    current_user: Annotated[schemas.UserReturn, Depends(get_current_user)],
+    format: ImportFormat | None = None,
+) -> Any:
+    """
+    The file can be NDJSON (in the same format as the export) or CSV, guessed from
+    the file name if the format is not given. The imported quizzes belong to the
+    current user, and nothing is imported if any record is not valid.
+    """
+    try:
+        stats = await import_quizzes(
+            db=db,
+            file=file.file,
+            format=format or guess_format(file.filename or ""),
+            created_by=current_user.id,
+        )
+    except ImportValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"line": e.line, "errors": e.errors},
+        ) from e
+
+    return stats.as_dict()
 
 
 @router.get(
@@ -81,8 +208,38 @@ async def get_quizzes(
     summary="Get quiz by id",
     response_description="The requested quiz (if it exists)",
 )
-async def get_quiz(quiz: Annotated[models.Quiz, Depends(get_quiz_from_id)]) -> Any:
-    return quiz
+async def get_quiz(
+    quiz_id: int,
+    session_factory: ReadSessionFactoryDep,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    The response has a weak ETag, and 304 Not Modified is returned (without loading
+    the quiz) if it is given in the If-None-Match header and the quiz did not change.
+    """
+    key = ("quiz", quiz_id)
+    if cached := response_cache.get(key):
+        return cached.to_response(if_none_match)
+
+    generation = response_cache.generation
+    async with session_factory() as db:
+        if if_none_match:
+            updated_at = await models.Quiz.get_updated_at(db=db, id=quiz_id)
+            etag = weak_etag(quiz_id, updated_at)
+            if updated_at is not None and etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+        quiz = await models.Quiz.get(db=db, id=quiz_id)
+    if not quiz:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found"
+        )
+
+    etag = weak_etag(quiz.id, quiz.updated_at)
+    response = CachedResponse(to_json(quiz_adapter, quiz), {"ETag": etag})
+    return response_cache.set(
+        key, response, tags=[("quiz", quiz_id)], generation=generation
+    ).to_response()
 
 
 @router.put(
@@ -138,6 +295,35 @@ async def create_question_for_quiz(
     return new_question
 
 
+@router.post(
+    "/{quiz_id}/questions/batch",
+    response_model=list[schemas.QuestionBatchReturn],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create several questions (with their answer options) for the quiz",
+    response_description="The ids of the created questions and answer options",
+)
+async def create_questions_batch_for_quiz(
+    quiz: Annotated[models.Quiz, Depends(get_quiz_check_user)],
+    questions: Annotated[
+        list[schemas.QuestionWithOptionsCreate],
+        Body(min_length=1, max_length=MAX_BATCH_QUESTIONS),
+    ],
+    db: AsyncSessionDep,
+) -> Any:
+    """
+    All the questions are validated before creating anything, and they are created
+    in a single transaction (either all of them are created or none).
+    """
+    created = await models.Question.create_batch(
+        db=db, quiz_id=quiz.id, questions=questions
+    )
+
+    return [
+        {"id": question_id, "answer_option_ids": option_ids}
+        for question_id, option_ids in created
+    ]
+
+
 @router.get(
     "/{quiz_id}/questions",
     response_model=list[schemas.QuestionReturn],
@@ -145,11 +331,72 @@ async def create_question_for_quiz(
     summary="Get all questions associated to the quiz",
     response_description="The list of questions associated to the quiz",
 )
-async def get_all_questions_from_quiz(quiz_id: int, db: AsyncSessionDep) -> Any:
-    quiz = await models.Quiz.get_with_questions(db=db, id=quiz_id)
+async def get_all_questions_from_quiz(
+    quiz_id: int,
+    session_factory: ReadSessionFactoryDep,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    The response has a weak ETag (from the number of questions and when the last
+    one was updated), checked like the one of the quiz.
+    """
+    key = ("quiz_questions", quiz_id)
+    if cached := response_cache.get(key):
+        return cached.to_response(if_none_match)
+
+    generation = response_cache.generation
+    async with session_factory() as db:
+        if if_none_match:
+            updated = await models.Quiz.get_questions_updated_at(db=db, id=quiz_id)
+            etag = weak_etag(quiz_id, *updated) if updated is not None else ""
+            if etag and etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+        questions = await models.Question.get_rows_by_quiz_id(db=db, quiz_id=quiz_id)
+    if questions is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found"
+        )
+
+    last_updated_at = max((q["updated_at"] for q in questions), default=None)
+    etag = weak_etag(quiz_id, len(questions), last_updated_at)
+    response = CachedResponse(to_json(questions_adapter, questions), {"ETag": etag})
+    return response_cache.set(
+        key,
+        response,
+        tags=[("quiz", quiz_id), ("quiz_questions", quiz_id)],
+        generation=generation,
+    ).to_response()
+
+
+@router.get(
+    "/{quiz_id}/full",
+    response_model=schemas.QuizFull,
+    status_code=status.HTTP_200_OK,
+    summary="Get quiz with all its questions and answer options",
+    response_description="The requested quiz, questions and answer options",
+)
+async def get_full_quiz(quiz_id: int, session_factory: ReadSessionFactoryDep) -> Any:
+    """
+    Get the whole quiz in a single request, instead of getting the answer options
+    of each question separately.
+    """
+    key = ("quiz_full", quiz_id)
+    if cached := response_cache.get(key):
+        return cached.to_response()
+
+    generation = response_cache.generation
+    async with session_factory() as db:
+        quiz = await models.Quiz.get_full(db=db, id=quiz_id)
     if not quiz:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found"
         )
 
-    return quiz.questions
+    response = CachedResponse(to_json(quiz_full_adapter, quiz))
+    # answer options invalidate the question they belong to
+    tags = [("quiz", quiz_id), ("quiz_questions", quiz_id)]
+    tags += [("question", question.id) for question in quiz.questions]
+    return response_cache.set(
+        key, response, tags=tags, generation=generation
+    ).to_response()
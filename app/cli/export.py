@@ -0,0 +1,45 @@
+"""
+Export all the quizzes (with their questions and answer options) as NDJSON.
+
+    python -m app.cli.export --output quizzes.ndjson
+"""
+import argparse
+import asyncio
+import sys
+from typing import BinaryIO
+
+from app.core.export import ExportStats, export_quizzes_ndjson
+from app.models.database import replica_router
+
+
+async def export(output: BinaryIO, batch_size: int) -> ExportStats:
+    stats = ExportStats()
+    async for chunk in export_quizzes_ndjson(
+        session_factory=replica_router.session, batch_size=batch_size, stats=stats
+    ):
+        output.write(chunk)
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "-o", "--output", help="file to write to (standard output by default)"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=500, help="quizzes read per batch"
+    )
+    args = parser.parse_args()
+
+    if args.output:
+        with open(args.output, "wb") as output:
+            stats = asyncio.run(export(output, args.batch_size))
+    else:
+        stats = asyncio.run(export(sys.stdout.buffer, args.batch_size))
+
+    print(stats.report(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
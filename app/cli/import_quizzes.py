@@ -0,0 +1,51 @@
+"""
+Import quizzes (with their questions and answer options) from a NDJSON or CSV file.
+
+    python -m app.cli.import_quizzes quizzes.ndjson --user-id 1
+"""
+import argparse
+import asyncio
+import sys
+
+from app.core.importer import ImportFormat, ImportStats, guess_format, import_quizzes
+from app.models.database import AsyncSessionLocal
+
+
+async def run_import(
+    path: str, format: ImportFormat, user_id: int, chunk_size: int
+) -> ImportStats:
+    with open(path, "rb") as file:
+        async with AsyncSessionLocal() as db:
+            return await import_quizzes(
+                db=db,
+                file=file,
+                format=format,
+                created_by=user_id,
+                chunk_size=chunk_size,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="file to import")
+    parser.add_argument(
+        "--user-id", type=int, required=True, help="user that owns the quizzes"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["ndjson", "csv"],
+        help="format of the file (guessed from its extension by default)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=1000, help="quizzes validated per chunk"
+    )
+    args = parser.parse_args()
+
+    format: ImportFormat = args.format or guess_format(args.path)
+    stats = asyncio.run(run_import(args.path, format, args.user_id, args.chunk_size))
+
+    print(stats.report(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
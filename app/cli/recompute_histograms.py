@@ -0,0 +1,32 @@
+"""
+Count the scores of the quiz attempts again to rebuild the score histograms.
+
+    python -m app.cli.recompute_histograms [--quiz-id 1]
+"""
+import argparse
+import asyncio
+from time import perf_counter
+
+from app.core.percentiles import recompute_histograms
+from app.models.database import AsyncSessionLocal
+
+
+async def recompute(quiz_id: int | None) -> None:
+    async with AsyncSessionLocal() as db:
+        await recompute_histograms(db=db, quiz_id=quiz_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--quiz-id", type=int, help="only this quiz (all the quizzes by default)"
+    )
+    args = parser.parse_args()
+
+    start = perf_counter()
+    asyncio.run(recompute(args.quiz_id))
+    print(f"Recomputed the score histograms in {perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
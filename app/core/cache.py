@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Process-local LRU cache where every entry also expires after a given time.
+
+    It is meant to be used from the event loop thread only (no locking).
+    A ttl_sec <= 0 disables the cache (nothing is stored).
+    """
+
+    def __init__(self, max_size: int, ttl_sec: float) -> None:
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self.stats = CacheStats()
+        # key -> (expiration time, value), ordered from least to most recently used
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= monotonic():
+            del self._entries[key]
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def peek(self, key: K) -> V | None:
+        """
+        Get the value without counting it as a use (for the LRU order and the stats).
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= monotonic():
+            return None
+
+        return entry[1]
+
+    def set(self, key: K, value: V, ttl_sec: float | None = None) -> None:
+        ttl = self.ttl_sec if ttl_sec is None else min(ttl_sec, self.ttl_sec)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+
+        self._entries[key] = (monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        entry = self._entries.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"size": len(self), "max_size": self.max_size, **self.stats.as_dict()}
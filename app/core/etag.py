@@ -0,0 +1,35 @@
+from datetime import datetime
+from hashlib import blake2b
+
+from fastapi import Response, status
+
+
+def weak_etag(*parts: int | datetime | None) -> str:
+    """
+    Weak ETag of a response, from the values that change whenever its content does
+    (e.g. the id and updated_at of an entity).
+    """
+    value = "|".join(
+        part.isoformat() if isinstance(part, datetime) else str(part) for part in parts
+    )
+    return f'W/"{blake2b(value.encode(), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check the If-None-Match header of a request against the current ETag (with the
+    weak comparison, the only one allowed for If-None-Match).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,137 @@
+import asyncio
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable, Literal, TypeVar
+
+T = TypeVar("T")
+
+PoolKind = Literal["thread", "process"]
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """
+    Raised when a job is submitted to a BoundedExecutor whose queue is already full.
+    """
+
+
+@dataclass
+class ExecutorStats:
+    workers: int
+    max_queue: int
+    running: int = 0
+    queued: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    latency_total_sec: float = 0.0
+    latency_max_sec: float = 0.0
+
+    @property
+    def latency_avg_sec(self) -> float:
+        finished = self.completed + self.failed
+        return self.latency_total_sec / finished if finished else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "latency_avg_sec": self.latency_avg_sec,
+            "latency_max_sec": self.latency_max_sec,
+        }
+
+
+class BoundedExecutor:
+    """
+    Run blocking (CPU bound) functions outside of the event loop, in a thread or
+    process pool with a bounded number of waiting jobs.
+
+    Jobs submitted when all the workers are busy and the queue is full are rejected
+    right away (ExecutorSaturatedError) instead of piling up, so a burst of expensive
+    jobs cannot starve the rest of the application.
+    The pool itself is created lazily, on the first submitted job.
+    """
+
+    def __init__(self, kind: PoolKind, max_workers: int, max_queue: int) -> None:
+        self.kind = kind
+        self.stats = ExecutorStats(workers=max_workers, max_queue=max_queue)
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.stats.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.stats.workers, thread_name_prefix="bounded"
+                )
+
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        stats = self.stats
+        if stats.running + stats.queued >= stats.workers + stats.max_queue:
+            stats.rejected += 1
+            raise ExecutorSaturatedError("Executor queue is full")
+
+        # jobs are only counted as running once a worker slot is free, everything
+        # else is waiting in the executor queue
+        if stats.running < stats.workers:
+            stats.running += 1
+        else:
+            stats.queued += 1
+
+        start = perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+
+        # the slot is released when the job is done, not when the caller stops
+        # waiting for it (e.g. the request is cancelled), since the worker keeps
+        # running it. Done callbacks run in the worker, so stats are updated in
+        # the event loop (before the awaiting task is woken up by wrap_future).
+        def on_done(future: Future[T]) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._finish, future, start)
+
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _finish(self, future: Future[Any], start: float) -> None:
+        stats = self.stats
+        # jobs cancelled while still queued never ran
+        if not future.cancelled():
+            if future.exception() is None:
+                stats.completed += 1
+            else:
+                stats.failed += 1
+            latency = perf_counter() - start
+            stats.latency_total_sec += latency
+            stats.latency_max_sec = max(stats.latency_max_sec, latency)
+        self._release()
+
+    def _release(self) -> None:
+        stats = self.stats
+        if stats.queued:
+            # a queued job takes the worker slot that has just been released
+            stats.queued -= 1
+        else:
+            stats.running -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import AsyncContextManager, AsyncIterator, Callable
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+import app.schemas as schemas
+
+
+@dataclass
+class ExportStats:
+    quizzes: int = 0
+    questions: int = 0
+    answer_options: int = 0
+    elapsed_sec: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.quizzes + self.questions + self.answer_options
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed_sec if self.elapsed_sec else 0.0
+
+    def report(self) -> str:
+        return (
+            f"Exported {self.quizzes} quizzes, {self.questions} questions and "
+            f"{self.answer_options} answer options in {self.elapsed_sec:.2f} s "
+            f"({self.rows_per_sec:.0f} rows/s)"
+        )
+
+
+async def export_quizzes_ndjson(
+    session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+    batch_size: int = 500,
+    stats: ExportStats | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Serialize all the quizzes as NDJSON: one line per quiz (schemas.QuizFull, with
+    its questions and answer options), yielding one chunk per batch of quizzes.
+
+    The session is opened (and closed) by the generator itself, so it can be
+    streamed in a response after the dependencies of the request are closed.
+    """
+    stats = stats if stats is not None else ExportStats()
+    start = perf_counter()
+    async with session_factory() as db:
+        async for quizzes in models.Quiz.stream_full(db=db, batch_size=batch_size):
+            lines = []
+            for quiz in quizzes:
+                lines.append(schemas.QuizFull.model_validate(quiz).model_dump_json())
+                stats.quizzes += 1
+                stats.questions += len(quiz.questions)
+                stats.answer_options += sum(
+                    len(q.answer_options) for q in quiz.questions
+                )
+
+            stats.elapsed_sec = perf_counter() - start
+            yield ("\n".join(lines) + "\n").encode()
+
+    stats.elapsed_sec = perf_counter() - start
+    logger.info(stats.report())
@@ -0,0 +1,351 @@
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from time import perf_counter
+from typing import IO, Any, Iterator, Literal
+
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+import app.schemas as schemas
+from app.core.response_cache import response_cache
+from app.models.database import Base, now
+
+ImportFormat = Literal["ndjson", "csv"]
+
+# columns of the CSV format, with one row per answer option (or per question/quiz
+# without answer options), where quiz_id and question_id are only used to group the
+# rows (the rows of a quiz must be consecutive)
+CSV_COLUMNS = [
+    "quiz_id",
+    "quiz_title",
+    "quiz_description",
+    "question_id",
+    "question_content",
+    "question_type",
+    "question_points",
+    "option_content",
+    "option_is_correct",
+]
+
+quizzes_adapter = TypeAdapter(list[schemas.QuizImport])
+
+
+class ImportValidationError(ValueError):
+    """
+    Raised when a record of the imported file is not valid (nothing is imported).
+    """
+
+    def __init__(self, line: int, errors: list[dict[str, Any]]) -> None:
+        super().__init__(f"Invalid record at line {line}")
+        self.line = line
+        self.errors = errors
+
+
+@dataclass
+class ImportStats:
+    quizzes: int = 0
+    questions: int = 0
+    answer_options: int = 0
+    elapsed_sec: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.quizzes + self.questions + self.answer_options
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed_sec if self.elapsed_sec else 0.0
+
+    def report(self) -> str:
+        return (
+            f"Imported {self.quizzes} quizzes, {self.questions} questions and "
+            f"{self.answer_options} answer options in {self.elapsed_sec:.2f} s "
+            f"({self.rows_per_sec:.0f} rows/s)"
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "quizzes": self.quizzes,
+            "questions": self.questions,
+            "answer_options": self.answer_options,
+            "elapsed_sec": self.elapsed_sec,
+            "rows_per_sec": self.rows_per_sec,
+        }
+
+
+def guess_format(filename: str) -> ImportFormat:
+    return "csv" if filename.lower().endswith(".csv") else "ndjson"
+
+
+def read_ndjson(file: IO[bytes]) -> Iterator[tuple[int, Any]]:
+    """
+    Yield (line number, record) for every non empty line of the file.
+    """
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            raise ImportValidationError(
+                line_number, [{"type": "json_invalid", "msg": str(e)}]
+            ) from e
+
+
+def read_csv_rows(reader: csv.DictReader) -> Iterator[dict[str, Any]]:
+    """
+    Yield the rows of the reader, reporting files that are not valid UTF-8 or CSV
+    as invalid records.
+    """
+    rows = iter(reader)
+    while True:
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except UnicodeDecodeError as e:
+            raise ImportValidationError(
+                reader.line_num + 1, [{"type": "unicode_invalid", "msg": str(e)}]
+            ) from e
+        except csv.Error as e:
+            raise ImportValidationError(
+                max(reader.line_num, 1), [{"type": "csv_invalid", "msg": str(e)}]
+            ) from e
+
+        yield row
+
+
+def read_csv(file: IO[bytes]) -> Iterator[tuple[int, Any]]:
+    """
+    Yield (line number, record) for every quiz of the file, with the same nested
+    structure as the NDJSON records.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8", newline=""))
+    quiz: dict[str, Any] | None = None
+    quiz_key = question_key = None
+    quiz_line = 0
+    for row in read_csv_rows(reader):
+        if quiz is None or row.get("quiz_id") != quiz_key:
+            if quiz is not None:
+                yield quiz_line, quiz
+            quiz_key, question_key = row.get("quiz_id"), None
+            quiz_line = reader.line_num
+            quiz = {
+                "title": row.get("quiz_title"),
+                "description": row.get("quiz_description") or None,
+                "questions": [],
+            }
+
+        if row.get("question_id") and row["question_id"] != question_key:
+            question_key = row["question_id"]
+            question: dict[str, Any] = {
+                "content": row.get("question_content"),
+                "answer_options": [],
+            }
+            if row.get("question_type"):
+                question["type"] = row["question_type"]
+            if row.get("question_points"):
+                question["points"] = row["question_points"]
+            quiz["questions"].append(question)
+
+        if row.get("option_content") and quiz["questions"]:
+            option = {"content": row["option_content"]}
+            if row.get("option_is_correct"):
+                option["is_correct"] = row["option_is_correct"]
+            quiz["questions"][-1]["answer_options"].append(option)
+
+    if quiz is not None:
+        yield quiz_line, quiz
+
+
+def read_chunk(
+    records: Iterator[tuple[int, Any]], chunk_size: int
+) -> list[schemas.QuizImport]:
+    """
+    Read (and parse) the next chunk_size records of the file and validate them.
+    Blocking and CPU bound, so it is run outside of the event loop.
+    """
+    chunk = list(islice(records, chunk_size))
+    return validate_chunk(chunk) if chunk else []
+
+
+def validate_chunk(chunk: list[tuple[int, Any]]) -> list[schemas.QuizImport]:
+    """
+    Validate a chunk of records at once, reporting the line of the first invalid one.
+    """
+    try:
+        return quizzes_adapter.validate_python([record for _, record in chunk])
+    except ValidationError as e:
+        errors = e.errors(include_url=False)
+        index = errors[0]["loc"][0]
+        line = chunk[index][0] if isinstance(index, int) else chunk[0][0]
+        raise ImportValidationError(
+            line,
+            [
+                {**error, "loc": error["loc"][1:]}
+                for error in errors
+                if error["loc"][0] == index
+            ],
+        ) from e
+
+
+async def allocate_ids(db: AsyncSession, model: type[Base], n: int) -> list[int]:
+    """
+    Get n ids for new rows of the model, so that the rows that reference them can
+    be inserted without having to read the ids back from the database.
+    """
+    if n == 0:
+        return []
+
+    connection = await db.connection()
+    table = model.__tablename__
+    if connection.dialect.name == "postgresql":
+        result = await db.execute(
+            text(
+                f"SELECT nextval(pg_get_serial_sequence('{table}', 'id')) "
+                "FROM generate_series(1, :n)"
+            ),
+            {"n": n},
+        )
+        return list(result.scalars())
+
+    # SQLite assigns max(id) + 1 to new rows, and there is a single writer anyway
+    # (a concurrent insert would make the import fail instead of using wrong ids)
+    last_id = await db.scalar(select(func.coalesce(func.max(model.id), 0))) or 0
+    return list(range(last_id + 1, last_id + 1 + n))
+
+
+async def insert_rows(db: AsyncSession, model: type[Base], rows: list[dict]) -> None:
+    """
+    Insert the rows with COPY on asyncpg, and with a single executemany otherwise.
+    """
+    if not rows:
+        return
+
+    connection = await db.connection()
+    if connection.dialect.driver == "asyncpg":
+        columns = list(rows[0])
+        raw_connection = await connection.get_raw_connection()
+        asyncpg_connection: Any = raw_connection.driver_connection
+        await asyncpg_connection.copy_records_to_table(
+            model.__tablename__,
+            columns=columns,
+            records=[tuple(row[column] for column in columns) for row in rows],
+        )
+    else:
+        await db.execute(insert(model), rows)
+
+
+async def write_chunk(
+    db: AsyncSession,
+    quizzes: list[schemas.QuizImport],
+    created_by: int,
+    timestamp: datetime,
+) -> None:
+    quiz_ids = await allocate_ids(db, models.Quiz, len(quizzes))
+    question_ids = iter(
+        await allocate_ids(db, models.Question, sum(len(q.questions) for q in quizzes))
+    )
+
+    # timestamps are set here because COPY only applies server side defaults
+    quiz_rows: list[dict] = []
+    question_rows: list[dict] = []
+    option_rows: list[dict] = []
+    for quiz_id, quiz in zip(quiz_ids, quizzes, strict=True):
+        quiz_rows.append(
+            {
+                "id": quiz_id,
+                "title": quiz.title,
+                "description": quiz.description,
+                "created_by": created_by,
+                "created_at": timestamp,
+                "updated_at": timestamp,
+            }
+        )
+        for question in quiz.questions:
+            question_id = next(question_ids)
+            question_rows.append(
+                {
+                    "id": question_id,
+                    "quiz_id": quiz_id,
+                    "content": question.content,
+                    "type": question.type.value,
+                    "points": question.points,
+                    "created_at": timestamp,
+                    "updated_at": timestamp,
+                }
+            )
+            option_rows.extend(
+                {
+                    "question_id": question_id,
+                    "content": option.content,
+                    "is_correct": option.is_correct,
+                }
+                for option in question.answer_options
+            )
+
+    await insert_rows(db, models.Quiz, quiz_rows)
+    await insert_rows(db, models.Question, question_rows)
+    await insert_rows(db, models.AnswerOption, option_rows)
+
+
+async def import_quizzes(
+    db: AsyncSession,
+    file: IO[bytes],
+    format: ImportFormat,
+    created_by: int,
+    chunk_size: int = 1000,
+    stats: ImportStats | None = None,
+) -> ImportStats:
+    """
+    Import the quizzes of the file (with their questions and answer options), owned
+    by the created_by user. The ids of the file are only used to group the rows,
+    new ids are assigned to everything.
+
+    The file is read and validated in chunks of chunk_size quizzes (in a worker
+    thread, so parsing a large file does not block the event loop), and each chunk
+    is written with one statement per table. Everything is imported in a single
+    transaction, so nothing is imported if any record is not valid.
+    """
+    stats = stats if stats is not None else ImportStats()
+    start = perf_counter()
+    records = read_csv(file) if format == "csv" else read_ndjson(file)
+
+    # the first chunk is parsed before starting the transaction, so files that are
+    # not valid from the start do not take a connection at all
+    quizzes = await run_in_threadpool(read_chunk, records, chunk_size)
+    try:
+        timestamp = await db.scalar(select(now()))
+        while quizzes:
+            await write_chunk(db, quizzes, created_by, timestamp)
+
+            stats.quizzes += len(quizzes)
+            for quiz in quizzes:
+                stats.questions += len(quiz.questions)
+                stats.answer_options += sum(
+                    len(question.answer_options) for question in quiz.questions
+                )
+            stats.elapsed_sec = perf_counter() - start
+
+            # chunks are read one at a time, so the records are never read from
+            # two threads at once
+            quizzes = await run_in_threadpool(read_chunk, records, chunk_size)
+
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    response_cache.invalidate("quizzes")
+
+    stats.elapsed_sec = perf_counter() - start
+    logger.info(stats.report())
+
+    return stats
@@ -0,0 +1,179 @@
+import asyncio
+from bisect import insort
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Any, AsyncContextManager, Callable
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+from app.core.cache import TTLCache
+from app.core.settings import get_settings
+from app.models.database import AsyncSessionLocal
+
+
+@dataclass(frozen=True)
+class LeaderboardEntry:
+    attempt_id: int
+    user_id: int
+    score: int
+    attempted_at: datetime
+
+    @property
+    def sort_key(self) -> tuple[int, int]:
+        # best score first, and the oldest attempt first on ties
+        return (-self.score, self.attempt_id)
+
+
+class QuizLeaderboard:
+    """
+    The best size attempts of a quiz, sorted from best to worst.
+
+    Adding an attempt is O(size) at most (and O(1) for the usual attempt that does
+    not make it to the leaderboard), reading the top attempts is O(limit).
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._entries: list[LeaderboardEntry] = []
+        self._attempt_ids: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def offer(self, entry: LeaderboardEntry) -> bool:
+        """
+        Add the attempt if it is one of the best ones (adding it again does nothing),
+        returning whether it was added.
+        """
+        if entry.attempt_id in self._attempt_ids:
+            return False
+        if len(self._entries) >= self.size and (
+            entry.sort_key >= self._entries[-1].sort_key
+        ):
+            return False
+
+        insort(self._entries, entry, key=lambda e: e.sort_key)
+        self._attempt_ids.add(entry.attempt_id)
+        if len(self._entries) > self.size:
+            self._attempt_ids.discard(self._entries.pop().attempt_id)
+
+        return True
+
+    def top(self, limit: int) -> list[LeaderboardEntry]:
+        return self._entries[:limit]
+
+
+class Leaderboards:
+    """
+    Process-local leaderboards of the most recently read quizzes.
+
+    A leaderboard is rebuilt from the database (reading only its size attempts from
+    the quiz_attempts index) when it is first read, and then every attempt scored by
+    this process is added to it as it is submitted, so it is served from memory.
+    Leaderboards expire after ttl_sec seconds, to include the attempts submitted to
+    other processes, and must be invalidated when existing scores change.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+        size: int,
+        max_quizzes: int,
+        ttl_sec: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.size = size
+        self.rebuilds = 0
+        self._boards: TTLCache[int, QuizLeaderboard] = TTLCache(
+            max_size=max_quizzes, ttl_sec=ttl_sec
+        )
+        # leaderboards being rebuilt, which also get the attempts submitted meanwhile
+        self._loading: dict[
+            int, tuple[QuizLeaderboard, asyncio.Task[QuizLeaderboard | None]]
+        ] = {}
+
+    async def top(self, quiz_id: int, limit: int) -> list[LeaderboardEntry] | None:
+        """
+        Get the best limit attempts of the quiz (None if the quiz does not exist).
+        """
+        board = self._boards.get(quiz_id)
+        if board is None:
+            board = await self.rebuild(quiz_id)
+            if board is None:
+                return None
+
+        return board.top(limit)
+
+    def record(self, quiz_id: int, entry: LeaderboardEntry) -> None:
+        """
+        Add a (committed) attempt to the leaderboard of its quiz, if it is in memory.
+        """
+        if quiz_id in self._loading:
+            self._loading[quiz_id][0].offer(entry)
+
+        board = self._boards.peek(quiz_id)
+        if board is not None:
+            board.offer(entry)
+
+    async def rebuild(self, quiz_id: int) -> QuizLeaderboard | None:
+        """
+        Build the leaderboard of the quiz again from the database (concurrent calls
+        for the same quiz wait for the same rebuild).
+        """
+        if quiz_id not in self._loading:
+            board = QuizLeaderboard(self.size)
+            task = asyncio.create_task(self._load(quiz_id, board))
+            self._loading[quiz_id] = (board, task)
+            task.add_done_callback(lambda _: self._loading.pop(quiz_id, None))
+
+        # shielded so that a cancelled request does not cancel the others
+        return await asyncio.shield(self._loading[quiz_id][1])
+
+    def invalidate(self, quiz_id: int) -> None:
+        self._boards.pop(quiz_id)
+
+    def clear(self) -> None:
+        self._boards.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"rebuilds": self.rebuilds, **self._boards.as_dict()}
+
+    async def _load(
+        self, quiz_id: int, board: QuizLeaderboard
+    ) -> QuizLeaderboard | None:
+        async with self.session_factory() as db:
+            rows = await models.QuizAttempt.get_leaderboard(
+                db=db, quiz_id=quiz_id, limit=self.size
+            )
+            if not rows and not await models.Quiz.get_quiz_created_by(
+                db=db, id=quiz_id
+            ):
+                return None
+
+        # the attempts submitted during the query may or may not be in the rows, but
+        # they were already added to the board (and are not added twice)
+        for row in rows:
+            board.offer(LeaderboardEntry(*row))
+
+        self.rebuilds += 1
+        self._boards.set(quiz_id, board)
+
+        return board
+
+
+settings = get_settings()
+leaderboards = Leaderboards(
+    session_factory=AsyncSessionLocal,
+    size=settings.LEADERBOARD_SIZE,
+    max_quizzes=settings.LEADERBOARD_MAX_QUIZZES,
+    ttl_sec=settings.LEADERBOARD_TTL_SEC,
+)
+
+
+def get_leaderboards() -> Leaderboards:
+    return leaderboards
+
+
+LeaderboardsDep = Annotated[Leaderboards, Depends(get_leaderboards)]
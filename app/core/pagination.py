@@ -0,0 +1,24 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(timestamp: datetime, id: int) -> str:
+    """
+    Encode the sort key of the last item of a page as an opaque cursor token,
+    to get the next page with keyset pagination.
+    """
+    data = json.dumps([timestamp.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Raises ValueError if the cursor was not created by encode_cursor.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        timestamp, id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        return datetime.fromisoformat(timestamp), int(id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
@@ -0,0 +1,204 @@
+import asyncio
+from typing import Annotated, Any, AsyncContextManager, Callable
+
+import numpy as np
+import numpy.typing as npt
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+from app.core.cache import TTLCache
+from app.core.settings import get_settings
+from app.models.database import AsyncSessionLocal
+
+
+class ScoreHistogram:
+    """
+    Histogram of the scores of a quiz, in buckets of bucket_width points.
+
+    The number of scores below each bucket is kept up to date as scores are added
+    (O(buckets) per score, with a single array operation), so percentiles are
+    computed in constant time.
+
+    Percentiles are exact with bucket_width=1. With wider buckets, the scores in the
+    same bucket as the given one are assumed to be evenly spread, so the error is at
+    most the percentage of scores in that bucket (see error_bound).
+    """
+
+    def __init__(
+        self, bucket_width: int, counts: list[tuple[int, int]] | None = None
+    ) -> None:
+        self.bucket_width = bucket_width
+        # bucket of the first element of _counts
+        self._first = counts[0][0] if counts else 0
+        self._counts: npt.NDArray[np.int64] = np.zeros(0, dtype=np.int64)
+        if counts:
+            self._counts = np.zeros(counts[-1][0] - self._first + 1, dtype=np.int64)
+            for bucket, count in counts:
+                self._counts[bucket - self._first] = count
+        # _below[i] is the number of scores in the buckets before _counts[i]
+        self._below: npt.NDArray[np.int64] = np.concatenate(
+            (np.zeros(1, dtype=np.int64), np.cumsum(self._counts))
+        )
+
+    @property
+    def total(self) -> int:
+        return int(self._below[-1])
+
+    def add(self, score: int) -> None:
+        index = self._index(score // self.bucket_width)
+        self._counts[index] += 1
+        self._below[index + 1 :] += 1
+
+    def percentile(self, score: int) -> float:
+        """
+        Percentage of scores lower than the given one.
+        """
+        bucket = score // self.bucket_width
+        index = bucket - self._first
+        if self.total == 0 or index < 0:
+            return 0.0
+        if index >= len(self._counts):
+            return 100.0
+
+        below = self._below[index] + self._counts[index] * (
+            (score - bucket * self.bucket_width) / self.bucket_width
+        )
+        return float(100 * below / self.total)
+
+    def error_bound(self, score: int) -> float:
+        """
+        Maximum error (in percentage points) of percentile(score).
+        """
+        index = score // self.bucket_width - self._first
+        if (
+            self.bucket_width == 1
+            or not 0 <= index < len(self._counts)
+            or not self.total
+        ):
+            return 0.0
+
+        return float(100 * self._counts[index] / self.total)
+
+    def _index(self, bucket: int) -> int:
+        """
+        Get the index of the bucket, adding empty buckets if needed.
+        """
+        if not len(self._counts):
+            self._first = bucket
+        if bucket < self._first:
+            empty = np.zeros(self._first - bucket, dtype=np.int64)
+            self._counts = np.concatenate((empty, self._counts))
+            self._below = np.concatenate((empty, self._below))
+            self._first = bucket
+        last = self._first + len(self._counts) - 1
+        if bucket > last:
+            new = bucket - last
+            self._counts = np.concatenate((self._counts, np.zeros(new, np.int64)))
+            self._below = np.concatenate(
+                (self._below, np.full(new, self._below[-1], np.int64))
+            )
+
+        return bucket - self._first
+
+
+class ScoreHistograms:
+    """
+    Process-local score histograms of the most recently used quizzes.
+
+    A histogram is loaded from the score_buckets table (which is updated in the
+    same transaction as the attempts) when it is first used, and then the scores
+    of the attempts submitted to this process are added to it. Histograms expire
+    after ttl_sec seconds, to include the attempts submitted to other processes
+    (or while the histogram was being loaded), and must be invalidated when
+    existing scores change.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+        bucket_width: int,
+        max_quizzes: int,
+        ttl_sec: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.bucket_width = bucket_width
+        self.loads = 0
+        self._histograms: TTLCache[int, ScoreHistogram] = TTLCache(
+            max_size=max_quizzes, ttl_sec=ttl_sec
+        )
+        self._loading: dict[int, asyncio.Task[ScoreHistogram]] = {}
+
+    async def get(self, quiz_id: int) -> ScoreHistogram:
+        histogram = self._histograms.get(quiz_id)
+        if histogram is None:
+            if quiz_id not in self._loading:
+                task = asyncio.create_task(self._load(quiz_id))
+                self._loading[quiz_id] = task
+                task.add_done_callback(lambda _: self._loading.pop(quiz_id, None))
+            # shielded so that a cancelled request does not cancel the others
+            histogram = await asyncio.shield(self._loading[quiz_id])
+
+        return histogram
+
+    async def percentile(self, quiz_id: int, score: int) -> float:
+        return (await self.get(quiz_id)).percentile(score)
+
+    def record(self, quiz_id: int, score: int) -> None:
+        """
+        Add the score of a (committed) attempt to the histogram of its quiz, if it
+        is in memory.
+        """
+        histogram = self._histograms.peek(quiz_id)
+        if histogram is not None:
+            histogram.add(score)
+
+    def invalidate(self, quiz_id: int) -> None:
+        self._histograms.pop(quiz_id)
+
+    def clear(self) -> None:
+        self._histograms.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"loads": self.loads, **self._histograms.as_dict()}
+
+    async def _load(self, quiz_id: int) -> ScoreHistogram:
+        async with self.session_factory() as db:
+            counts = await models.ScoreBucket.get_by_quiz(db=db, quiz_id=quiz_id)
+
+        histogram = ScoreHistogram(bucket_width=self.bucket_width, counts=counts)
+        self.loads += 1
+        self._histograms.set(quiz_id, histogram)
+
+        return histogram
+
+
+async def recompute_histograms(db: AsyncSession, quiz_id: int | None = None) -> None:
+    """
+    Count the scores of the quiz (or of all the quizzes) again from their attempts,
+    e.g. after changing the bucket width or deleting users (whose attempts are
+    deleted by the database without updating the histograms).
+    """
+    await models.ScoreBucket.recompute(
+        db=db, bucket_width=settings.SCORE_BUCKET_WIDTH, quiz_id=quiz_id
+    )
+    if quiz_id is None:
+        score_histograms.clear()
+    else:
+        score_histograms.invalidate(quiz_id)
+
+
+settings = get_settings()
+score_histograms = ScoreHistograms(
+    session_factory=AsyncSessionLocal,
+    bucket_width=settings.SCORE_BUCKET_WIDTH,
+    max_quizzes=settings.SCORE_HISTOGRAM_MAX_QUIZZES,
+    ttl_sec=settings.SCORE_HISTOGRAM_TTL_SEC,
+)
+
+
+def get_score_histograms() -> ScoreHistograms:
+    return score_histograms
+
+
+ScoreHistogramsDep = Annotated[ScoreHistograms, Depends(get_score_histograms)]
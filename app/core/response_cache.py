@@ -0,0 +1,163 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Hashable, Iterable, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.core.cache import CacheStats
+from app.core.etag import etag_matches, not_modified
+from app.core.settings import get_settings
+
+T = TypeVar("T")
+
+
+def to_json(adapter: TypeAdapter[T], obj: Any) -> bytes:
+    """
+    Serialize an entity (or a list of them) with the given response schema.
+    """
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    def to_response(self, if_none_match: str | None = None) -> Response:
+        """
+        Build the response (304 Not Modified if it has an ETag that the client
+        already has).
+        """
+        etag = self.headers.get("ETag")
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        return Response(
+            content=self.body,
+            headers=self.headers,
+            media_type="application/json",
+        )
+
+
+class ResponseCache:
+    """
+    Process-local LRU cache of serialized responses, where every entry also expires
+    after ttl_sec seconds and the least recently used ones are evicted when their
+    total size goes over max_bytes.
+
+    Every entry is stored with the tags of the entities it was built from (e.g.
+    ("quiz", 1)), and the models invalidate the tags of the rows they create, update
+    or delete as soon as they are committed. Writes done by other processes are only
+    seen once the entries expire.
+
+    It is meant to be used from the event loop thread only (no locking).
+    A ttl_sec <= 0 or max_bytes <= 0 disables the cache (nothing is stored).
+    """
+
+    def __init__(self, max_bytes: int, ttl_sec: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self.stats = CacheStats()
+        self.size_bytes = 0
+        # incremented on every invalidation, so responses built from data read
+        # before an invalidation are not stored
+        self.generation = 0
+        # monotonic time of the last invalidation
+        self.invalidated_at = float("-inf")
+        # key -> (expiration time, tags, response), from least to most recently used
+        self._entries: OrderedDict[
+            Hashable, tuple[float, frozenset[Hashable], CachedResponse]
+        ] = OrderedDict()
+        self._keys_by_tag: dict[Hashable, set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[2]
+
+    def set(
+        self,
+        key: Hashable,
+        response: CachedResponse,
+        tags: Iterable[Hashable],
+        generation: int,
+    ) -> CachedResponse:
+        """
+        Store the response, unless something was invalidated after the given
+        generation (read before reading the data of the response). The response is
+        returned either way.
+        """
+        if (
+            self.ttl_sec <= 0
+            or generation != self.generation
+            or response.size > self.max_bytes
+        ):
+            return response
+
+        if key in self._entries:
+            self._remove(key)
+        entry_tags = frozenset(tags)
+        self._entries[key] = (monotonic() + self.ttl_sec, entry_tags, response)
+        self.size_bytes += response.size
+        for tag in entry_tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+
+        while self.size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+        return response
+
+    def invalidate(self, *tags: Hashable) -> None:
+        self.generation += 1
+        self.invalidated_at = monotonic()
+        for tag in tags:
+            for key in list(self._keys_by_tag.get(tag, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.invalidated_at = monotonic()
+        self._entries.clear()
+        self._keys_by_tag.clear()
+        self.size_bytes = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "size": len(self),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            **self.stats.as_dict(),
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, tags, response = self._entries.pop(key)
+        self.size_bytes -= response.size
+        for tag in tags:
+            keys = self._keys_by_tag[tag]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tag[tag]
+
+
+settings = get_settings()
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl_sec=settings.RESPONSE_CACHE_TTL_SEC,
+)
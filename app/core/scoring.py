@@ -0,0 +1,255 @@
+from dataclasses import dataclass
+from time import monotonic
+
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+from app.core.cache import TTLCache
+from app.core.leaderboard import leaderboards
+from app.core.percentiles import recompute_histograms
+from app.core.settings import get_settings
+from app.schemas import UserAnswerCreate
+
+IntArray = npt.NDArray[np.int64]
+
+
+class InvalidAnswersError(ValueError):
+    """
+    Raised when the answers of an attempt do not match the questions of the quiz.
+    """
+
+    def __init__(self, message: str, attempt: int = 0) -> None:
+        super().__init__(message)
+        # index of the (first) invalid attempt, when scoring several attempts
+        self.attempt = attempt
+
+
+def int_array(values: list[int]) -> IntArray:
+    return np.array(values, dtype=np.int64)
+
+
+def read_only_array(values: list[int]) -> IntArray:
+    array = int_array(values)
+    array.flags.writeable = False
+    return array
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """
+    Answer key of a quiz compiled into arrays, to score attempts with array
+    operations instead of going through its questions and answer options.
+    The arrays are read-only, so the same key can be shared by concurrent requests.
+
+    The answer options are sorted by id, so the chosen ones are found with a binary
+    search, and each one stores the points that choosing it gives (the points of
+    its question if it is a correct option, 0 otherwise).
+    """
+
+    # ids of the questions of the quiz (sorted)
+    question_ids: IntArray
+    # ids of the answer options of the quiz (sorted)
+    option_ids: IntArray
+    # question of each answer option
+    option_question_ids: IntArray
+    # points given for choosing each answer option
+    option_points: IntArray
+
+    @classmethod
+    def compile(
+        cls, rows: list[tuple[int, int, int | None, bool | None]]
+    ) -> "AnswerKey":
+        """
+        Build the key from the rows returned by Quiz.get_answer_key.
+        """
+        options = sorted(
+            (option_id, question_id, points if is_correct else 0)
+            for question_id, points, option_id, is_correct in rows
+            if option_id is not None
+        )
+
+        return cls(
+            question_ids=read_only_array(sorted({row[0] for row in rows})),
+            option_ids=read_only_array([option[0] for option in options]),
+            option_question_ids=read_only_array([option[1] for option in options]),
+            option_points=read_only_array([option[2] for option in options]),
+        )
+
+    def score(self, answers: list[UserAnswerCreate]) -> int:
+        return int(self.score_batch([answers])[0])
+
+    def score_batch(self, attempts: list[list[UserAnswerCreate]]) -> IntArray:
+        attempt_index = int_array(
+            [i for i, answers in enumerate(attempts) for _ in answers]
+        )
+        answers = [answer for answers in attempts for answer in answers]
+
+        return self.score_arrays(
+            attempt_index=attempt_index,
+            question_ids=int_array([answer.question_id for answer in answers]),
+            option_ids=int_array([answer.chosen_option_id for answer in answers]),
+            n_attempts=len(attempts),
+        )
+
+    def score_arrays(
+        self,
+        attempt_index: IntArray,
+        question_ids: IntArray,
+        option_ids: IntArray,
+        n_attempts: int,
+    ) -> IntArray:
+        """
+        Score n_attempts attempts at once, given the attempt (from 0 to n_attempts - 1),
+        the question and the chosen answer option of every answer.
+        """
+        in_quiz = np.isin(question_ids, self.question_ids)
+        if not in_quiz.all():
+            first = int(np.argmin(in_quiz))
+            raise InvalidAnswersError(
+                f"Question {question_ids[first]} does not belong to the quiz",
+                attempt=int(attempt_index[first]),
+            )
+
+        # a question cannot be answered twice in the same attempt
+        order = np.lexsort((question_ids, attempt_index))
+        repeated = (np.diff(attempt_index[order]) == 0) & (
+            np.diff(question_ids[order]) == 0
+        )
+        if repeated.any():
+            first = int(order[np.argmax(repeated)])
+            raise InvalidAnswersError(
+                f"Question {question_ids[first]} is answered more than once",
+                attempt=int(attempt_index[first]),
+            )
+
+        if len(self.option_ids):
+            positions = np.searchsorted(self.option_ids, option_ids)
+            positions = np.minimum(positions, len(self.option_ids) - 1)
+            valid = (self.option_ids[positions] == option_ids) & (
+                self.option_question_ids[positions] == question_ids
+            )
+        else:
+            positions = np.zeros_like(option_ids)
+            valid = np.zeros(len(option_ids), dtype=bool)
+        if not valid.all():
+            first = int(np.argmin(valid))
+            raise InvalidAnswersError(
+                f"Answer option {option_ids[first]} does not belong to "
+                f"question {question_ids[first]}",
+                attempt=int(attempt_index[first]),
+            )
+
+        scores = np.bincount(
+            attempt_index, weights=self.option_points[positions], minlength=n_attempts
+        )
+        return scores.astype(np.int64)
+
+
+class AnswerKeyCache(TTLCache[int, tuple[int, AnswerKey, float]]):
+    """
+    (answer key version, answer key, time the version was checked) by quiz id. A key
+    compiled for a version is never modified, so it can be shared until the version
+    of the quiz changes.
+
+    Keys whose version was checked in the database less than trust_sec seconds ago
+    are used without checking it again, unless the questions or answer options of
+    any quiz were changed by this process since then (see invalidate), so changes
+    made by other processes are used after at most trust_sec seconds.
+    """
+
+    def __init__(self, max_size: int, ttl_sec: float, trust_sec: float) -> None:
+        super().__init__(max_size=max_size, ttl_sec=ttl_sec)
+        self.trust_sec = trust_sec
+        # monotonic time of the last change of an answer key in this process
+        self.changed_at = float("-inf")
+
+    def invalidate(self, quiz_id: int | None = None) -> None:
+        """
+        Called after the answer key of a quiz changes (quiz_id may not be known,
+        e.g. for an answer option), so no cached key is used without checking its
+        version again.
+        """
+        self.changed_at = monotonic()
+        if quiz_id is not None:
+            self.pop(quiz_id)
+
+
+settings = get_settings()
+answer_key_cache = AnswerKeyCache(
+    max_size=settings.ANSWER_KEY_CACHE_MAX_SIZE,
+    ttl_sec=settings.ANSWER_KEY_CACHE_TTL_SEC,
+    trust_sec=settings.ANSWER_KEY_TRUST_SEC,
+)
+
+
+async def get_answer_key(db: AsyncSession, quiz_id: int) -> AnswerKey | None:
+    """
+    Get the answer key of the quiz (None if the quiz does not exist). The version of
+    the key is read from the database (Quiz.get_answer_key_version) unless it was
+    checked recently, and the key itself only if it is not the cached version.
+
+    The version is read before the key and from the same database, so a key is never
+    cached with an older version than the data it was compiled from.
+    """
+    checked_at = monotonic()
+    cached = answer_key_cache.get(quiz_id)
+    if cached is not None:
+        _, answer_key, last_checked_at = cached
+        if (
+            last_checked_at > answer_key_cache.changed_at
+            and checked_at - last_checked_at < answer_key_cache.trust_sec
+        ):
+            return answer_key
+
+    version = await models.Quiz.get_answer_key_version(db=db, id=quiz_id)
+    if version is None:
+        return None
+
+    if cached is not None and cached[0] == version:
+        answer_key = cached[1]
+    else:
+        answer_key = AnswerKey.compile(
+            await models.Quiz.get_answer_key(db=db, id=quiz_id)
+        )
+    answer_key_cache.set(quiz_id, (version, answer_key, checked_at))
+
+    return answer_key
+
+
+async def regrade_quiz(db: AsyncSession, quiz_id: int) -> int:
+    """
+    Score again all the attempts of the quiz with its current answer key (e.g. after
+    fixing the correct option of a question), and return the number of attempts
+    whose score changed.
+    """
+    answer_key = AnswerKey.compile(await models.Quiz.get_answer_key(db=db, id=quiz_id))
+    attempts = await models.QuizAttempt.get_scores_by_quiz(db=db, quiz_id=quiz_id)
+    if not attempts:
+        return 0
+
+    attempt_ids = int_array([attempt_id for attempt_id, _ in attempts])
+    answers = await models.QuizAttempt.get_answers_by_quiz(db=db, quiz_id=quiz_id)
+    # attempt ids are sorted, so the position of each one is its index in the batch
+    attempt_index = np.searchsorted(
+        attempt_ids, int_array([attempt_id for attempt_id, _, _ in answers])
+    )
+    scores = answer_key.score_arrays(
+        attempt_index=attempt_index,
+        question_ids=int_array([question_id for _, question_id, _ in answers]),
+        option_ids=int_array([option_id for _, _, option_id in answers]),
+        n_attempts=len(attempts),
+    )
+
+    changed = {
+        attempt_id: int(score)
+        for (attempt_id, old_score), score in zip(attempts, scores, strict=True)
+        if old_score != score
+    }
+    await models.QuizAttempt.update_scores(db=db, scores=changed)
+    if changed:
+        leaderboards.invalidate(quiz_id)
+        await recompute_histograms(db=db, quiz_id=quiz_id)
+
+    return len(changed)
@@ -1,17 +1,38 @@
 from datetime import datetime, timedelta
+from typing import Any, Callable, TypeVar
 
 from fastapi import HTTPException, status
 from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import ValidationError
 
+from app.core.cache import TTLCache
+from app.core.executor import BoundedExecutor, ExecutorSaturatedError
 from app.core.settings import Settings, get_settings
-from app.schemas import TokenPayload
+from app.schemas import TokenPayload, UserReturn
+
+T = TypeVar("T")
 
 settings = get_settings()
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is slow on purpose (~200 ms), so it must not run in the event loop
+hashing_pool = BoundedExecutor(
+    kind=settings.HASH_POOL_KIND,
+    max_workers=settings.HASH_POOL_WORKERS,
+    max_queue=settings.HASH_POOL_MAX_QUEUE,
+)
+
+# verified access tokens (token -> user id) and authenticated users (user id -> user),
+# to avoid decoding the same token and loading the same user on every request
+token_cache: TTLCache[str, int] = TTLCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE, ttl_sec=settings.AUTH_CACHE_TTL_SEC
+)
+principal_cache: TTLCache[int, UserReturn] = TTLCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE, ttl_sec=settings.AUTH_CACHE_TTL_SEC
+)
+
 
 def decode_token(token: str, settings: Settings) -> TokenPayload:
     try:
@@ -58,3 +79,22 @@ def get_password_hash(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+async def _run_in_hashing_pool(func: Callable[..., T], *args: Any) -> T:
+    try:
+        return await hashing_pool.run(func, *args)
+    except ExecutorSaturatedError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent login requests, try again later",
+            headers={"Retry-After": "1"},
+        ) from exc
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_in_hashing_pool(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hashing_pool(verify_password, plain_password, hashed_password)
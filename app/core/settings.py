@@ -1,5 +1,6 @@
 import secrets
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -19,10 +20,78 @@ class Settings(BaseSettings):
     POSTGRES_SERVER: str = "postgres"
     POSTGRES_PORT: int = 5432
 
+    # connection pool (ignored for SQLite, which opens a connection per checkout)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SEC: int = 1800
+    DB_POOL_TIMEOUT_SEC: float = 30
+    # pessimistic: ping each connection on checkout (one extra round trip)
+    # optimistic: no ping, stale connections are only discarded when they fail
+    DB_POOL_PRE_PING: Literal["pessimistic", "optimistic"] = "pessimistic"
+    # asyncpg prepared statements cached per connection (0 to disable the cache)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # read replicas used by read-only endpoints (JSON list of database URLs)
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_STRATEGY: Literal["round_robin", "least_busy"] = "round_robin"
+    # time to wait before trying to use a replica again after failing to connect
+    DB_REPLICA_RETRY_SEC: int = 30
+    # cached responses are read from the primary for this long after a write, so
+    # rows that the replicas don't have yet are not cached as if nothing changed
+    DB_REPLICA_MAX_LAG_SEC: float = 5
+
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MIN: int = 30
 
+    # pool used to hash/verify passwords outside of the event loop
+    HASH_POOL_KIND: Literal["thread", "process"] = "thread"
+    HASH_POOL_WORKERS: int = 4
+    HASH_POOL_MAX_QUEUE: int = 64
+
+    # cache of verified tokens and authenticated users (0 to disable it)
+    AUTH_CACHE_TTL_SEC: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10_000
+
+    # submitted quiz attempts are written in batches of up to ATTEMPT_FLUSH_SIZE
+    # attempts, at least every ATTEMPT_FLUSH_INTERVAL_SEC seconds
+    ATTEMPT_FLUSH_SIZE: int = 500
+    ATTEMPT_FLUSH_INTERVAL_SEC: float = 0.05
+
+    # cache of compiled answer keys (0 to disable it), entries of quizzes that change
+    # are replaced right away, the TTL only limits how long unused ones are kept
+    ANSWER_KEY_CACHE_TTL_SEC: int = 3600
+    ANSWER_KEY_CACHE_MAX_SIZE: int = 1000
+    # cached answer keys are used without reading the answer key version of their
+    # quiz for this long after it was read (changes made by other processes are
+    # used after at most this time, 0 to always read it)
+    ANSWER_KEY_TRUST_SEC: float = 1
+
+    # best LEADERBOARD_SIZE attempts of the most LEADERBOARD_MAX_QUIZZES recently read
+    # quizzes kept in memory, rebuilt after LEADERBOARD_TTL_SEC seconds to include
+    # the attempts submitted to other processes
+    LEADERBOARD_SIZE: int = 100
+    LEADERBOARD_MAX_QUIZZES: int = 1000
+    LEADERBOARD_TTL_SEC: int = 10
+
+    # score histograms used for percentiles, with buckets of SCORE_BUCKET_WIDTH
+    # points (1 for exact percentiles, run app.cli.recompute_histograms after
+    # changing it), kept in memory like the leaderboards
+    SCORE_BUCKET_WIDTH: int = 1
+    SCORE_HISTOGRAM_MAX_QUIZZES: int = 1000
+    SCORE_HISTOGRAM_TTL_SEC: int = 10
+
+    # serialized responses of quiz and question reads (0 to disable it), entries are
+    # invalidated when this process writes the rows they were built from, the TTL
+    # limits how long writes done by other processes are not seen
+    RESPONSE_CACHE_TTL_SEC: int = 10
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # encode the responses of the endpoints that return entities with orjson instead
+    # of the json module (the cached list and entity endpoints are always encoded by
+    # pydantic, with TypeAdapters built once)
+    FAST_JSON_RESPONSES: bool = False
+
     model_config = SettingsConfigDict(env_file=".env")
 
     def get_db_url(self) -> str:
@@ -1,13 +1,35 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from app.api.api import api_router
 from app.core.custom_logging import configure_logger
+from app.core.security import hashing_pool
 from app.core.settings import get_settings
+from app.models.attempt_writer import attempt_writer
 from app.models.database import init_db
 
 logger = configure_logger()
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # write the attempts still pending before exiting
+    await attempt_writer.close()
+    hashing_pool.shutdown()
+
 
-app = FastAPI(title="Quiz App")
+app = FastAPI(
+    title="Quiz App",
+    lifespan=lifespan,
+    # orjson is installed with fastapi[all]
+    default_response_class=(
+        ORJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
+    ),
+)
 app.include_router(api_router, prefix="/api")
 
 
@@ -15,7 +37,7 @@ if __name__ == "__main__":
     import asyncio  # noqa: I001
     import uvicorn
 
-    if get_settings().ENVIRONMENT != "prod":
+    if settings.ENVIRONMENT != "prod":
         asyncio.run(init_db())
         reload = True
     else:
@@ -3,4 +3,7 @@
 from .answer_options import AnswerOption
 from .question import Question
 from .quiz import Quiz
+from .quiz_attempt import QuizAttempt
+from .score_bucket import ScoreBucket
 from .user import User
+from .user_answer import UserAnswer
@@ -1,9 +1,10 @@
 from typing import TYPE_CHECKING, Self
 
-from sqlalchemy import Boolean, ForeignKey, String
+from sqlalchemy import Boolean, ForeignKey, String, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.response_cache import response_cache
 from app.models.database import Base
 from app.schemas import AnswerOptionCreate
 
@@ -14,7 +15,9 @@ if TYPE_CHECKING:
 class AnswerOption(Base):
     __tablename__ = "answer_options"
 
-    question_id: Mapped[int] = mapped_column(ForeignKey("questions.id"))
+    question_id: Mapped[int] = mapped_column(
+        ForeignKey("questions.id", ondelete="CASCADE"), index=True
+    )
     content: Mapped[str] = mapped_column(String(256), nullable=False)
     is_correct: Mapped[bool] = mapped_column(Boolean, default=False)
 
@@ -23,6 +26,30 @@ class AnswerOption(Base):
         "Question", back_populates="answer_options"
     )
 
+    @classmethod
+    def _after_write(cls, db_obj: Self) -> None:
+        # imported here to avoid circular imports
+        from app.core.scoring import answer_key_cache
+
+        # the quiz of the answer option is not loaded, so all the cached answer keys
+        # have their version checked again
+        answer_key_cache.invalidate()
+        # the responses with the answer options of a question are tagged with it
+        response_cache.invalidate(("question", db_obj.question_id))
+
+    @classmethod
+    async def _before_commit(cls, db: AsyncSession, db_obj: Self) -> None:
+        # imported here to avoid circular imports
+        from app.models.question import Question
+        from app.models.quiz import Quiz
+
+        await Quiz.bump_answer_key_version(
+            db,
+            id=select(Question.quiz_id)
+            .where(Question.id == db_obj.question_id)
+            .scalar_subquery(),
+        )
+
     @classmethod
     async def create(cls, db: AsyncSession, option: AnswerOptionCreate) -> Self:
         new_option = cls(
@@ -32,7 +59,8 @@ class AnswerOption(Base):
         )
 
         db.add(new_option)
+        await cls._before_commit(db, new_option)
         await db.commit()
-        await db.refresh(new_option)
+        cls._after_write(new_option)
 
         return new_option
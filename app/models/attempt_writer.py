@@ -0,0 +1,174 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Any, AsyncContextManager, Callable
+
+from fastapi import Depends
+from loguru import logger
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import get_settings
+from app.models.database import AsyncSessionLocal
+from app.models.quiz_attempt import QuizAttempt
+from app.schemas import QuizAttemptScored
+
+# (attempt, future set to its (id, attempted_at) once it is committed)
+PendingAttempt = tuple[QuizAttemptScored, "asyncio.Future[tuple[int, datetime]]"]
+
+
+@dataclass
+class WriterStats:
+    flushes: int = 0
+    written: int = 0
+    failed: int = 0
+    max_batch: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "flushes": self.flushes,
+            "written": self.written,
+            "failed": self.failed,
+            "max_batch": self.max_batch,
+        }
+
+
+class AttemptWriter:
+    """
+    Write-behind buffer for quiz attempts.
+
+    Submitted attempts (already validated and scored) are kept in memory and written
+    by a background task in batches, when flush_size attempts are pending or every
+    flush_interval_sec seconds, with one multi-row INSERT per table and a single
+    COMMIT per batch. Submitters wait until their attempt is committed, so a result
+    is never shown for an attempt that could still be lost.
+
+    The background task is started on the first submission.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+        flush_size: int,
+        flush_interval_sec: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.flush_size = flush_size
+        self.flush_interval_sec = flush_interval_sec
+        self.stats = WriterStats()
+        self._pending: list[PendingAttempt] = []
+        self._flush_now = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, attempt: QuizAttemptScored) -> tuple[int, datetime]:
+        """
+        Queue the attempt and wait until it is committed, returning its
+        (id, attempted_at).
+        """
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+        future: asyncio.Future[
+            tuple[int, datetime]
+        ] = asyncio.get_running_loop().create_future()
+        self._pending.append((attempt, future))
+        if len(self._pending) >= self.flush_size:
+            self._flush_now.set()
+
+        return await future
+
+    async def flush(self) -> None:
+        """
+        Write all the pending attempts.
+        """
+        while self._pending:
+            batch = self._pending[: self.flush_size]
+            del self._pending[: self.flush_size]
+            await self._write(batch)
+
+    async def close(self) -> None:
+        """
+        Stop the background task, after writing all the pending attempts.
+        """
+        if self._task is not None:
+            self._closing = True
+            self._flush_now.set()
+            await self._task
+            self._task = None
+
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(
+                    self._flush_now.wait(), timeout=self.flush_interval_sec
+                )
+            except TimeoutError:
+                pass
+
+            self._flush_now.clear()
+            await self.flush()
+
+    async def _write(self, batch: list[PendingAttempt]) -> None:
+        try:
+            async with self.session_factory() as db:
+                try:
+                    created = await QuizAttempt.create_batch(
+                        db=db, attempts=[attempt for attempt, _ in batch]
+                    )
+                except Exception:
+                    await db.rollback()
+                    raise
+        except IntegrityError as e:
+            if len(batch) == 1:
+                self._fail(batch, e)
+                return
+
+            # e.g. the quiz of one of the attempts was deleted after it was submitted,
+            # so write them one by one to only fail that one
+            logger.warning(
+                f"Failed to write {len(batch)} attempts, retrying one by one"
+            )
+            for pending in batch:
+                await self._write([pending])
+            return
+        except Exception as e:
+            logger.exception(f"Failed to write {len(batch)} attempts")
+            self._fail(batch, e)
+            return
+
+        self.stats.flushes += 1
+        self.stats.written += len(batch)
+        self.stats.max_batch = max(self.stats.max_batch, len(batch))
+        for (_, future), result in zip(batch, created, strict=True):
+            # the submitter may have been cancelled in the meantime
+            if not future.done():
+                future.set_result(result)
+
+    def _fail(self, batch: list[PendingAttempt], error: Exception) -> None:
+        self.stats.failed += len(batch)
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+
+settings = get_settings()
+attempt_writer = AttemptWriter(
+    session_factory=AsyncSessionLocal,
+    flush_size=settings.ATTEMPT_FLUSH_SIZE,
+    flush_interval_sec=settings.ATTEMPT_FLUSH_INTERVAL_SEC,
+)
+
+
+def get_attempt_writer() -> AttemptWriter:
+    return attempt_writer
+
+
+AttemptWriterDep = Annotated[AttemptWriter, Depends(get_attempt_writer)]
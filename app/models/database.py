@@ -1,20 +1,51 @@
-from typing import Annotated, Any, AsyncGenerator, Self
+from time import monotonic
+from typing import Annotated, Any, AsyncContextManager, AsyncGenerator, Callable, Self
 
 from fastapi import Depends
-from fastapi.encoders import jsonable_encoder
 from loguru import logger
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import delete, event, inspect, select, update
 from sqlalchemy.ext.asyncio import (
     AsyncAttrs,
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql import func
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import DateTime
 
-from app.core.settings import get_settings
+from app.core.response_cache import response_cache
+from app.core.settings import Settings, get_settings
+from app.models.pool import InstrumentedAsyncQueuePool, InstrumentedNullPool
+from app.models.replicas import ReplicaRouter
+
+
+class now(FunctionElement):
+    """
+    Current timestamp generated by the database.
+
+    Same as func.now(), except for SQLite, where CURRENT_TIMESTAMP has no fractional
+    seconds. Timestamps are stored as strings in SQLite, so they must have the same
+    format as the ones sent by SQLAlchemy to be compared correctly.
+    """
+
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(now)
+def _compile_now(element, compiler, **kwargs):
+    return compiler.process(func.now(), **kwargs)
+
+
+@compiles(now, "sqlite")
+def _compile_now_sqlite(element, compiler, **kwargs):
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now')"
 
 
 class Base(AsyncAttrs, DeclarativeBase):
@@ -27,6 +58,25 @@ class Base(AsyncAttrs, DeclarativeBase):
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
+    # fetch server generated values (e.g. created_at) in the INSERT/UPDATE statement
+    # itself (with RETURNING), instead of expiring them and loading them later
+    __mapper_args__ = {"eager_defaults": True}
+
+    @classmethod
+    def _after_write(cls, db_obj: Self) -> None:
+        """
+        Hook called after an entity is created, updated or deleted (once committed),
+        so models can invalidate any data cached in the process for that entity.
+        """
+
+    @classmethod
+    async def _before_commit(cls, db: AsyncSession, db_obj: Self) -> None:
+        """
+        Hook called in the same transaction as the statement that creates, updates
+        or deletes an entity (right before it is committed), so models can update
+        any data derived from that entity.
+        """
+
     @classmethod
     async def get(cls, db: AsyncSession, id: int) -> Self | None:
         result = await db.execute(select(cls).where(cls.id == id))
@@ -36,48 +86,127 @@ class Base(AsyncAttrs, DeclarativeBase):
     async def update(
         cls, db: AsyncSession, current: Self, new: BaseModel | dict[str, Any]
     ) -> Self:
+        """
+        Update only the columns whose value changed (and updated_at, if the model
+        has it), getting the new row back in the same statement with RETURNING.
+        """
         if isinstance(new, dict):
             update_data = new
         else:
             # exclude_unset=True to avoid updating to default values
             update_data = new.model_dump(exclude_unset=True)
 
-        current_data = jsonable_encoder(current)
-        for field in current_data:
-            if field in update_data:
-                setattr(current, field, update_data[field])
+        column_attrs = inspect(cls).column_attrs
+        changes = {
+            attr.key: update_data[attr.key]
+            for attr in column_attrs
+            if attr.key in update_data
+            and attr.key != "id"
+            and getattr(current, attr.key) != update_data[attr.key]
+        }
+        if not changes:
+            return current
 
-        if hasattr(current, "updated_at"):
-            current.updated_at = func.now()
+        if "updated_at" in column_attrs:
+            changes["updated_at"] = now()
 
-        db.add(current)
+        result = await db.execute(
+            update(cls)
+            .where(cls.id == current.id)
+            .values(**changes)
+            .returning(*[attr.class_attribute for attr in column_attrs])
+            .execution_options(synchronize_session=False)
+        )
+        row = result.one()
+        await cls._before_commit(db, current)
         await db.commit()
-        await db.refresh(current)
+
+        # load the returned values without flagging the entity as modified
+        for attr in column_attrs:
+            set_committed_value(current, attr.key, row._mapping[attr.key])
+
+        cls._after_write(current)
 
         return current
 
     @classmethod
     async def delete(cls, db: AsyncSession, db_obj) -> Self:
-        await db.delete(db_obj)
+        """
+        Delete the entity with a single statement, related rows (if any) are deleted
+        by the database itself (ON DELETE CASCADE) without loading them.
+        """
+        await db.execute(delete(cls).where(cls.id == db_obj.id))
+        await cls._before_commit(db, db_obj)
         await db.commit()
+        cls._after_write(db_obj)
 
         return db_obj
 
     @classmethod
     async def delete_by_id(cls, db: AsyncSession, id: int) -> Self | None:
-        db_obj = await cls.get(db, id)
+        result = await db.execute(delete(cls).where(cls.id == id).returning(cls))
+        db_obj = result.scalar()
+        if db_obj:
+            await cls._before_commit(db, db_obj)
+        await db.commit()
         if db_obj:
-            await db.delete(db_obj)
-            await db.commit()
+            cls._after_write(db_obj)
 
         return db_obj
 
 
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys = ON")
+    cursor.close()
+
+
+def create_engine(url: str, settings: Settings) -> AsyncEngine:
+    pre_ping = settings.DB_POOL_PRE_PING == "pessimistic"
+    if url.startswith("sqlite"):
+        # file based SQLite databases don't need a pool of connections
+        engine = create_async_engine(
+            url,
+            poolclass=InstrumentedNullPool,
+            pool_pre_ping=pre_ping,
+            echo=settings.ECHO_SQL,
+        )
+        # foreign keys (and ON DELETE CASCADE) are disabled by default in SQLite
+        event.listen(engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+        return engine
+
+    connect_args = {}
+    if "asyncpg" in url:
+        connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE_SEC,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SEC,
+        pool_pre_ping=pre_ping,
+        connect_args=connect_args,
+        echo=settings.ECHO_SQL,
+    )
+
+
 settings = get_settings()
-async_engine = create_async_engine(
-    settings.get_db_url(), pool_pre_ping=True, echo=settings.ECHO_SQL
+async_engine = create_engine(settings.get_db_url(), settings)
+# expire_on_commit=False to keep using the entities after a commit without loading
+# them again (see https://docs.sqlalchemy.org/en/20/orm/extensions/asyncio.html)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False, future=True
+)
+
+replica_router = ReplicaRouter(
+    primary=async_engine,
+    replicas=[create_engine(url, settings) for url in settings.DB_REPLICA_URLS],
+    session_factory=AsyncSessionLocal,
+    strategy=settings.DB_REPLICA_STRATEGY,
+    retry_sec=settings.DB_REPLICA_RETRY_SEC,
 )
-AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, future=True)
 
 
 async def init_db():
@@ -98,3 +227,51 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 
 # type alias for the database session
 AsyncSessionDep = Annotated[AsyncSession, Depends(get_session)]
+
+
+def get_session_factory() -> Callable[[], AsyncContextManager[AsyncSession]]:
+    """
+    Dependency to open a session only for part of a request, e.g. to give its
+    connection back to the pool before waiting for something else (instead of
+    keeping it for the whole request like get_session).
+    """
+    return AsyncSessionLocal
+
+
+# type alias for the database session factory
+SessionFactoryDep = Annotated[
+    Callable[[], AsyncContextManager[AsyncSession]], Depends(get_session_factory)
+]
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to create/close a new read-only session per request, bound to one of
+    the read replicas (or to the primary database if there are none available).
+    """
+    async with replica_router.session() as session:
+        yield session
+
+
+# type alias for the read-only database session
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+
+
+def get_read_session_factory() -> Callable[[], AsyncContextManager[AsyncSession]]:
+    """
+    Dependency to open a read-only session only if needed (e.g. on cache misses),
+    instead of opening one for every request like get_read_session.
+
+    The session is bound to the primary database for DB_REPLICA_MAX_LAG_SEC seconds
+    after the response cache is invalidated: a lagging replica could still return
+    the rows from before the write, and they would be cached as the new response.
+    """
+    if monotonic() - response_cache.invalidated_at < settings.DB_REPLICA_MAX_LAG_SEC:
+        return AsyncSessionLocal
+    return replica_router.session
+
+
+# type alias for the read-only database session factory
+ReadSessionFactoryDep = Annotated[
+    Callable[[], AsyncContextManager[AsyncSession]], Depends(get_read_session_factory)
+]
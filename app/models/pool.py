@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+
+@dataclass
+class PoolMetrics:
+    checkouts: int = 0
+    # new connections opened above pool_size (max_overflow)
+    overflow_events: int = 0
+    # checkouts that failed after waiting pool_timeout seconds
+    timeouts: int = 0
+    wait_total_sec: float = 0.0
+    wait_max_sec: float = 0.0
+
+    def record_checkout(self, wait_sec: float) -> None:
+        self.checkouts += 1
+        self.wait_total_sec += wait_sec
+        self.wait_max_sec = max(self.wait_max_sec, wait_sec)
+
+    @property
+    def wait_avg_sec(self) -> float:
+        return self.wait_total_sec / self.checkouts if self.checkouts else 0.0
+
+
+class InstrumentedPoolMixin:
+    """
+    Record how long it takes to get a connection from the pool (including the
+    pre-ping and the time needed to open a new connection, if any) and how many
+    times the pool has to overflow.
+
+    The metrics are kept when the pool is recreated (e.g. on engine.dispose()).
+    """
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        new_pool = super().recreate()  # type: ignore[misc]
+        new_pool.metrics = self.metrics
+        return new_pool
+
+    def connect(self):
+        start = perf_counter()
+        try:
+            connection = super().connect()  # type: ignore[misc]
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+
+        self.metrics.record_checkout(perf_counter() - start)
+        return connection
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    def _inc_overflow(self) -> bool:
+        created = super()._inc_overflow()
+        # the overflow counter starts at -pool_size, so it only becomes positive
+        # once all the connections of the pool are in use
+        if created and self._overflow > 0:
+            self.metrics.overflow_events += 1
+
+        return created
+
+
+class InstrumentedNullPool(InstrumentedPoolMixin, NullPool):
+    pass
+
+
+def get_pool_metrics(pool: Pool) -> dict[str, Any]:
+    metrics: PoolMetrics | None = getattr(pool, "metrics", None)
+    report: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        report.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+
+    if metrics:
+        report.update(
+            checkouts=metrics.checkouts,
+            overflow_events=metrics.overflow_events,
+            timeouts=metrics.timeouts,
+            wait_avg_sec=metrics.wait_avg_sec,
+            wait_max_sec=metrics.wait_max_sec,
+        )
+
+    return report
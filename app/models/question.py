@@ -1,38 +1,62 @@
 from datetime import datetime
-from typing import TYPE_CHECKING, Self
+from typing import TYPE_CHECKING, Any, Self
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, select
+from sqlalchemy import DateTime, ForeignKey, Integer, String, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, joinedload, mapped_column, relationship
-from sqlalchemy.sql import func
 
-from app.models.database import Base
-from app.schemas import QuestionCreate
+from app.core.response_cache import response_cache
+from app.models.answer_options import AnswerOption
+from app.models.database import Base, now
+from app.schemas import QuestionCreate, QuestionWithOptionsCreate
 
 if TYPE_CHECKING:
-    from app.models.answer_options import AnswerOption
     from app.models.quiz import Quiz
 
 
 class Question(Base):
     __tablename__ = "questions"
 
-    quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id"))
+    quiz_id: Mapped[int] = mapped_column(
+        ForeignKey("quizzes.id", ondelete="CASCADE"), index=True
+    )
     content: Mapped[str] = mapped_column(String(256), nullable=False)
     type: Mapped[str] = mapped_column(String(64), nullable=False)
     points: Mapped[int] = mapped_column(Integer)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), server_default=now()
     )
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    # set by the database on insert (and by Base.update)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now())
 
     # types as strings (i.e. "Quiz") to avoid circular dependencies
     quiz: Mapped["Quiz"] = relationship("Quiz", back_populates="questions")
 
     answer_options: Mapped[list["AnswerOption"]] = relationship(
-        "AnswerOption", back_populates="question", cascade="delete, delete-orphan"
+        "AnswerOption",
+        back_populates="question",
+        cascade="delete, delete-orphan",
+        # answer options are deleted by the database (ON DELETE CASCADE)
+        passive_deletes=True,
     )
 
+    @classmethod
+    def _after_write(cls, db_obj: Self) -> None:
+        # imported here to avoid circular imports
+        from app.core.scoring import answer_key_cache
+
+        answer_key_cache.invalidate(db_obj.quiz_id)
+        response_cache.invalidate(
+            ("question", db_obj.id), ("quiz_questions", db_obj.quiz_id)
+        )
+
+    @classmethod
+    async def _before_commit(cls, db: AsyncSession, db_obj: Self) -> None:
+        # imported here to avoid circular imports
+        from app.models.quiz import Quiz
+
+        await Quiz.bump_answer_key_version(db, id=db_obj.quiz_id)
+
     @classmethod
     async def create(cls, db: AsyncSession, question: QuestionCreate) -> Self:
         new_question = cls(
@@ -41,18 +65,127 @@ class Question(Base):
             type=question.type,
             points=question.points,
         )
-        new_question.updated_at = func.now()
         db.add(new_question)
+        await cls._before_commit(db, new_question)
         await db.commit()
-        await db.refresh(new_question)
+        cls._after_write(new_question)
 
         return new_question
 
+    @classmethod
+    async def create_batch(
+        cls,
+        db: AsyncSession,
+        quiz_id: int,
+        questions: list[QuestionWithOptionsCreate],
+    ) -> list[tuple[int, list[int]]]:
+        """
+        Create the questions of a quiz and their answer options in a single
+        transaction, using multi-row INSERT statements (one for all the questions
+        and one for all the answer options).
+
+        The ids of the questions must be returned in the same order as the questions
+        were given, which SQLAlchemy can only guarantee with a single statement on
+        some databases (e.g. PostgreSQL); otherwise they are inserted one by one.
+        The same applies to the answer options, whose ids are grouped by question in
+        the order they were given.
+
+        Returns the (question id, answer option ids) of each question, in order.
+        """
+        # imported here to avoid circular imports
+        from app.core.scoring import answer_key_cache
+        from app.models.quiz import Quiz
+
+        result = await db.execute(
+            insert(cls).returning(cls.id, sort_by_parameter_order=True),
+            [
+                {
+                    "quiz_id": quiz_id,
+                    "content": question.content,
+                    "type": question.type,
+                    "points": question.points,
+                }
+                for question in questions
+            ],
+        )
+        question_ids = list(result.scalars())
+
+        options = [
+            {
+                "question_id": question_id,
+                "content": option.content,
+                "is_correct": option.is_correct,
+            }
+            for question_id, question in zip(question_ids, questions, strict=True)
+            for option in question.answer_options
+        ]
+        option_ids: dict[int, list[int]] = {id: [] for id in question_ids}
+        if options:
+            result = await db.execute(
+                insert(AnswerOption).returning(
+                    AnswerOption.id,
+                    AnswerOption.question_id,
+                    sort_by_parameter_order=True,
+                ),
+                options,
+            )
+            for option_id, question_id in result.tuples():
+                option_ids[question_id].append(option_id)
+
+        await Quiz.bump_answer_key_version(db, id=quiz_id)
+        await db.commit()
+        answer_key_cache.invalidate(quiz_id)
+        response_cache.invalidate(("quiz_questions", quiz_id))
+
+        return [(id, option_ids[id]) for id in question_ids]
+
     @classmethod
     async def get_by_quiz_id(cls, db: AsyncSession, quiz_id: int) -> list[Self]:
         result = await db.execute(select(cls).where(cls.quiz_id == quiz_id))
         return list(result.scalars().all())
 
+    @classmethod
+    async def get_rows_by_quiz_id(
+        cls, db: AsyncSession, quiz_id: int
+    ) -> list[dict[str, Any]] | None:
+        """
+        Get the columns of the questions of the quiz (sorted by id) as plain dicts
+        instead of entities, or None if the quiz does not exist (checked in the same
+        query, with an outer join from the quiz).
+        """
+        # imported here to avoid circular imports
+        from app.models.quiz import Quiz
+
+        result = await db.execute(
+            select(
+                cls.id,
+                cls.quiz_id,
+                cls.content,
+                cls.type,
+                cls.points,
+                cls.created_at,
+                cls.updated_at,
+            )
+            .select_from(Quiz)
+            .outerjoin(Quiz.questions)
+            .where(Quiz.id == quiz_id)
+            .order_by(cls.id)
+        )
+        rows = [dict(row) for row in result.mappings()]
+        if not rows:
+            return None
+
+        # a quiz without questions gives a single row of NULLs
+        return [row for row in rows if row["id"] is not None]
+
+    @classmethod
+    async def get_updated_at(cls, db: AsyncSession, id: int) -> datetime | None:
+        """
+        Get when the question was last updated (None if it does not exist).
+        """
+        result = await db.execute(select(cls.updated_at).where(cls.id == id))
+        return result.scalar()
+
     @classmethod
     async def get_with_answers(cls, db: AsyncSession, id: int) -> Self | None:
         result = await db.execute(
@@ -60,3 +193,19 @@ class Question(Base):
         )
 
         return result.scalar()
+
+    @classmethod
+    async def get_with_quiz_owner(
+        cls, db: AsyncSession, id: int
+    ) -> tuple[Self, int] | None:
+        """
+        Get the question together with the id of the user that created its quiz.
+        """
+        # imported here to avoid circular imports
+        from app.models.quiz import Quiz
+
+        result = await db.execute(
+            select(cls, Quiz.created_by).join(cls.quiz).where(cls.id == id)
+        )
+        row = result.first()
+        return (row[0], row[1]) if row else None
@@ -1,56 +1,206 @@
 from datetime import datetime
-from typing import TYPE_CHECKING, Self
+from typing import TYPE_CHECKING, Any, AsyncIterator, Self, Sequence, TypeVar
 
-from sqlalchemy import DateTime, ForeignKey, String, desc, select
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Select,
+    String,
+    desc,
+    func,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Mapped, joinedload, mapped_column, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.orm import (
+    Mapped,
+    joinedload,
+    mapped_column,
+    relationship,
+    selectinload,
+)
 
-from app.models.database import Base
+from app.core.response_cache import response_cache
+from app.models.database import Base, now
+from app.models.search import match_query, search_terms
 from app.schemas import QuizCreate
 
 if TYPE_CHECKING:
     from app.models.question import Question
     from app.models.user import User
 
+T = TypeVar("T", bound=tuple[Any, ...])
+
 
 class Quiz(Base):
     __tablename__ = "quizzes"
+    __table_args__ = (
+        # quizzes are listed from newest to oldest (id to break ties)
+        Index("ix_quizzes_created_at_id", "created_at", "id"),
+    )
 
     title: Mapped[str] = mapped_column(String(128), nullable=False, index=True)
     description: Mapped[str] = mapped_column(String(512), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), server_default=now()
+    )
+    # set by the database on insert (and by Base.update)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now())
+    created_by: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    # incremented whenever the questions or answer options of the quiz change, so
+    # answer keys cached in any process can tell if they are still valid
+    answer_key_version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0"
     )
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
-    created_by: Mapped[int] = mapped_column(ForeignKey("users.id"))
 
     # have to use "Question" to avoid circular dependencies
     questions: Mapped[list["Question"]] = relationship(
-        "Question", back_populates="quiz", cascade="delete, delete-orphan"
+        "Question",
+        back_populates="quiz",
+        cascade="delete, delete-orphan",
+        # questions are deleted by the database (ON DELETE CASCADE)
+        passive_deletes=True,
     )
     user: Mapped["User"] = relationship("User", back_populates="quizzes")
 
+    @classmethod
+    def _after_write(cls, db_obj: Self) -> None:
+        # imported here to avoid circular imports
+        from app.core.leaderboard import leaderboards
+        from app.core.percentiles import score_histograms
+        from app.core.scoring import answer_key_cache
+
+        # the id could be reused by a new quiz (e.g. in SQLite), with the same version
+        answer_key_cache.invalidate(db_obj.id)
+        leaderboards.invalidate(db_obj.id)
+        score_histograms.invalidate(db_obj.id)
+        # the questions of a deleted quiz are deleted too
+        response_cache.invalidate(("quiz", db_obj.id), "quizzes")
+
     @classmethod
     async def create(cls, db: AsyncSession, quiz: QuizCreate) -> Self:
         new_quiz = cls(
             title=quiz.title, description=quiz.description, created_by=quiz.created_by
         )
-        new_quiz.updated_at = func.now()
         db.add(new_quiz)
         await db.commit()
-        await db.refresh(new_quiz)
+        cls._after_write(new_quiz)
 
         return new_quiz
 
     @classmethod
     async def get_multiple(
-        cls, db: AsyncSession, offset: int = 0, limit: int = 25
+        cls,
+        db: AsyncSession,
+        offset: int = 0,
+        limit: int = 25,
+        after: tuple[datetime, int] | None = None,
     ) -> list[Self]:
+        """
+        Get quizzes sorted from newest to oldest. If after=(created_at, id) is given,
+        the quizzes that come after that one are returned (keyset pagination, which
+        uses the index instead of skipping rows like offset does).
+        """
+        query = cls._page(select(cls), offset=offset, limit=limit, after=after)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    @classmethod
+    async def get_multiple_rows(
+        cls,
+        db: AsyncSession,
+        offset: int = 0,
+        limit: int = 25,
+        after: tuple[datetime, int] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Same as get_multiple, but returning the columns of the quizzes as plain dicts
+        (from Core rows), which are much cheaper to build than entities tracked by
+        the session (and to validate with pydantic), for responses that only
+        serialize them.
+        """
+        query = cls._page(
+            select(
+                cls.id,
+                cls.title,
+                cls.description,
+                cls.created_by,
+                cls.created_at,
+                cls.updated_at,
+            ),
+            offset=offset,
+            limit=limit,
+            after=after,
+        )
+        result = await db.execute(query)
+        return [dict(row) for row in result.mappings()]
+
+    @classmethod
+    async def search(
+        cls,
+        db: AsyncSession,
+        query: str,
+        offset: int = 0,
+        limit: int = 25,
+    ) -> list[dict[str, Any]]:
+        """
+        Full-text search of quizzes by their title, description and the content of
+        their questions, as dicts with the columns of the quizzes and their rank
+        (sorted from most to least relevant).
+
+        Every word of the query must appear (after stemming) in the title and
+        description of the quiz or in one of its questions, and the rank of a quiz
+        adds up all its matches (see app.models.search). All the matches are ranked,
+        but only the quizzes of the requested page are loaded.
+        """
+        if not search_terms(query):
+            return []
+
+        connection = await db.connection()
+        matches = match_query(connection.dialect.name, query).subquery()
+        rank = func.sum(matches.c.rank).label("rank")
+        ranks = (
+            select(matches.c.quiz_id, rank)
+            .group_by(matches.c.quiz_id)
+            .order_by(desc(rank), matches.c.quiz_id)
+            .offset(offset)
+            .limit(limit)
+            .subquery()
+        )
         result = await db.execute(
-            select(cls).order_by(desc(cls.created_at)).offset(offset).limit(limit)
+            select(
+                cls.id,
+                cls.title,
+                cls.description,
+                cls.created_by,
+                cls.created_at,
+                cls.updated_at,
+                ranks.c.rank,
+            )
+            .join(ranks, ranks.c.quiz_id == cls.id)
+            .order_by(desc(ranks.c.rank), cls.id)
         )
-        return list(result.scalars().all())
+        return [dict(row) for row in result.mappings()]
+
+    @classmethod
+    def _page(
+        cls,
+        query: Select[T],
+        offset: int,
+        limit: int,
+        after: tuple[datetime, int] | None,
+    ) -> Select[T]:
+        query = query.order_by(desc(cls.created_at), desc(cls.id))
+        if after is not None:
+            query = query.where(tuple_(cls.created_at, cls.id) < after)
+        else:
+            query = query.offset(offset)
+
+        return query.limit(limit)
 
     @classmethod
     async def get_with_questions(cls, db: AsyncSession, id: int) -> Self | None:
@@ -59,7 +209,122 @@ class Quiz(Base):
         )
         return result.scalar()
 
+    @classmethod
+    async def get_full(cls, db: AsyncSession, id: int) -> Self | None:
+        """
+        Get the quiz with its questions and their answer options, using one query
+        per level (3 in total) whatever the number of questions.
+        """
+        # imported here to avoid circular imports
+        from app.models.question import Question
+
+        result = await db.execute(
+            select(cls)
+            .where(cls.id == id)
+            .options(selectinload(cls.questions).selectinload(Question.answer_options))
+        )
+        return result.scalar()
+
+    @classmethod
+    async def stream_full(
+        cls, db: AsyncSession, batch_size: int = 500
+    ) -> AsyncIterator[Sequence[Self]]:
+        """
+        Get all the quizzes (sorted by id) with their questions and answer options,
+        in batches of batch_size quizzes read from a server-side cursor.
+
+        The session only keeps weak references to unmodified objects, so each batch
+        is released once the caller is done with it and memory does not grow with
+        the number of quizzes.
+        """
+        # imported here to avoid circular imports
+        from app.models.question import Question
+
+        result = await db.stream_scalars(
+            select(cls)
+            .order_by(cls.id)
+            .options(selectinload(cls.questions).selectinload(Question.answer_options))
+            .execution_options(yield_per=batch_size)
+        )
+        async for quizzes in result.partitions():
+            yield quizzes
+
+    @classmethod
+    async def get_answer_key(
+        cls, db: AsyncSession, id: int
+    ) -> list[tuple[int, int, int | None, bool | None]]:
+        """
+        Get the (question id, points, answer option id, is_correct) of every answer
+        option of the quiz (with None values for questions without answer options).
+        """
+        # imported here to avoid circular imports
+        from app.models.answer_options import AnswerOption
+        from app.models.question import Question
+
+        result = await db.execute(
+            select(
+                Question.id, Question.points, AnswerOption.id, AnswerOption.is_correct
+            )
+            .outerjoin(Question.answer_options)
+            .where(Question.quiz_id == id)
+        )
+        return [tuple(row) for row in result]
+
     @classmethod
     async def get_quiz_created_by(cls, db: AsyncSession, id: int) -> int | None:
         result = await db.execute(select(cls.created_by).where(cls.id == id))
         return result.scalar()
+
+    @classmethod
+    async def get_updated_at(cls, db: AsyncSession, id: int) -> datetime | None:
+        """
+        Get when the quiz was last updated (None if it does not exist), to check if
+        a client has its latest version without loading it.
+        """
+        result = await db.execute(select(cls.updated_at).where(cls.id == id))
+        return result.scalar()
+
+    @classmethod
+    async def get_questions_updated_at(
+        cls, db: AsyncSession, id: int
+    ) -> tuple[int, datetime | None] | None:
+        """
+        Get the number of questions of the quiz and when the last one was updated
+        (None if the quiz does not exist), which change whenever a question is
+        created, updated or deleted.
+        """
+        # imported here to avoid circular imports
+        from app.models.question import Question
+
+        result = await db.execute(
+            select(func.count(Question.id), func.max(Question.updated_at))
+            .select_from(cls)
+            .outerjoin(cls.questions)
+            .where(cls.id == id)
+            .group_by(cls.id)
+        )
+        row = result.first()
+        return (row[0], row[1]) if row else None
+
+    @classmethod
+    async def get_answer_key_version(cls, db: AsyncSession, id: int) -> int | None:
+        """
+        Get the current answer key version of the quiz (None if it does not exist).
+        """
+        result = await db.execute(select(cls.answer_key_version).where(cls.id == id))
+        return result.scalar()
+
+    @classmethod
+    async def bump_answer_key_version(
+        cls, db: AsyncSession, id: int | ColumnElement[int]
+    ) -> None:
+        """
+        Increment the answer key version of the quiz, in the transaction that changes
+        its questions or answer options (which must not be committed here).
+        """
+        await db.execute(
+            update(cls)
+            .where(cls.id == id)
+            .values(answer_key_version=cls.answer_key_version + 1)
+            .execution_options(synchronize_session=False)
+        )
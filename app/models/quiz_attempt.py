@@ -0,0 +1,203 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    desc,
+    insert,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.settings import get_settings
+from app.models.database import Base, now
+from app.models.score_bucket import ScoreBucket
+from app.models.user_answer import UserAnswer
+from app.schemas import QuizAttemptScored
+
+settings = get_settings()
+
+
+class QuizAttempt(Base):
+    __tablename__ = "quiz_attempts"
+    __table_args__ = (
+        # leaderboards are read from the best attempts of each quiz (oldest first on
+        # ties), it also covers the foreign key (no index on quiz_id only)
+        Index("ix_quiz_attempts_quiz_id_score_id", "quiz_id", desc("score"), "id"),
+        # attempt history of each user, newest first (id to break ties), with the
+        # other listed columns as well so that pages are read from the index alone,
+        # it also covers the foreign key (no index on user_id only)
+        Index(
+            "ix_quiz_attempts_user_id_attempted_at_id",
+            "user_id",
+            desc("attempted_at"),
+            desc("id"),
+            "quiz_id",
+            "score",
+        ),
+    )
+
+    quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id", ondelete="CASCADE"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    score: Mapped[int] = mapped_column(Integer, nullable=False)
+    attempted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=now()
+    )
+
+    answers: Mapped[list[UserAnswer]] = relationship(
+        UserAnswer,
+        back_populates="attempt",
+        cascade="delete, delete-orphan",
+        # answers are deleted by the database (ON DELETE CASCADE)
+        passive_deletes=True,
+    )
+
+    @classmethod
+    async def create_batch(
+        cls, db: AsyncSession, attempts: list[QuizAttemptScored]
+    ) -> list[tuple[int, datetime]]:
+        """
+        Create the attempts and their answers in a single transaction, with one
+        multi-row INSERT for the attempts and another one for the answers (and one
+        more to add their scores to the score histograms).
+
+        Returns the (id, attempted_at) of each attempt, in order (as in
+        Question.create_batch, the attempts are inserted one by one on databases
+        where SQLAlchemy cannot return the ids of a multi-row INSERT in order).
+        """
+        result = await db.execute(
+            insert(cls).returning(
+                cls.id, cls.attempted_at, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "quiz_id": attempt.quiz_id,
+                    "user_id": attempt.user_id,
+                    "score": attempt.score,
+                }
+                for attempt in attempts
+            ],
+        )
+        created = [(id, attempted_at) for id, attempted_at in result]
+
+        answers = [
+            {
+                "attempt_id": attempt_id,
+                "question_id": answer.question_id,
+                "chosen_option_id": answer.chosen_option_id,
+            }
+            for (attempt_id, _), attempt in zip(created, attempts, strict=True)
+            for answer in attempt.answers
+        ]
+        if answers:
+            await db.execute(insert(UserAnswer), answers)
+
+        await ScoreBucket.add_scores(
+            db=db,
+            scores=[(attempt.quiz_id, attempt.score) for attempt in attempts],
+            bucket_width=settings.SCORE_BUCKET_WIDTH,
+        )
+        await db.commit()
+
+        return created
+
+    @classmethod
+    async def get_scores_by_quiz(
+        cls, db: AsyncSession, quiz_id: int
+    ) -> list[tuple[int, int]]:
+        """
+        Get the (id, score) of all the attempts of the quiz, sorted by id.
+        """
+        result = await db.execute(
+            select(cls.id, cls.score).where(cls.quiz_id == quiz_id).order_by(cls.id)
+        )
+        return [(id, score) for id, score in result]
+
+    @classmethod
+    async def get_leaderboard(
+        cls, db: AsyncSession, quiz_id: int, limit: int
+    ) -> list[tuple[int, int, int, datetime]]:
+        """
+        Get the (id, user id, score, attempted_at) of the limit best attempts of the
+        quiz, sorted by score (the oldest attempt first on ties).
+        """
+        result = await db.execute(
+            select(cls.id, cls.user_id, cls.score, cls.attempted_at)
+            .where(cls.quiz_id == quiz_id)
+            .order_by(desc(cls.score), cls.id)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result]
+
+    @classmethod
+    async def get_by_user(
+        cls,
+        db: AsyncSession,
+        user_id: int,
+        limit: int = 25,
+        after: tuple[datetime, int] | None = None,
+        with_quiz_title: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        Get the attempts of the user sorted from newest to oldest, as dicts with the
+        columns of the attempts (and the quiz_title, if with_quiz_title is True).
+        If after=(attempted_at, id) is given, the attempts that come after that one
+        are returned (keyset pagination).
+
+        The quiz titles are read in the same query, with a join.
+        """
+        # imported here to avoid circular imports
+        from app.models.quiz import Quiz
+
+        query = (
+            select(cls.id, cls.quiz_id, cls.user_id, cls.score, cls.attempted_at)
+            .where(cls.user_id == user_id)
+            .order_by(desc(cls.attempted_at), desc(cls.id))
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(tuple_(cls.attempted_at, cls.id) < after)
+        if with_quiz_title:
+            query = query.add_columns(Quiz.title.label("quiz_title")).join(
+                Quiz, Quiz.id == cls.quiz_id
+            )
+
+        result = await db.execute(query)
+        return [dict(row) for row in result.mappings()]
+
+    @classmethod
+    async def get_answers_by_quiz(
+        cls, db: AsyncSession, quiz_id: int
+    ) -> list[tuple[int, int, int]]:
+        """
+        Get the (attempt id, question id, chosen option id) of all the answers given
+        in attempts of the quiz.
+        """
+        result = await db.execute(
+            select(
+                UserAnswer.attempt_id,
+                UserAnswer.question_id,
+                UserAnswer.chosen_option_id,
+            )
+            .join(UserAnswer.attempt)
+            .where(cls.quiz_id == quiz_id)
+        )
+        return [tuple(row) for row in result]
+
+    @classmethod
+    async def update_scores(cls, db: AsyncSession, scores: dict[int, int]) -> None:
+        """
+        Set the score of each attempt (by id), with a single executemany.
+        """
+        if scores:
+            await db.execute(
+                update(cls),
+                [{"id": id, "score": score} for id, score in scores.items()],
+            )
+        await db.commit()
@@ -0,0 +1,86 @@
+from contextlib import asynccontextmanager
+from itertools import count
+from time import monotonic
+from typing import AsyncGenerator, Literal
+
+from loguru import logger
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+ReplicaStrategy = Literal["round_robin", "least_busy"]
+
+
+class ReplicaRouter:
+    """
+    Choose the database engine used by read-only sessions.
+
+    Sessions are bound to one of the replicas (round robin, or the replica with
+    the fewest sessions currently open in this process). A replica that cannot be
+    connected to is skipped for retry_sec seconds (and the next available replica
+    is tried instead), and the primary is used when there are no replicas
+    available.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        session_factory: async_sessionmaker[AsyncSession],
+        strategy: ReplicaStrategy = "round_robin",
+        retry_sec: float = 30,
+    ) -> None:
+        self.primary = primary
+        self.replicas = replicas
+        self.session_factory = session_factory
+        self.strategy = strategy
+        self.retry_sec = retry_sec
+        self._counter = count()
+        self._in_use = {engine: 0 for engine in replicas}
+        self._down_until: dict[AsyncEngine, float] = {}
+
+    def available(self) -> list[AsyncEngine]:
+        now = monotonic()
+        return [
+            engine for engine in self.replicas if self._down_until.get(engine, 0) <= now
+        ]
+
+    def choose(self) -> AsyncEngine:
+        replicas = self.available()
+        if not replicas:
+            return self.primary
+
+        if self.strategy == "least_busy":
+            return min(replicas, key=lambda engine: self._in_use[engine])
+
+        return replicas[next(self._counter) % len(replicas)]
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        logger.warning(f"Read replica {engine.url!r} is down, using another engine")
+        self._down_until[engine] = monotonic() + self.retry_sec
+
+    @asynccontextmanager
+    async def session(self) -> AsyncGenerator[AsyncSession, None]:
+        # every failed replica is marked down, so the others are tried in turn
+        engine = self.choose()
+        while engine is not self.primary:
+            session = self.session_factory(bind=engine)
+            try:
+                # connect right away, to fall back to another engine if it fails
+                await session.connection()
+                break
+            except (DBAPIError, OSError):
+                await session.close()
+                self.mark_down(engine)
+                engine = self.choose()
+
+        if engine is self.primary:
+            session = self.session_factory(bind=engine)
+        else:
+            self._in_use[engine] += 1
+
+        try:
+            async with session:
+                yield session
+        finally:
+            if engine is not self.primary:
+                self._in_use[engine] -= 1
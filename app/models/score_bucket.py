@@ -0,0 +1,111 @@
+from collections import Counter
+
+from sqlalchemy import (
+    ColumnElement,
+    ForeignKey,
+    Integer,
+    UniqueConstraint,
+    case,
+    delete,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, Mapped, mapped_column
+
+from app.models.database import Base
+
+
+def bucket_expression(
+    score: ColumnElement[int] | InstrumentedAttribute[int], bucket_width: int
+) -> ColumnElement[int]:
+    """
+    SQL version of score // bucket_width (integer division in SQL rounds towards
+    zero instead of down, which gives a different bucket for negative scores).
+    """
+    return case(
+        (score >= 0, score // bucket_width), else_=(score + 1) // bucket_width - 1
+    )
+
+
+class ScoreBucket(Base):
+    """
+    Number of attempts of a quiz whose score falls in a bucket (scores from
+    bucket * bucket_width to (bucket + 1) * bucket_width - 1), i.e. the persisted
+    score histogram of the quiz.
+    """
+
+    __tablename__ = "score_buckets"
+    __table_args__ = (
+        # also covers the foreign key (no index on quiz_id only)
+        UniqueConstraint("quiz_id", "bucket"),
+    )
+
+    quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id", ondelete="CASCADE"))
+    bucket: Mapped[int] = mapped_column(Integer, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    @classmethod
+    async def add_scores(
+        cls, db: AsyncSession, scores: list[tuple[int, int]], bucket_width: int
+    ) -> None:
+        """
+        Count the (quiz id, score) of new attempts, with a single executemany that
+        adds to the existing counts (without committing, so it is done in the same
+        transaction as the attempts).
+        """
+        counts = Counter((quiz_id, score // bucket_width) for quiz_id, score in scores)
+        if not counts:
+            return
+
+        connection = await db.connection()
+        dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(cls)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[cls.quiz_id, cls.bucket],
+                set_={"count": cls.count + stmt.excluded.count},
+            ),
+            [
+                {"quiz_id": quiz_id, "bucket": bucket, "count": count}
+                for (quiz_id, bucket), count in sorted(counts.items())
+            ],
+        )
+
+    @classmethod
+    async def get_by_quiz(cls, db: AsyncSession, quiz_id: int) -> list[tuple[int, int]]:
+        """
+        Get the (bucket, count) of the quiz, sorted by bucket.
+        """
+        result = await db.execute(
+            select(cls.bucket, cls.count)
+            .where(cls.quiz_id == quiz_id)
+            .order_by(cls.bucket)
+        )
+        return [(bucket, count) for bucket, count in result]
+
+    @classmethod
+    async def recompute(
+        cls, db: AsyncSession, bucket_width: int, quiz_id: int | None = None
+    ) -> None:
+        """
+        Count the scores of the attempts of the quiz (or of all the quizzes) again,
+        replacing the persisted counts in a single transaction.
+        """
+        # imported here to avoid circular imports
+        from app.models.quiz_attempt import QuizAttempt
+
+        bucket = bucket_expression(QuizAttempt.score, bucket_width)
+        query = select(QuizAttempt.quiz_id, bucket, func.count()).group_by(
+            QuizAttempt.quiz_id, bucket
+        )
+        delete_query = delete(cls)
+        if quiz_id is not None:
+            query = query.where(QuizAttempt.quiz_id == quiz_id)
+            delete_query = delete_query.where(cls.quiz_id == quiz_id)
+
+        await db.execute(delete_query)
+        await db.execute(insert(cls).from_select(["quiz_id", "bucket", "count"], query))
+        await db.commit()
@@ -0,0 +1,152 @@
+"""
+Full-text search indexes of the quizzes (title and description) and of their
+questions (content), created with the tables (see the migration for existing
+databases):
+
+- PostgreSQL: generated tsvector columns (updated by the database itself on every
+  INSERT/UPDATE) with a GIN index.
+- SQLite: FTS5 tables using the quizzes/questions tables as external content (so the
+  text is not stored twice), kept up to date by triggers.
+
+In both cases the indexes are maintained by the database, so every write path
+(including bulk imports and ON DELETE CASCADE) updates them without extra queries.
+"""
+import re
+
+from sqlalchemy import (
+    DDL,
+    CompoundSelect,
+    Float,
+    column,
+    event,
+    func,
+    literal_column,
+    select,
+    table,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from app.models.database import Base
+
+SEARCH_CONFIG = "english"
+
+POSTGRESQL_DDL = [
+    "ALTER TABLE quizzes ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS (setweight(to_tsvector('{SEARCH_CONFIG}', title), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')) "
+    "STORED",
+    "CREATE INDEX IF NOT EXISTS ix_quizzes_search_vector "
+    "ON quizzes USING GIN (search_vector)",
+    "ALTER TABLE questions ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', content)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_questions_search_vector "
+    "ON questions USING GIN (search_vector)",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS quizzes_fts USING fts5(title, description, "
+    "content='quizzes', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS quizzes_fts_insert AFTER INSERT ON quizzes BEGIN "
+    "INSERT INTO quizzes_fts (rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS quizzes_fts_delete AFTER DELETE ON quizzes BEGIN "
+    "INSERT INTO quizzes_fts (quizzes_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS quizzes_fts_update "
+    "AFTER UPDATE OF title, description ON quizzes BEGIN "
+    "INSERT INTO quizzes_fts (quizzes_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO quizzes_fts (rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(content, "
+    "quiz_id UNINDEXED, content='questions', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON questions "
+    "BEGIN INSERT INTO questions_fts (rowid, content, quiz_id) "
+    "VALUES (new.id, new.content, new.quiz_id); END",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_delete AFTER DELETE ON questions "
+    "BEGIN INSERT INTO questions_fts (questions_fts, rowid, content, quiz_id) "
+    "VALUES ('delete', old.id, old.content, old.quiz_id); END",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_update "
+    "AFTER UPDATE OF content, quiz_id ON questions BEGIN "
+    "INSERT INTO questions_fts (questions_fts, rowid, content, quiz_id) "
+    "VALUES ('delete', old.id, old.content, old.quiz_id); "
+    "INSERT INTO questions_fts (rowid, content, quiz_id) "
+    "VALUES (new.id, new.content, new.quiz_id); END",
+]
+
+# the FTS5 tables are not part of the metadata, so they are dropped explicitly
+SQLITE_DROP_DDL = [
+    "DROP TABLE IF EXISTS quizzes_fts",
+    "DROP TABLE IF EXISTS questions_fts",
+]
+
+for statement in POSTGRESQL_DDL:
+    event.listen(
+        Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+for statement in SQLITE_DDL:
+    event.listen(
+        Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+for statement in SQLITE_DROP_DDL:
+    event.listen(
+        Base.metadata, "before_drop", DDL(statement).execute_if(dialect="sqlite")
+    )
+
+# relative weight of the title/description of a quiz, and of each of its questions
+QUIZ_WEIGHT = 2.0
+QUESTION_WEIGHT = 1.0
+
+
+def search_terms(query: str) -> list[str]:
+    """
+    Words of the query (punctuation and search operators are ignored).
+    """
+    return re.findall(r"\w+", query.lower())
+
+
+def match_query(dialect: str, query: str) -> CompoundSelect:
+    """
+    Query with the (quiz id, rank) of every quiz or question that contains all the
+    words of the query (after stemming), with a higher rank for better matches.
+    A quiz can appear several times (e.g. once for its title and once per question).
+    """
+    if dialect == "postgresql":
+        ts_query = func.plainto_tsquery(SEARCH_CONFIG, " ".join(search_terms(query)))
+        quizzes = table("quizzes", column("id"), column("search_vector", TSVECTOR))
+        questions = table(
+            "questions", column("quiz_id"), column("search_vector", TSVECTOR)
+        )
+        quiz_matches = select(
+            quizzes.c.id.label("quiz_id"),
+            (func.ts_rank(quizzes.c.search_vector, ts_query) * QUIZ_WEIGHT).label(
+                "rank"
+            ),
+        ).where(quizzes.c.search_vector.op("@@")(ts_query))
+        question_matches = select(
+            questions.c.quiz_id,
+            (func.ts_rank(questions.c.search_vector, ts_query) * QUESTION_WEIGHT).label(
+                "rank"
+            ),
+        ).where(questions.c.search_vector.op("@@")(ts_query))
+    else:
+        # every word as a quoted string, so FTS5 does not parse operators in the query
+        fts_query = " ".join(f'"{term}"' for term in search_terms(query))
+        quizzes_fts = table("quizzes_fts", column("rowid"))
+        questions_fts = table("questions_fts", column("rowid"), column("quiz_id"))
+        # bm25 is negative, lower for better matches (title 2x as relevant as
+        # description)
+        quizzes_rank = func.bm25(literal_column("quizzes_fts"), 2.0, 1.0, type_=Float)
+        questions_rank = func.bm25(literal_column("questions_fts"), type_=Float)
+        quiz_matches = select(
+            quizzes_fts.c.rowid.label("quiz_id"),
+            (-quizzes_rank * QUIZ_WEIGHT).label("rank"),
+        ).where(literal_column("quizzes_fts").match(fts_query))
+        question_matches = select(
+            questions_fts.c.quiz_id,
+            (-questions_rank * QUESTION_WEIGHT).label("rank"),
+        ).where(literal_column("questions_fts").match(fts_query))
+
+    return union_all(quiz_matches, question_matches)
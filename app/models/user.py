@@ -4,10 +4,9 @@ from typing import TYPE_CHECKING, Self
 from sqlalchemy import DateTime, String, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql import func
 
-from app.core.security import get_password_hash
-from app.models.database import Base
+from app.core.security import get_password_hash_async, principal_cache
+from app.models.database import Base, now
 from app.schemas import UserCreate
 
 if TYPE_CHECKING:
@@ -25,22 +24,25 @@ class User(Base):
     )
     password_hash: Mapped[str] = mapped_column(String, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), server_default=now()
     )
 
     # have to use "Quiz" to avoid circular dependencies
     quizzes: Mapped[list["Quiz"]] = relationship("Quiz", back_populates="user")
 
+    @classmethod
+    def _after_write(cls, db_obj: Self) -> None:
+        principal_cache.pop(db_obj.id)
+
     @classmethod
     async def create(cls, db: AsyncSession, user: UserCreate) -> Self:
         new_user = cls(
             username=user.username,
             email=user.email,
-            password_hash=get_password_hash(user.password),
+            password_hash=await get_password_hash_async(user.password),
         )
         db.add(new_user)
         await db.commit()
-        await db.refresh(new_user)
 
         return new_user
 
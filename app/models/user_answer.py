@@ -0,0 +1,28 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.database import Base
+
+if TYPE_CHECKING:
+    from app.models.quiz_attempt import QuizAttempt
+
+
+class UserAnswer(Base):
+    __tablename__ = "user_answers"
+
+    attempt_id: Mapped[int] = mapped_column(
+        ForeignKey("quiz_attempts.id", ondelete="CASCADE"), index=True
+    )
+    question_id: Mapped[int] = mapped_column(
+        ForeignKey("questions.id", ondelete="CASCADE"), index=True
+    )
+    chosen_option_id: Mapped[int] = mapped_column(
+        ForeignKey("answer_options.id", ondelete="CASCADE"), index=True
+    )
+
+    # have to use "QuizAttempt" to avoid circular dependencies
+    attempt: Mapped["QuizAttempt"] = relationship(
+        "QuizAttempt", back_populates="answers"
+    )
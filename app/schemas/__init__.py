@@ -1,7 +1,32 @@
 # ruff: noqa: F401  (unused imports)
 
 from .answer_options import AnswerOptionCreate, AnswerOptionReturn, AnswerOptionUpdate
-from .question import QuestionCreate, QuestionReturn, QuestionType, QuestionUpdate
-from .quiz import QuizCreate, QuizReturn, QuizUpdate, QuizWithQuestions
+from .attempt import (
+    LeaderboardEntryReturn,
+    QuizAttemptCreate,
+    QuizAttemptHistory,
+    QuizAttemptResult,
+    QuizAttemptReturn,
+    QuizAttemptScored,
+    UserAnswerCreate,
+)
+from .question import (
+    QuestionBatchReturn,
+    QuestionCreate,
+    QuestionReturn,
+    QuestionType,
+    QuestionUpdate,
+    QuestionWithOptions,
+    QuestionWithOptionsCreate,
+)
+from .quiz import (
+    QuizCreate,
+    QuizFull,
+    QuizImport,
+    QuizReturn,
+    QuizSearchResult,
+    QuizUpdate,
+    QuizWithQuestions,
+)
 from .token import Token, TokenPayload
 from .user import UserCreate, UserReturn, UserUpdate
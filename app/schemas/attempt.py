@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class UserAnswerCreate(BaseModel):
+    question_id: int
+    chosen_option_id: int
+
+
+class QuizAttemptCreate(BaseModel):
+    answers: list[UserAnswerCreate]
+
+
+class QuizAttemptScored(QuizAttemptCreate):
+    quiz_id: int
+    user_id: int
+    score: int
+
+
+class QuizAttemptReturn(BaseModel):
+    id: int
+    quiz_id: int
+    user_id: int
+    score: int
+    attempted_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class QuizAttemptHistory(QuizAttemptReturn):
+    # only included if requested
+    quiz_title: str | None = None
+
+
+class QuizAttemptResult(QuizAttemptReturn):
+    # percentage of the attempts of the quiz with a lower score
+    percentile: float
+
+
+class LeaderboardEntryReturn(BaseModel):
+    rank: int
+    attempt_id: int
+    user_id: int
+    score: int
+    attempted_at: datetime
@@ -3,7 +3,7 @@ from enum import Enum
 
 from pydantic import BaseModel, ConfigDict
 
-from app.schemas import AnswerOptionReturn
+from app.schemas import AnswerOptionCreate, AnswerOptionReturn
 
 
 class QuestionType(str, Enum):
@@ -24,6 +24,10 @@ class QuestionCreate(QuestionBase):
     quiz_id: int | None = None
 
 
+class QuestionWithOptionsCreate(QuestionBase):
+    answer_options: list[AnswerOptionCreate] = []
+
+
 class QuestionUpdate(BaseModel):
     # not forced to always update all the fields
     content: str | None = None
@@ -42,3 +46,8 @@ class QuestionReturn(QuestionBase):
 
 class QuestionWithOptions(QuestionReturn):
     answer_options: list[AnswerOptionReturn]
+
+
+class QuestionBatchReturn(BaseModel):
+    id: int
+    answer_option_ids: list[int]
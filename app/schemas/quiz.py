@@ -2,7 +2,7 @@ from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict
 
-from app.schemas import QuestionReturn
+from app.schemas import QuestionReturn, QuestionWithOptions, QuestionWithOptionsCreate
 
 
 class QuizBase(BaseModel):
@@ -17,6 +17,10 @@ class QuizCreate(QuizBase):
     pass
 
 
+class QuizImport(QuizBase):
+    questions: list[QuestionWithOptionsCreate] = []
+
+
 class QuizUpdate(BaseModel):
     # not forced to always update all the fields
     title: str | None = None
@@ -31,5 +35,13 @@ class QuizReturn(QuizBase):
     updated_at: datetime
 
 
+class QuizSearchResult(QuizReturn):
+    rank: float
+
+
 class QuizWithQuestions(QuizReturn):
     questions: list[QuestionReturn]
+
+
+class QuizFull(QuizReturn):
+    questions: list[QuestionWithOptions]
@@ -8,3 +8,5 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: str
+    # expiration time as a UNIX timestamp
+    exp: int | None = None
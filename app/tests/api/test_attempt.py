@@ -0,0 +1,431 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+import pytest
+from dirty_equals import IsDatetime, IsInt
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+import app.models as models
+import app.schemas as schemas
+from app.core.percentiles import score_histograms
+from app.core.security import create_access_token
+from app.main import app
+from app.models.attempt_writer import AttemptWriter, get_attempt_writer
+from app.models.database import Base, get_session, get_session_factory
+from app.tests.conftest import AuthInfo
+from app.tests.factories.answer_options_factory import AnswerOptionFactory
+from app.tests.factories.question_factory import QuestionFactory
+from app.tests.factories.quiz_factory import QuizFactory
+from app.tests.factories.user_factory import UserFactory
+
+
+async def create_quiz_with_options() -> (
+    tuple[models.Quiz, list[list[models.AnswerOption]]]
+):
+    """
+    Create a quiz with 3 questions (worth 1, 2 and 3 points) and 3 answer options
+    each, where the first option of each question is the correct one.
+    """
+    quiz = await QuizFactory.create()
+    options = []
+    for points in [1, 2, 3]:
+        question = await QuestionFactory.create(quiz=quiz, points=points)
+        options.append(
+            [
+                await AnswerOptionFactory.create(question=question, is_correct=i == 0)
+                for i in range(3)
+            ]
+        )
+
+    return quiz, options
+
+
+@pytest.mark.parametrize(
+    "chosen, expected_score",
+    [([0, 0, 0], 6), ([0, 1, 0], 4), ([2, 1, 1], 0), ([0], 1), ([], 0)],
+)
+async def test_submit_answers(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    auth_info: AuthInfo,
+    chosen: list[int],
+    expected_score: int,
+):
+    quiz, options = await create_quiz_with_options()
+    answers = [
+        {"question_id": options[i][j].question_id, "chosen_option_id": options[i][j].id}
+        for i, j in enumerate(chosen)
+    ]
+
+    response = await client.post(
+        f"/api/quizzes/{quiz.id}/answers",
+        json={"answers": answers},
+        headers=auth_info.headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json() == {
+        "id": IsInt,
+        "quiz_id": quiz.id,
+        "user_id": auth_info.user.id,
+        "score": expected_score,
+        "attempted_at": IsDatetime(approx=datetime.utcnow(), delta=5, iso_string=True),
+        # first attempt of the quiz
+        "percentile": 0.0,
+    }
+
+    # the attempt is already in the database when the response is sent
+    attempt = await models.QuizAttempt.get(db=db_session, id=response.json()["id"])
+    assert attempt
+    assert attempt.score == expected_score
+    result = await db_session.execute(
+        select(models.UserAnswer.question_id, models.UserAnswer.chosen_option_id)
+        .where(models.UserAnswer.attempt_id == attempt.id)
+        .order_by(models.UserAnswer.question_id)
+    )
+    assert [tuple(row) for row in result] == [
+        (answer["question_id"], answer["chosen_option_id"]) for answer in answers
+    ]
+
+
+async def test_submit_answers_bounded_pool(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    # a real pool with fewer connections than concurrent submissions (the tests
+    # otherwise share a single connection)
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=2,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with session_factory() as db:
+        user = models.User(username="user", email="user@example.com")
+        user.password_hash = "not a real hash"
+        db.add(user)
+        await db.flush()
+        quiz = models.Quiz(title="Quiz", created_by=user.id)
+        db.add(quiz)
+        await db.flush()
+        question = models.Question(
+            quiz_id=quiz.id, content="Question", type="multiple_choice", points=1
+        )
+        db.add(question)
+        await db.flush()
+        option = models.AnswerOption(
+            question_id=question.id, content="Option", is_correct=True
+        )
+        db.add(option)
+        await db.commit()
+
+    writer = AttemptWriter(
+        session_factory=session_factory, flush_size=100, flush_interval_sec=0.01
+    )
+    monkeypatch.setattr(score_histograms, "session_factory", session_factory)
+
+    async def override_get_session() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as db:
+            yield db
+
+    overrides: dict[Callable, Callable] = {
+        get_session: override_get_session,
+        get_session_factory: lambda: session_factory,
+        get_attempt_writer: lambda: writer,
+    }
+    for dependency, override in overrides.items():
+        monkeypatch.setitem(app.dependency_overrides, dependency, override)
+    headers = {"Authorization": f"Bearer {create_access_token(subject=user.id)}"}
+    answers = [{"question_id": question.id, "chosen_option_id": option.id}]
+
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        f"/api/quizzes/{quiz.id}/answers",
+                        json={"answers": answers},
+                        headers=headers,
+                    )
+                    for _ in range(10)
+                )
+            )
+    finally:
+        await writer.close()
+        await engine.dispose()
+
+    # requests do not keep a connection while their attempt is written
+    assert [r.status_code for r in responses] == [status.HTTP_201_CREATED] * 10
+    assert writer.stats.written == 10
+
+
+async def test_submit_answers_cached_answer_key(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    auth_info: AuthInfo,
+    sql_statements: list[str],
+):
+    quiz, options = await create_quiz_with_options()
+    answers = [
+        {"question_id": o[0].question_id, "chosen_option_id": o[0].id} for o in options
+    ]
+
+    async def submit() -> int:
+        response = await client.post(
+            f"/api/quizzes/{quiz.id}/answers",
+            json={"answers": answers},
+            headers=auth_info.headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        return response.json()["score"]
+
+    assert await submit() == 6
+
+    # the answer key is not read again while the quiz does not change
+    sql_statements.clear()
+    assert await submit() == 6
+    assert not [s for s in sql_statements if "answer_options.is_correct" in s]
+
+    question = await models.Question.get(db=db_session, id=options[2][0].question_id)
+    assert question
+    await models.Question.update(db=db_session, current=question, new={"points": 10})
+    assert await submit() == 13
+
+    await models.AnswerOption.update(
+        db=db_session, current=options[0][0], new={"is_correct": False}
+    )
+    assert await submit() == 12
+
+
+async def test_submit_answers_percentile(
+    client: AsyncClient, db_session: AsyncSession, auth_info: AuthInfo
+):
+    quiz, options = await create_quiz_with_options()
+
+    percentiles = []
+    for chosen in [[0, 0, 0], [1, 1, 1], [0, 1, 1], [0, 1, 1], [1, 0, 0]]:
+        answers = [
+            {
+                "question_id": options[i][j].question_id,
+                "chosen_option_id": options[i][j].id,
+            }
+            for i, j in enumerate(chosen)
+        ]
+        response = await client.post(
+            f"/api/quizzes/{quiz.id}/answers",
+            json={"answers": answers},
+            headers=auth_info.headers,
+        )
+        percentiles.append(response.json()["percentile"])
+
+    # scores 6, 0, 1, 1 and 5, compared with all the attempts submitted until then
+    assert percentiles == [0.0, 0.0, 100 / 3, 25.0, 60.0]
+    # the histogram is persisted with the attempts
+    assert await models.ScoreBucket.get_by_quiz(db=db_session, quiz_id=quiz.id) == [
+        (0, 1),
+        (1, 2),
+        (5, 1),
+        (6, 1),
+    ]
+
+
+@pytest.mark.parametrize("cases", ["other_quiz", "other_question", "repeated"])
+async def test_submit_answers_invalid(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    auth_info: AuthInfo,
+    cases: str,
+):
+    quiz, options = await create_quiz_with_options()
+    answers = [
+        {"question_id": o[0].question_id, "chosen_option_id": o[0].id} for o in options
+    ]
+    if cases == "other_quiz":
+        other_option = await AnswerOptionFactory.create()
+        answers[0] = {
+            "question_id": other_option.question_id,
+            "chosen_option_id": other_option.id,
+        }
+    elif cases == "other_question":
+        answers[0]["chosen_option_id"] = options[1][0].id
+    else:
+        answers.append(answers[0])
+
+    response = await client.post(
+        f"/api/quizzes/{quiz.id}/answers",
+        json={"answers": answers},
+        headers=auth_info.headers,
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert await db_session.scalar(select(models.QuizAttempt.id)) is None
+
+
+@pytest.mark.parametrize("cases", ["unauthenticated", "quiz_not_found"])
+async def test_submit_answers_errors(
+    client: AsyncClient, db_session: AsyncSession, auth_info: AuthInfo, cases: str
+):
+    quiz = await QuizFactory.create()
+
+    if cases == "unauthenticated":
+        response = await client.post(
+            f"/api/quizzes/{quiz.id}/answers", json={"answers": []}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    else:
+        response = await client.post(
+            f"/api/quizzes/{quiz.id + 1}/answers",
+            json={"answers": []},
+            headers=auth_info.headers,
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_get_leaderboard(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    auth_info: AuthInfo,
+    sql_statements: list[str],
+):
+    quiz, options = await create_quiz_with_options()
+
+    response = await client.get(f"/api/quizzes/{quiz.id}/leaderboard")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+    # submitted attempts are added to the leaderboard as they are scored
+    attempt_ids = {}
+    for chosen, score in [([0, 1, 1], 1), ([0, 0, 0], 6), ([1, 0, 1], 2)]:
+        answers = [
+            {
+                "question_id": options[i][j].question_id,
+                "chosen_option_id": options[i][j].id,
+            }
+            for i, j in enumerate(chosen)
+        ]
+        response = await client.post(
+            f"/api/quizzes/{quiz.id}/answers",
+            json={"answers": answers},
+            headers=auth_info.headers,
+        )
+        attempt_ids[score] = response.json()["id"]
+
+    sql_statements.clear()
+    response = await client.get(
+        f"/api/quizzes/{quiz.id}/leaderboard", params={"limit": 2}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {
+            "rank": rank,
+            "attempt_id": attempt_ids[score],
+            "user_id": auth_info.user.id,
+            "score": score,
+            "attempted_at": IsDatetime(iso_string=True),
+        }
+        for rank, score in [(1, 6), (2, 2)]
+    ]
+    # served from memory
+    assert not [s for s in sql_statements if s.startswith("SELECT")]
+
+
+@pytest.mark.parametrize("cases", ["quiz_not_found", "invalid_limit"])
+async def test_get_leaderboard_errors(client: AsyncClient, cases: str):
+    quiz = await QuizFactory.create()
+
+    if cases == "quiz_not_found":
+        response = await client.get(f"/api/quizzes/{quiz.id + 1}/leaderboard")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    else:
+        response = await client.get(
+            f"/api/quizzes/{quiz.id}/leaderboard", params={"limit": 1000}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize("include_quiz_title", [False, True])
+async def test_get_user_attempts(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    auth_info: AuthInfo,
+    sql_statements: list[str],
+    include_quiz_title: bool,
+):
+    quizzes = await QuizFactory.create_batch(3)
+    other_user = await UserFactory.create()
+    for quiz in quizzes:
+        await models.QuizAttempt.create_batch(
+            db=db_session,
+            attempts=[
+                schemas.QuizAttemptScored(
+                    quiz_id=quiz.id, user_id=user.id, score=score, answers=[]
+                )
+                for user in [auth_info.user, other_user]
+                for score in range(4)
+            ],
+        )
+    attempts = await models.QuizAttempt.get_by_user(
+        db=db_session, user_id=auth_info.user.id, limit=100
+    )
+    assert len(attempts) == 12
+    expected = sorted(attempts, key=lambda a: (a["attempted_at"], a["id"]))[::-1]
+    titles = {quiz.id: quiz.title for quiz in quizzes}
+
+    returned: list[dict] = []
+    params: dict = {"limit": 5, "include_quiz_title": include_quiz_title}
+    sql_statements.clear()
+    while True:
+        response = await client.get(
+            f"/api/users/{auth_info.user.id}/quizzes/attempts",
+            params=params,
+            headers=auth_info.headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        returned.extend(response.json())
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    assert [attempt["id"] for attempt in returned] == [a["id"] for a in expected]
+    for attempt in returned:
+        assert attempt["user_id"] == auth_info.user.id
+        assert attempt["quiz_title"] == (
+            titles[attempt["quiz_id"]] if include_quiz_title else None
+        )
+    # quiz titles are read in the same query (one query per page)
+    attempt_queries = [s for s in sql_statements if "FROM quiz_attempts" in s]
+    assert len(attempt_queries) == 3
+    assert not [s for s in sql_statements if s.startswith("SELECT quizzes")]
+
+
+@pytest.mark.parametrize("cases", ["other_user", "invalid_cursor", "unauthenticated"])
+async def test_get_user_attempts_errors(
+    client: AsyncClient, auth_info: AuthInfo, cases: str
+):
+    url = f"/api/users/{auth_info.user.id}/quizzes/attempts"
+    if cases == "other_user":
+        other_user = await UserFactory.create()
+        response = await client.get(
+            f"/api/users/{other_user.id}/quizzes/attempts", headers=auth_info.headers
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    elif cases == "invalid_cursor":
+        response = await client.get(
+            url, params={"cursor": "not_a_cursor"}, headers=auth_info.headers
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    else:
+        response = await client.get(url)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -3,7 +3,11 @@ from fastapi import status
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash
+import app.core.security as security
+import app.models as models
+from app.core.executor import BoundedExecutor
+from app.core.security import get_password_hash, principal_cache, token_cache
+from app.tests.conftest import AuthInfo
 from app.tests.factories.user_factory import UserFactory
 
 
@@ -55,3 +59,80 @@ async def test_register_user(client: AsyncClient, db_session: AsyncSession, case
         created_user = response.json()
         for key in ["username", "email"]:
             assert created_user[key] == user_info[key]
+
+
+async def test_get_access_token_pool_saturated(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    username = "random_name"
+    password = "123456789"
+    await UserFactory.create(
+        username=username, password_hash=get_password_hash(password)
+    )
+
+    # single worker already busy and no room in the queue
+    saturated_pool = BoundedExecutor(kind="thread", max_workers=1, max_queue=0)
+    saturated_pool.stats.running = 1
+    monkeypatch.setattr(security, "hashing_pool", saturated_pool)
+
+    form_data = {"username": username, "password": password}
+    response = await client.post("/api/tokens", data=form_data)
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+    assert saturated_pool.stats.rejected == 1
+
+
+async def test_hashing_pool_metrics(client: AsyncClient, db_session: AsyncSession):
+    user_info = {"username": "user", "email": "user@example.com", "password": "123456"}
+    completed_before = security.hashing_pool.stats.completed
+
+    response = await client.post("/api/register", json=user_info)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = await client.get("/api/metrics")
+    assert response.status_code == status.HTTP_200_OK
+
+    pool_metrics = response.json()["hashing_pool"]
+    assert pool_metrics["completed"] == completed_before + 1
+    assert pool_metrics["running"] == 0
+    assert pool_metrics["queued"] == 0
+    assert pool_metrics["latency_max_sec"] > 0
+
+
+async def test_current_user_cache(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    auth_info: AuthInfo,
+):
+    quiz_data = {"title": "My quiz"}
+    for _ in range(3):
+        response = await client.post(
+            "/api/quizzes", json=quiz_data, headers=auth_info.headers
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    # token decoded and user loaded only for the first request
+    assert token_cache.stats.misses == 1
+    assert token_cache.stats.hits == 2
+    assert principal_cache.stats.misses == 1
+    assert principal_cache.stats.hits == 2
+
+    # updating the user evicts it from the cache
+    await models.User.update(
+        db=db_session, current=auth_info.user, new={"username": "new_name"}
+    )
+    assert principal_cache.get(auth_info.user.id) is None
+
+    response = await client.post(
+        "/api/quizzes", json=quiz_data, headers=auth_info.headers
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    cached_user = principal_cache.get(auth_info.user.id)
+    assert cached_user
+    assert cached_user.username == "new_name"
+
+    response = await client.get("/api/metrics")
+    assert response.json()["principal_cache"]["size"] == 1
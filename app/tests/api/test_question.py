@@ -7,6 +7,7 @@ from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import app.models as models
+from app.core.response_cache import response_cache
 from app.schemas import QuestionType
 from app.tests.conftest import AuthInfo
 from app.tests.factories.question_factory import QuestionFactory
@@ -143,6 +144,41 @@ async def test_get_question(client: AsyncClient, db_session: AsyncSession, cases
             assert question[key] == getattr(created_question, key).isoformat()
 
 
+@pytest.mark.parametrize("write", ["update_question", "delete_question", "delete_quiz"])
+async def test_get_question_cached(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    sql_statements: list[str],
+    write: str,
+):
+    question = await QuestionFactory.create()
+    url = f"/api/questions/{question.id}"
+
+    first = await client.get(url)
+    sql_statements.clear()
+    second = await client.get(url)
+    assert second.json() == first.json()
+    assert sql_statements == []
+
+    if write == "update_question":
+        await models.Question.update(
+            db=db_session, current=question, new={"content": "New"}
+        )
+    elif write == "delete_question":
+        await models.Question.delete(db=db_session, db_obj=question)
+    else:
+        # the question is deleted by the database (ON DELETE CASCADE)
+        await models.Quiz.delete_by_id(db=db_session, id=question.quiz_id)
+
+    response = await client.get(url)
+
+    if write == "update_question":
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["content"] == "New"
+    else:
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
 @pytest.mark.parametrize("cases", ["found", "not_found", "partial_update", "invalid"])
 async def test_update_question(
     client: AsyncClient,
@@ -220,3 +256,88 @@ async def test_delete_question(
         # check quiz was deleted from database
         db_question = await models.Question.get(db=db_session, id=question_id)
         assert not db_question
+
+
+@pytest.mark.parametrize("method", ["update", "delete"])
+async def test_modify_question_single_auth_query(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    auth_info: AuthInfo,
+    sql_statements: list[str],
+    method: str,
+):
+    question = await QuestionFactory.create(quiz__user=auth_info.user)
+
+    sql_statements.clear()
+    if method == "update":
+        response = await client.put(
+            f"/api/questions/{question.id}",
+            json={"content": "New content"},
+            headers=auth_info.headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+    else:
+        response = await client.delete(
+            f"/api/questions/{question.id}", headers=auth_info.headers
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    # question and quiz owner checked with a single query (no users query)
+    selects = [s for s in sql_statements if s.startswith("SELECT")]
+    assert len(selects) == 1
+    assert "JOIN quizzes" in selects[0]
+
+
+@pytest.mark.parametrize("cases", ["unauthenticated", "unauthorized"])
+@pytest.mark.parametrize("method", ["update", "delete"])
+async def test_modify_question_unauthorized(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    auth_info: AuthInfo,
+    cases: str,
+    method: str,
+):
+    # create a question for a quiz that belongs to a different user
+    question = await QuestionFactory.create()
+    headers = auth_info.headers if cases == "unauthorized" else {}
+
+    if method == "update":
+        response = await client.put(
+            f"/api/questions/{question.id}",
+            json={"content": "New content"},
+            headers=headers,
+        )
+    else:
+        response = await client.delete(f"/api/questions/{question.id}", headers=headers)
+
+    if cases == "unauthorized":
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    else:
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.parametrize("cases", ["unchanged", "updated", "deleted"])
+async def test_get_question_etag(
+    client: AsyncClient, db_session: AsyncSession, cases: str
+):
+    question = await QuestionFactory.create()
+    url = f"/api/questions/{question.id}"
+    etag = (await client.get(url)).headers["ETag"]
+
+    response_cache.clear()
+    if cases == "updated":
+        await models.Question.update(
+            db=db_session, current=question, new={"points": question.points + 1}
+        )
+    elif cases == "deleted":
+        await models.Question.delete(db=db_session, db_obj=question)
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+
+    if cases == "unchanged":
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    elif cases == "updated":
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+    else:
+        assert response.status_code == status.HTTP_404_NOT_FOUND
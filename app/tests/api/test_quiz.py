@@ -1,13 +1,29 @@
+import csv
+import io
+import json
+import threading
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+from typing import AsyncIterator
 
 import pytest
-from dirty_equals import IsDatetime, IsInt, IsNonNegative, IsNow, IsStr
-from fastapi import status
+from dirty_equals import IsDatetime, IsFloat, IsInt, IsNonNegative, IsNow, IsStr
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse, ORJSONResponse
 from httpx import AsyncClient
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import app.models as models
+import app.schemas as schemas
+from app.api.api import api_router
+from app.core import importer
+from app.core.export import ExportStats, export_quizzes_ndjson
+from app.core.importer import CSV_COLUMNS, import_quizzes
+from app.core.response_cache import response_cache
+from app.main import app
 from app.tests.conftest import AuthInfo
+from app.tests.factories.answer_options_factory import AnswerOptionFactory
 from app.tests.factories.question_factory import QuestionFactory
 from app.tests.factories.quiz_factory import QuizFactory
 
@@ -98,6 +114,470 @@ async def test_get_quizzes_query_params(client: AsyncClient, db_session: AsyncSe
     assert len(returned_quizzes) == 28
 
 
+async def test_get_quizzes_cursor(client: AsyncClient, db_session: AsyncSession):
+    # some quizzes created at the same time, to check the id is used to break ties
+    now = datetime.utcnow()
+    quizzes = await QuizFactory.create_batch(10, created_at=now)
+    for i in range(20):
+        quizzes.append(await QuizFactory.create(created_at=now - timedelta(hours=i)))
+    # and some with the created_at generated by the database
+    user = quizzes[0].user
+    for i in range(5):
+        quiz_data = schemas.QuizCreate(title=f"Quiz {i}", created_by=user.id)
+        quizzes.append(await models.Quiz.create(db=db_session, quiz=quiz_data))
+
+    expected_ids = [
+        quiz.id for quiz in sorted(quizzes, key=lambda q: (q.created_at, q.id))[::-1]
+    ]
+
+    returned_ids: list[int] = []
+    url = "/api/quizzes?limit=7"
+    while True:
+        response = await client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+
+        returned_ids.extend(quiz["id"] for quiz in response.json())
+        if "X-Next-Cursor" not in response.headers:
+            break
+        url = f"/api/quizzes?limit=7&cursor={response.headers['X-Next-Cursor']}"
+
+    assert returned_ids == expected_ids
+
+
+async def test_get_quizzes_invalid_cursor(
+    client: AsyncClient, db_session: AsyncSession
+):
+    response = await client.get("/api/quizzes?cursor=not_a_cursor")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize("n_quizzes", [0, 5])
+async def test_export_quizzes(
+    client: AsyncClient, db_session: AsyncSession, n_quizzes: int
+):
+    quizzes = await QuizFactory.create_batch(n_quizzes)
+    for quiz in quizzes:
+        questions = await QuestionFactory.create_batch(2, quiz=quiz)
+        for question in questions:
+            await AnswerOptionFactory.create_batch(3, question=question)
+
+    response = await client.get("/api/quizzes/export")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert [q["id"] for q in exported] == sorted(q.id for q in quizzes)
+    for exported_quiz in exported:
+        assert len(exported_quiz["questions"]) == 2
+        for exported_question in exported_quiz["questions"]:
+            assert exported_question["quiz_id"] == exported_quiz["id"]
+            assert len(exported_question["answer_options"]) == 3
+
+
+async def test_export_quizzes_batches(db_session: AsyncSession):
+    await QuizFactory.create_batch(5)
+    sessions: list[str] = []
+
+    @asynccontextmanager
+    async def session_factory() -> AsyncIterator[AsyncSession]:
+        sessions.append("open")
+        yield db_session
+        sessions.append("closed")
+
+    stats = ExportStats()
+    generator = export_quizzes_ndjson(
+        session_factory=session_factory, batch_size=2, stats=stats
+    )
+    # the session is only opened once the response starts streaming
+    assert sessions == []
+    chunks = [chunk async for chunk in generator]
+
+    # one chunk per batch of quizzes read from the cursor
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+    assert sessions == ["open", "closed"]
+    assert stats.quizzes == stats.rows == 5
+    assert stats.rows_per_sec > 0
+
+
+async def test_import_quizzes_ndjson(
+    client: AsyncClient, db_session: AsyncSession, auth_info: AuthInfo
+):
+    quizzes = await QuizFactory.create_batch(3)
+    for quiz in quizzes:
+        questions = await QuestionFactory.create_batch(2, quiz=quiz)
+        for question in questions:
+            await AnswerOptionFactory.create_batch(3, question=question)
+    exported = (await client.get("/api/quizzes/export")).content
+
+    response = await client.post(
+        "/api/quizzes/import",
+        files={"file": ("quizzes.ndjson", exported)},
+        headers=auth_info.headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json() == {
+        "quizzes": 3,
+        "questions": 6,
+        "answer_options": 18,
+        "elapsed_sec": IsNonNegative,
+        "rows_per_sec": IsNonNegative,
+    }
+
+    # the imported quizzes are new copies that belong to the current user
+    original_ids = {quiz.id for quiz in quizzes}
+    for line in exported.splitlines():
+        original = json.loads(line)
+        imported = await db_session.scalar(
+            select(models.Quiz.id).where(
+                models.Quiz.title == original["title"],
+                models.Quiz.id.not_in(original_ids),
+            )
+        )
+        assert imported
+        full_quiz = await models.Quiz.get_full(db=db_session, id=imported)
+        assert full_quiz
+        assert full_quiz.created_by == auth_info.user.id
+        assert sorted(
+            (q.content, sorted(o.content for o in q.answer_options))
+            for q in full_quiz.questions
+        ) == sorted(
+            (q["content"], sorted(o["content"] for o in q["answer_options"]))
+            for q in original["questions"]
+        )
+
+
+async def test_import_quizzes_csv(
+    client: AsyncClient, db_session: AsyncSession, auth_info: AuthInfo
+):
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    writer.writerows(
+        [
+            {"quiz_id": 1, "quiz_title": "Empty quiz"},
+            {
+                "quiz_id": 2,
+                "quiz_title": "Quiz",
+                "quiz_description": "With, commas",
+                "question_id": 1,
+                "question_content": "Question 1",
+                "question_type": "multiple_choice",
+                "question_points": 2,
+                "option_content": "Right",
+                "option_is_correct": "true",
+            },
+            {
+                "quiz_id": 2,
+                "question_id": 1,
+                "option_content": "Wrong",
+                "option_is_correct": "false",
+            },
+            {"quiz_id": 2, "question_id": 2, "question_content": "Question 2"},
+        ]
+    )
+
+    response = await client.post(
+        "/api/quizzes/import",
+        files={"file": ("quizzes.csv", output.getvalue().encode())},
+        headers=auth_info.headers,
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json() | {"elapsed_sec": 0, "rows_per_sec": 0} == {
+        "quizzes": 2,
+        "questions": 2,
+        "answer_options": 2,
+        "elapsed_sec": 0,
+        "rows_per_sec": 0,
+    }
+
+    quiz_id = await db_session.scalar(
+        select(models.Quiz.id).where(models.Quiz.title == "Quiz")
+    )
+    assert quiz_id
+    quiz = await models.Quiz.get_full(db=db_session, id=quiz_id)
+    assert quiz
+    assert quiz.description == "With, commas"
+    questions = sorted(quiz.questions, key=lambda q: q.content)
+    assert [(q.content, q.type, q.points) for q in questions] == [
+        ("Question 1", "multiple_choice", 2),
+        ("Question 2", "open", 1),
+    ]
+    assert sorted((o.content, o.is_correct) for o in questions[0].answer_options) == [
+        ("Right", True),
+        ("Wrong", False),
+    ]
+
+
+@pytest.mark.parametrize("cases", ["invalid_record", "invalid_json"])
+async def test_import_quizzes_invalid(
+    client: AsyncClient, db_session: AsyncSession, auth_info: AuthInfo, cases: str
+):
+    lines = [json.dumps({"title": f"Quiz {i}"}) for i in range(5)]
+    if cases == "invalid_record":
+        lines[3] = json.dumps({"title": "Quiz", "questions": [{"points": 1}]})
+    else:
+        lines[3] = "{"
+
+    response = await client.post(
+        "/api/quizzes/import",
+        files={"file": ("quizzes.ndjson", "\n".join(lines).encode())},
+        headers=auth_info.headers,
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["detail"]["line"] == 4
+    if cases == "invalid_record":
+        assert response.json()["detail"]["errors"][0]["loc"] == [
+            "questions",
+            0,
+            "content",
+        ]
+
+    # nothing is imported
+    assert await models.Quiz.get_multiple(db=db_session) == []
+
+
+@pytest.mark.parametrize("cases", ["invalid_utf8", "invalid_csv"])
+async def test_import_quizzes_invalid_csv(
+    client: AsyncClient, db_session: AsyncSession, auth_info: AuthInfo, cases: str
+):
+    content = ",".join(CSV_COLUMNS).encode() + b"\n1,Quiz,,,,,,,\n"
+    if cases == "invalid_utf8":
+        content += b"2,Quiz \xff,,,,,,,\n"
+    else:
+        # larger than the maximum size of a CSV field
+        content += b"2," + b"x" * (csv.field_size_limit() + 1) + b",,,,,,,\n"
+
+    response = await client.post(
+        "/api/quizzes/import",
+        files={"file": ("quizzes.csv", content)},
+        headers=auth_info.headers,
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    error_type = "unicode_invalid" if cases == "invalid_utf8" else "csv_invalid"
+    assert response.json()["detail"]["errors"][0]["type"] == error_type
+    assert await models.Quiz.get_multiple(db=db_session) == []
+
+
+async def test_import_quizzes_parsed_in_thread(
+    db_session: AsyncSession, auth_info: AuthInfo, monkeypatch: pytest.MonkeyPatch
+):
+    threads: list[int] = []
+
+    def record_thread(chunk: list) -> list[schemas.QuizImport]:
+        threads.append(threading.get_ident())
+        return importer.quizzes_adapter.validate_python([r for _, r in chunk])
+
+    monkeypatch.setattr(importer, "validate_chunk", record_thread)
+    lines = [json.dumps({"title": f"Quiz {i}"}) for i in range(5)]
+
+    stats = await import_quizzes(
+        db=db_session,
+        file=io.BytesIO("\n".join(lines).encode()),
+        format="ndjson",
+        created_by=auth_info.user.id,
+        chunk_size=2,
+    )
+
+    assert stats.quizzes == 5
+    # the file is parsed and validated outside of the event loop
+    assert len(threads) == 3
+    assert threading.get_ident() not in threads
+
+
+async def test_import_quizzes_unauthenticated(client: AsyncClient):
+    response = await client.post(
+        "/api/quizzes/import", files={"file": ("quizzes.ndjson", b"")}
+    )
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_import_quizzes_chunks(
+    db_session: AsyncSession, auth_info: AuthInfo, sql_statements: list[str]
+):
+    lines = [
+        json.dumps(
+            {
+                "title": f"Quiz {i}",
+                "questions": [
+                    {"content": "Question", "answer_options": [{"content": "Option"}]}
+                ],
+            }
+        )
+        for i in range(5)
+    ]
+
+    stats = await import_quizzes(
+        db=db_session,
+        file=io.BytesIO("\n".join(lines).encode()),
+        format="ndjson",
+        created_by=auth_info.user.id,
+        chunk_size=2,
+    )
+
+    assert (stats.quizzes, stats.questions, stats.answer_options) == (5, 5, 5)
+    # one statement per table for each chunk of quizzes, whatever its size
+    inserts = [s for s in sql_statements if s.startswith("INSERT")]
+    assert len(inserts) == 3 * 3
+
+
+async def test_search_quizzes(client: AsyncClient, db_session: AsyncSession):
+    # fixed texts, the rank depends on their length
+    in_title = await QuizFactory.create(
+        title="Planets of the solar system", description="Astronomy"
+    )
+    in_description = await QuizFactory.create(
+        title="Astronomy", description="All about the planets"
+    )
+    in_question = await QuizFactory.create(title="Astronomy", description="Stars")
+    await QuestionFactory.create(quiz=in_question, content="Which planet has rings?")
+    await QuizFactory.create_batch(3, title="Astronomy", description="Stars")
+
+    response = await client.get("/api/quizzes/search?q=planets")
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()
+    # title matches rank higher than description ones, and both above questions
+    assert [quiz["id"] for quiz in results] == [
+        in_title.id,
+        in_description.id,
+        in_question.id,
+    ]
+    assert results[0] == {
+        "id": in_title.id,
+        "title": in_title.title,
+        "description": in_title.description,
+        "created_by": in_title.created_by,
+        "created_at": in_title.created_at.isoformat(),
+        "updated_at": in_title.updated_at.isoformat(),
+        "rank": IsFloat,
+    }
+    assert results[0]["rank"] > results[1]["rank"] > results[2]["rank"] > 0
+
+
+async def test_search_quizzes_all_words(client: AsyncClient, db_session: AsyncSession):
+    quiz = await QuizFactory.create(title="Rivers", description="Longest rivers")
+    await QuestionFactory.create(quiz=quiz, content="Which river is in Egypt?")
+    await QuestionFactory.create(quiz=quiz, content="Where is the Amazon?")
+    matching = await QuizFactory.create(title="Amazon rivers", description=None)
+
+    response = await client.get("/api/quizzes/search?q=Amazon%20river")
+
+    # every word must appear in the same quiz title/description or question
+    assert [quiz["id"] for quiz in response.json()] == [matching.id]
+
+
+async def test_search_quizzes_more_matches(
+    client: AsyncClient, db_session: AsyncSession
+):
+    one_question = await QuizFactory.create(title="Geology", description=None)
+    await QuestionFactory.create(quiz=one_question, content="What is a volcano?")
+    three_questions = await QuizFactory.create(title="Geology", description=None)
+    await QuestionFactory.create_batch(
+        3, quiz=three_questions, content="What is a volcano?"
+    )
+
+    response = await client.get("/api/quizzes/search?q=volcanoes")
+
+    assert [quiz["id"] for quiz in response.json()] == [
+        three_questions.id,
+        one_question.id,
+    ]
+
+
+async def test_search_quizzes_writes(
+    client: AsyncClient, db_session: AsyncSession, auth_info: AuthInfo
+):
+    quiz = await QuizFactory.create(
+        title="Geography", description=None, user=auth_info.user
+    )
+    question = await QuestionFactory.create(quiz=quiz, content="Capital of France?")
+    url = f"/api/quizzes/{quiz.id}"
+
+    response = await client.put(
+        url, json={"title": "History"}, headers=auth_info.headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    # the index is updated by the database on every write
+    response = await client.get("/api/quizzes/search?q=geography")
+    assert response.json() == []
+    response = await client.get("/api/quizzes/search?q=history")
+    assert [quiz["id"] for quiz in response.json()] == [quiz.id]
+
+    await models.Question.delete(db=db_session, db_obj=question)
+    response = await client.get("/api/quizzes/search?q=france")
+    assert response.json() == []
+
+    response = await client.delete(url, headers=auth_info.headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = await client.get("/api/quizzes/search?q=history")
+    assert response.json() == []
+
+
+async def test_search_quizzes_pagination(client: AsyncClient, db_session: AsyncSession):
+    quizzes = await QuizFactory.create_batch(
+        7, title="Chemistry", description="Elements"
+    )
+    expected_ids = sorted(quiz.id for quiz in quizzes)
+
+    returned_ids: list[int] = []
+    for offset in range(0, 10, 3):
+        response = await client.get(
+            f"/api/quizzes/search?q=chemistry&offset={offset}&limit=3"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        returned_ids.extend(quiz["id"] for quiz in response.json())
+
+    # same rank, sorted by id
+    assert returned_ids == expected_ids
+
+
+async def test_search_quizzes_ranks_all_matches(db_session: AsyncSession):
+    best_match = await QuizFactory.create(title="Chemistry", description=None)
+    await QuizFactory.create_batch(
+        5, title="Science", description="Physics, biology and chemistry"
+    )
+
+    results = await models.Quiz.search(db=db_session, query="chemistry", limit=2)
+    last_page = await models.Quiz.search(
+        db=db_session, query="chemistry", offset=4, limit=2
+    )
+
+    # the oldest quiz is still the best match, and the last page is not empty
+    assert results[0]["id"] == best_match.id
+    assert len(last_page) == 2
+
+
+@pytest.mark.parametrize(
+    "query", ['"', "a AND (b OR", "NOT*", "title:x", "-", "^near", "%_'"]
+)
+async def test_search_quizzes_special_characters(
+    client: AsyncClient, db_session: AsyncSession, query: str
+):
+    await QuizFactory.create(title="Geography", description="Capitals")
+
+    response = await client.get("/api/quizzes/search", params={"q": query})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+
+@pytest.mark.parametrize("query", ["", "q=x&limit=0", "q=x&limit=101"])
+async def test_search_quizzes_invalid(
+    client: AsyncClient, db_session: AsyncSession, query: str
+):
+    response = await client.get(f"/api/quizzes/search?{query}")
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.parametrize("cases", ["found", "not_found"])
 async def test_get_quiz(client: AsyncClient, db_session: AsyncSession, cases: str):
     quiz_id = 4
@@ -238,3 +718,316 @@ async def test_modify_quiz_unauthorized(
         assert response.status_code == status.HTTP_403_FORBIDDEN
     else:
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.parametrize("n_questions", [0, 3, 20])
+async def test_get_full_quiz(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    sql_statements: list[str],
+    n_questions: int,
+):
+    quiz = await QuizFactory.create()
+    questions = await QuestionFactory.create_batch(n_questions, quiz=quiz)
+    options = {}
+    for question in questions:
+        question_options = await AnswerOptionFactory.create_batch(2, question=question)
+        options[question.id] = {option.id for option in question_options}
+
+    sql_statements.clear()
+    response = await client.get(f"/api/quizzes/{quiz.id}/full")
+
+    assert response.status_code == status.HTTP_200_OK
+
+    full_quiz = response.json()
+    assert full_quiz["id"] == quiz.id
+    assert {q["id"] for q in full_quiz["questions"]} == {q.id for q in questions}
+    for returned in full_quiz["questions"]:
+        assert returned["quiz_id"] == quiz.id
+        assert {o["id"] for o in returned["answer_options"]} == options[returned["id"]]
+
+    # quiz, questions and answer options, whatever the size of the quiz
+    selects = [s for s in sql_statements if s.startswith("SELECT")]
+    assert len(selects) == (3 if n_questions else 2)
+
+
+async def test_get_full_quiz_not_found(client: AsyncClient, db_session: AsyncSession):
+    response = await client.get("/api/quizzes/123/full")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize("cases", ["valid", "invalid_option", "empty"])
+async def test_create_questions_batch(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    auth_info: AuthInfo,
+    sql_statements: list[str],
+    cases: str,
+):
+    quiz = await QuizFactory.create(user=auth_info.user)
+    questions_data: list[dict] = [
+        {
+            "content": f"Question {i}",
+            "type": "multiple_choice",
+            "points": i + 1,
+            "answer_options": [
+                {"content": f"Option {i}.{j}", "is_correct": j == 0}
+                for j in range(i % 3)
+            ],
+        }
+        for i in range(10)
+    ]
+    if cases == "invalid_option":
+        questions_data[-1]["answer_options"].append({"is_correct": True})
+    elif cases == "empty":
+        questions_data = []
+
+    sql_statements.clear()
+    response = await client.post(
+        f"/api/quizzes/{quiz.id}/questions/batch",
+        json=questions_data,
+        headers=auth_info.headers,
+    )
+
+    db_questions = await models.Question.get_by_quiz_id(db=db_session, quiz_id=quiz.id)
+    if cases != "valid":
+        # nothing is created if any of the questions is invalid
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert db_questions == []
+        return
+
+    assert response.status_code == status.HTTP_201_CREATED
+
+    created = response.json()
+    assert [q["id"] for q in created] == sorted(q.id for q in db_questions)
+    for question_data, returned in zip(questions_data, created):
+        db_question = await models.Question.get_with_answers(
+            db=db_session, id=returned["id"]
+        )
+        assert db_question
+        assert db_question.content == question_data["content"]
+        assert db_question.points == question_data["points"]
+        # the ids of the answer options are returned in the order they were given
+        contents = {o.id: o.content for o in db_question.answer_options}
+        assert [contents[id] for id in returned["answer_option_ids"]] == [
+            o["content"] for o in question_data["answer_options"]
+        ]
+
+    # one multi-row INSERT for the questions and another one for the answer options
+    # if the database can return their ids in order (one per row in SQLite)
+    dialect = db_session.get_bind().dialect
+    postgresql = dialect.name == "postgresql"
+    n_options = sum(len(q["answer_options"]) for q in questions_data)
+    inserts = [s for s in sql_statements if s.startswith("INSERT")]
+    assert len([s for s in inserts if "INTO questions" in s]) == (
+        1 if postgresql else len(questions_data)
+    )
+    assert len([s for s in inserts if "INTO answer_options" in s]) == (
+        1 if postgresql else n_options
+    )
+
+
+async def test_create_questions_batch_unauthorized(
+    client: AsyncClient, db_session: AsyncSession, auth_info: AuthInfo
+):
+    quiz = await QuizFactory.create()
+
+    response = await client.post(
+        f"/api/quizzes/{quiz.id}/questions/batch",
+        json=[{"content": "Question", "type": "multiple_choice"}],
+        headers=auth_info.headers,
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        "update_quiz",
+        "delete_quiz",
+        "create_question",
+        "update_question",
+        "create_option",
+        "update_option",
+    ],
+)
+async def test_get_full_quiz_cached(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    sql_statements: list[str],
+    write: str,
+):
+    quiz = await QuizFactory.create()
+    question = await QuestionFactory.create(quiz=quiz)
+    option = await AnswerOptionFactory.create(question=question)
+
+    first = await client.get(f"/api/quizzes/{quiz.id}/full")
+    sql_statements.clear()
+    second = await client.get(f"/api/quizzes/{quiz.id}/full")
+
+    assert second.status_code == status.HTTP_200_OK
+    assert second.json() == first.json()
+    # served from memory, without even opening a session
+    assert sql_statements == []
+
+    if write == "update_quiz":
+        await models.Quiz.update(db=db_session, current=quiz, new={"title": "New"})
+    elif write == "delete_quiz":
+        await models.Quiz.delete(db=db_session, db_obj=quiz)
+    elif write == "create_question":
+        await models.Question.create(
+            db=db_session, question=schemas.QuestionCreate(quiz_id=quiz.id, content="?")
+        )
+    elif write == "update_question":
+        await models.Question.update(
+            db=db_session, current=question, new={"content": "New"}
+        )
+    elif write == "create_option":
+        await models.AnswerOption.create(
+            db=db_session,
+            option=schemas.AnswerOptionCreate(question_id=question.id, content="New"),
+        )
+    else:
+        await models.AnswerOption.update(
+            db=db_session, current=option, new={"content": "New"}
+        )
+
+    # the app uses a new session per request, the test shares the same one
+    url = f"/api/quizzes/{quiz.id}/full"
+    db_session.expire_all()
+    response = await client.get(url)
+
+    if write == "delete_quiz":
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        return
+
+    assert response.status_code == status.HTTP_200_OK
+    full_quiz = response.json()
+    if write == "update_quiz":
+        assert full_quiz["title"] == "New"
+    elif write == "create_question":
+        assert len(full_quiz["questions"]) == 2
+    elif write == "update_question":
+        assert full_quiz["questions"][0]["content"] == "New"
+    elif write == "create_option":
+        assert len(full_quiz["questions"][0]["answer_options"]) == 2
+    else:
+        assert full_quiz["questions"][0]["answer_options"][0]["content"] == "New"
+
+
+async def test_get_quizzes_cached(
+    client: AsyncClient, db_session: AsyncSession, auth_info: AuthInfo
+):
+    await QuizFactory.create_batch(3)
+    response = await client.get("/api/quizzes", params={"limit": 2})
+    assert len(response.json()) == 2
+    cursor = response.headers["X-Next-Cursor"]
+
+    # the header is cached with the body
+    response = await client.get("/api/quizzes", params={"limit": 2})
+    assert response.headers["X-Next-Cursor"] == cursor
+
+    # a new quiz is on the first page right away
+    await models.Quiz.create(
+        db=db_session,
+        quiz=schemas.QuizCreate(title="Newest", created_by=auth_info.user.id),
+    )
+    response = await client.get("/api/quizzes", params={"limit": 2})
+    assert response.json()[0]["title"] == "Newest"
+
+
+@pytest.mark.parametrize("cases", ["unchanged", "unchanged_cached", "updated"])
+async def test_get_quiz_etag(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    sql_statements: list[str],
+    cases: str,
+):
+    quiz = await QuizFactory.create()
+    url = f"/api/quizzes/{quiz.id}"
+    response = await client.get(url)
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    if cases == "unchanged":
+        response_cache.clear()
+    elif cases == "updated":
+        await models.Quiz.update(db=db_session, current=quiz, new={"title": "New"})
+
+    sql_statements.clear()
+    response = await client.get(url, headers={"If-None-Match": etag})
+    selects = [s for s in sql_statements if s.startswith("SELECT")]
+
+    if cases == "updated":
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["title"] == "New"
+        assert response.headers["ETag"] != etag
+    else:
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+        # only updated_at is read (or nothing, if the response is cached)
+        assert len(selects) == (1 if cases == "unchanged" else 0)
+        assert all("title" not in s for s in selects)
+
+
+@pytest.mark.parametrize(
+    "cases", ["unchanged", "create_question", "update_question", "delete_question"]
+)
+async def test_get_all_questions_from_quiz_etag(
+    client: AsyncClient, db_session: AsyncSession, cases: str
+):
+    quiz = await QuizFactory.create()
+    questions = await QuestionFactory.create_batch(2, quiz=quiz)
+    url = f"/api/quizzes/{quiz.id}/questions"
+    response = await client.get(url)
+    etag = response.headers["ETag"]
+
+    # check the ETag with the database, not from the cached response
+    response_cache.clear()
+    if cases == "create_question":
+        await models.Question.create(
+            db=db_session, question=schemas.QuestionCreate(quiz_id=quiz.id, content="?")
+        )
+    elif cases == "update_question":
+        await models.Question.update(
+            db=db_session, current=questions[0], new={"content": "New"}
+        )
+    elif cases == "delete_question":
+        await models.Question.delete(db=db_session, db_obj=questions[1])
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+
+    if cases == "unchanged":
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    else:
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("response_class", [JSONResponse, ORJSONResponse])
+async def test_update_quiz_response_class(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    auth_info: AuthInfo,
+    response_class: type[JSONResponse],
+):
+    # same routes as the app, with the response class of FAST_JSON_RESPONSES
+    fast_app = FastAPI(default_response_class=response_class)
+    fast_app.include_router(api_router, prefix="/api")
+    fast_app.dependency_overrides = app.dependency_overrides
+    quiz = await QuizFactory.create(user=auth_info.user)
+
+    async with AsyncClient(app=fast_app, base_url="http://test") as fast_client:
+        response = await fast_client.put(
+            f"/api/quizzes/{quiz.id}",
+            json={"title": "New title"},
+            headers=auth_info.headers,
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == schemas.QuizReturn.model_validate(quiz).model_dump(
+        mode="json"
+    )
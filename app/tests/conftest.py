@@ -1,6 +1,7 @@
 import asyncio
+from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Generator
 
 import pytest
 from httpx import AsyncClient
@@ -9,9 +10,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, SessionTransaction
 from sqlalchemy.sql import text
 
-from app.core.security import create_access_token
+from app.core.cache import CacheStats, TTLCache
+from app.core.leaderboard import Leaderboards, leaderboards
+from app.core.percentiles import ScoreHistograms, score_histograms
+from app.core.response_cache import response_cache
+from app.core.scoring import answer_key_cache
+from app.core.security import create_access_token, principal_cache, token_cache
 from app.main import app
-from app.models.database import AsyncSessionLocal, Base, async_engine, get_session
+from app.models.attempt_writer import AttemptWriter, get_attempt_writer
+from app.models.database import (
+    AsyncSessionLocal,
+    Base,
+    async_engine,
+    get_read_session,
+    get_read_session_factory,
+    get_session,
+    get_session_factory,
+)
 from app.models.user import User
 from app.tests.factories.answer_options_factory import AnswerOptionFactory
 from app.tests.factories.question_factory import QuestionFactory
@@ -50,6 +65,22 @@ async def db_connection() -> None:
         await connection.run_sync(Base.metadata.create_all)
 
 
+@pytest.fixture(scope="function", autouse=True)
+def clear_caches() -> None:
+    """
+    Fixture to make sure that process-local caches do not leak between tests
+    (the database is rolled back after each test).
+    """
+    caches: list[TTLCache] = [token_cache, principal_cache, answer_key_cache]
+    for cache in caches:
+        cache.clear()
+        cache.stats = CacheStats()
+    leaderboards.clear()
+    score_histograms.clear()
+    response_cache.clear()
+    response_cache.stats = CacheStats()
+
+
 @pytest.fixture(scope="function")
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_engine.connect() as conn:
@@ -79,13 +110,82 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 @pytest.fixture(scope="function")
-async def client(db_session) -> AsyncGenerator[AsyncClient, None]:
+def sql_statements() -> Generator[list[str], None, None]:
+    """
+    Fixture to record the SQL statements sent to the database during a test
+    (including the SAVEPOINT statements used by the db_session fixture).
+    """
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record_statement)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record_statement)
+
+
+@pytest.fixture(scope="function")
+async def attempt_writer(db_session) -> AsyncGenerator[AttemptWriter, None]:
+    """
+    Fixture to get an attempt writer that uses the DB session from the fixture.
+    """
+    writer = AttemptWriter(
+        session_factory=lambda: nullcontext(db_session),
+        flush_size=100,
+        flush_interval_sec=0.01,
+    )
+    yield writer
+    await writer.close()
+
+
+@pytest.fixture(scope="function")
+def leaderboards_db(
+    db_session, monkeypatch: pytest.MonkeyPatch
+) -> Generator[Leaderboards, None, None]:
+    """
+    Fixture to make the leaderboards use the DB session from the fixture (the global
+    instance is patched, because it is also invalidated by the models).
+    """
+    monkeypatch.setattr(
+        leaderboards, "session_factory", lambda: nullcontext(db_session)
+    )
+    yield leaderboards
+    leaderboards.clear()
+
+
+@pytest.fixture(scope="function")
+def score_histograms_db(
+    db_session, monkeypatch: pytest.MonkeyPatch
+) -> Generator[ScoreHistograms, None, None]:
+    """
+    Fixture to make the score histograms use the DB session from the fixture.
+    """
+    monkeypatch.setattr(
+        score_histograms, "session_factory", lambda: nullcontext(db_session)
+    )
+    yield score_histograms
+    score_histograms.clear()
+
+
+@pytest.fixture(scope="function")
+async def client(
+    db_session, attempt_writer, leaderboards_db, score_histograms_db
+) -> AsyncGenerator[AsyncClient, None]:
     # override get_session dependency to return the DB session from the fixture
     # (instead of creating a new one)
     def override_get_session():
         yield db_session
 
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.dependency_overrides[get_session_factory] = lambda: lambda: nullcontext(
+        db_session
+    )
+    app.dependency_overrides[get_read_session_factory] = lambda: lambda: nullcontext(
+        db_session
+    )
+    app.dependency_overrides[get_attempt_writer] = lambda: attempt_writer
 
     async with AsyncClient(app=app, base_url="http://test") as client:
         yield client
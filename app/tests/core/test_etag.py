@@ -0,0 +1,24 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.etag import etag_matches, weak_etag
+
+ETAG = weak_etag(1, datetime(2026, 1, 1))
+
+
+@pytest.mark.parametrize(
+    "if_none_match, matches",
+    [
+        (None, False),
+        ("", False),
+        (ETAG, True),
+        # weak comparison
+        (ETAG.removeprefix("W/"), True),
+        (f'W/"other", {ETAG}', True),
+        ("*", True),
+        (weak_etag(1, datetime(2026, 1, 2)), False),
+    ],
+)
+def test_etag_matches(if_none_match: str | None, matches: bool):
+    assert etag_matches(if_none_match, ETAG) == matches
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.executor import BoundedExecutor, ExecutorSaturatedError
+
+
+async def test_bounded_executor_cancelled_job_keeps_slot():
+    executor = BoundedExecutor(kind="thread", max_workers=1, max_queue=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_job() -> int:
+        started.set()
+        release.wait(timeout=5)
+        return 1
+
+    task = asyncio.create_task(executor.run(blocking_job))
+    await asyncio.to_thread(started.wait, 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # the worker is still running the cancelled job
+    assert executor.stats.running == 1
+    with pytest.raises(ExecutorSaturatedError):
+        await executor.run(blocking_job)
+
+    release.set()
+    for _ in range(100):
+        if executor.stats.running == 0:
+            break
+        await asyncio.sleep(0.01)
+
+    assert executor.stats.running == 0
+    assert executor.stats.completed == 1
+    assert await executor.run(lambda: 2) == 2
+    executor.shutdown()
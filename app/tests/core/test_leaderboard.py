@@ -0,0 +1,141 @@
+import asyncio
+from contextlib import nullcontext
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+from app.core.leaderboard import LeaderboardEntry, Leaderboards, QuizLeaderboard
+from app.core.scoring import regrade_quiz
+from app.schemas import QuizAttemptScored, UserAnswerCreate
+from app.tests.factories.answer_options_factory import AnswerOptionFactory
+from app.tests.factories.question_factory import QuestionFactory
+from app.tests.factories.quiz_factory import QuizFactory
+from app.tests.factories.user_factory import UserFactory
+
+
+def entry(attempt_id: int, score: int) -> LeaderboardEntry:
+    return LeaderboardEntry(
+        attempt_id=attempt_id, user_id=1, score=score, attempted_at=datetime.utcnow()
+    )
+
+
+def test_quiz_leaderboard():
+    board = QuizLeaderboard(size=3)
+
+    added = [board.offer(entry(id, score)) for id, score in [(1, 5), (2, 7), (3, 5)]]
+    assert added == [True, True, True]
+    # worse than (or tied with, but newer than) the last one
+    assert not board.offer(entry(4, 5))
+    assert not board.offer(entry(5, 1))
+    # already in the leaderboard
+    assert not board.offer(entry(2, 7))
+
+    assert board.offer(entry(6, 6))
+    assert [(e.attempt_id, e.score) for e in board.top(10)] == [(2, 7), (6, 6), (1, 5)]
+    assert [e.attempt_id for e in board.top(2)] == [2, 6]
+    assert len(board) == 3
+
+
+async def create_attempts(
+    db: AsyncSession, quiz: models.Quiz, scores: list[int]
+) -> list[int]:
+    user = await UserFactory.create()
+    created = await models.QuizAttempt.create_batch(
+        db=db,
+        attempts=[
+            QuizAttemptScored(quiz_id=quiz.id, user_id=user.id, score=score, answers=[])
+            for score in scores
+        ],
+    )
+    return [id for id, _ in created]
+
+
+async def test_leaderboards_rebuild(db_session: AsyncSession):
+    leaderboards = Leaderboards(
+        session_factory=lambda: nullcontext(db_session),
+        size=3,
+        max_quizzes=10,
+        ttl_sec=60,
+    )
+    quiz = await QuizFactory.create()
+    ids = await create_attempts(db_session, quiz, [3, 8, 1, 8, 5])
+
+    top = await leaderboards.top(quiz.id, limit=10)
+    assert top is not None
+    assert [(e.attempt_id, e.score) for e in top] == [
+        (ids[1], 8),
+        (ids[3], 8),
+        (ids[4], 5),
+    ]
+    assert leaderboards.rebuilds == 1
+
+    # new attempts are added in memory, without reading the database again
+    leaderboards.record(quiz.id, entry(1000, 6))
+    top = await leaderboards.top(quiz.id, limit=3)
+    assert top is not None
+    assert [e.score for e in top] == [8, 8, 6]
+    assert leaderboards.rebuilds == 1
+
+    assert await leaderboards.top(quiz.id + 1, limit=10) is None
+
+
+async def test_leaderboards_record_during_rebuild(db_session: AsyncSession):
+    leaderboards = Leaderboards(
+        session_factory=lambda: nullcontext(db_session),
+        size=3,
+        max_quizzes=10,
+        ttl_sec=60,
+    )
+    quiz = await QuizFactory.create()
+    await create_attempts(db_session, quiz, [3])
+
+    # readers wait for the same rebuild, and attempts submitted meanwhile are kept
+    first = asyncio.create_task(leaderboards.top(quiz.id, limit=10))
+    second = asyncio.create_task(leaderboards.top(quiz.id, limit=10))
+    await asyncio.sleep(0)
+    leaderboards.record(quiz.id, entry(1000, 9))
+
+    for top in await asyncio.gather(first, second):
+        assert top is not None
+        assert [e.score for e in top] == [9, 3]
+    assert leaderboards.rebuilds == 1
+
+
+@pytest.mark.parametrize("cases", ["regrade", "delete_quiz"])
+async def test_leaderboards_invalidated(
+    db_session: AsyncSession, leaderboards_db: Leaderboards, cases: str
+):
+    quiz = await QuizFactory.create()
+    question = await QuestionFactory.create(quiz=quiz, points=4)
+    right = await AnswerOptionFactory.create(question=question, is_correct=True)
+    user = await UserFactory.create()
+    await models.QuizAttempt.create_batch(
+        db=db_session,
+        attempts=[
+            QuizAttemptScored(
+                quiz_id=quiz.id,
+                user_id=user.id,
+                score=4,
+                answers=[
+                    UserAnswerCreate(question_id=question.id, chosen_option_id=right.id)
+                ],
+            )
+        ],
+    )
+    top = await leaderboards_db.top(quiz.id, limit=10)
+    assert top is not None
+    assert [e.score for e in top] == [4]
+
+    if cases == "regrade":
+        await models.AnswerOption.update(
+            db=db_session, current=right, new={"is_correct": False}
+        )
+        assert await regrade_quiz(db=db_session, quiz_id=quiz.id) == 1
+        top = await leaderboards_db.top(quiz.id, limit=10)
+        assert top is not None
+        assert [e.score for e in top] == [0]
+    else:
+        await models.Quiz.delete(db=db_session, db_obj=quiz)
+        assert await leaderboards_db.top(quiz.id, limit=10) is None
@@ -0,0 +1,103 @@
+from contextlib import nullcontext
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+from app.core.percentiles import ScoreHistogram, ScoreHistograms, recompute_histograms
+from app.schemas import QuizAttemptScored
+from app.tests.factories.quiz_factory import QuizFactory
+from app.tests.factories.user_factory import UserFactory
+
+SCORES = [3, 7, 7, 12, -2, 0, 25, 7, 18, 4]
+
+
+def exact_percentile(scores: list[int], score: int) -> float:
+    return 100 * sum(s < score for s in scores) / len(scores)
+
+
+@pytest.mark.parametrize("bucket_width", [1, 5])
+def test_score_histogram(bucket_width: int):
+    histogram = ScoreHistogram(bucket_width=bucket_width)
+    assert histogram.percentile(5) == 0.0
+
+    for score in SCORES:
+        histogram.add(score)
+
+    assert histogram.total == len(SCORES)
+    for score in range(-5, 30):
+        error = abs(histogram.percentile(score) - exact_percentile(SCORES, score))
+        assert error <= histogram.error_bound(score) + 1e-9
+        if bucket_width == 1:
+            assert error == 0
+
+
+def test_score_histogram_from_counts():
+    loaded = ScoreHistogram(bucket_width=1, counts=[(-2, 1), (3, 2), (7, 1)])
+    added = ScoreHistogram(bucket_width=1)
+    for score in [3, 7, -2, 3]:
+        added.add(score)
+
+    for score in range(-3, 10):
+        assert loaded.percentile(score) == added.percentile(score)
+
+
+async def test_score_histograms(db_session: AsyncSession):
+    histograms = ScoreHistograms(
+        session_factory=lambda: nullcontext(db_session),
+        bucket_width=1,
+        max_quizzes=10,
+        ttl_sec=60,
+    )
+    user = await UserFactory.create()
+    quiz = await QuizFactory.create()
+    await models.QuizAttempt.create_batch(
+        db=db_session,
+        attempts=[
+            QuizAttemptScored(quiz_id=quiz.id, user_id=user.id, score=s, answers=[])
+            for s in SCORES
+        ],
+    )
+
+    assert await histograms.percentile(quiz.id, 7) == exact_percentile(SCORES, 7)
+    # scores recorded in memory are used without loading the histogram again
+    histograms.record(quiz.id, 1)
+    assert await histograms.percentile(quiz.id, 7) == exact_percentile(SCORES + [1], 7)
+    assert histograms.loads == 1
+
+
+async def test_recompute_histograms(db_session: AsyncSession):
+    user = await UserFactory.create()
+    quizzes = await QuizFactory.create_batch(2)
+    await models.QuizAttempt.create_batch(
+        db=db_session,
+        attempts=[
+            QuizAttemptScored(quiz_id=quiz.id, user_id=user.id, score=s, answers=[])
+            for quiz in quizzes
+            for s in SCORES
+        ],
+    )
+    expected = [
+        await models.ScoreBucket.get_by_quiz(db=db_session, quiz_id=quiz.id)
+        for quiz in quizzes
+    ]
+    assert sum(count for _, count in expected[0]) == len(SCORES)
+
+    # the counts are lost (or wrong, e.g. after deleting a user)
+    await db_session.execute(delete(models.ScoreBucket))
+    await recompute_histograms(db=db_session)
+
+    for quiz, buckets in zip(quizzes, expected):
+        assert (
+            await models.ScoreBucket.get_by_quiz(db=db_session, quiz_id=quiz.id)
+            == buckets
+        )
+
+    # buckets of negative scores are the same as in Python
+    await models.ScoreBucket.recompute(
+        db=db_session, bucket_width=5, quiz_id=quizzes[0].id
+    )
+    assert await models.ScoreBucket.get_by_quiz(
+        db=db_session, quiz_id=quizzes[0].id
+    ) == [(-1, 1), (0, 3), (1, 3), (2, 1), (3, 1), (5, 1)]
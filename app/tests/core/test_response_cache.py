@@ -0,0 +1,53 @@
+import pytest
+
+from app.core.response_cache import CachedResponse, ResponseCache
+
+
+def body(size: int) -> CachedResponse:
+    return CachedResponse(b"x" * size)
+
+
+def test_response_cache_invalidate():
+    cache = ResponseCache(max_bytes=1000, ttl_sec=60)
+    cache.set("a", body(10), tags=[("quiz", 1)], generation=cache.generation)
+    cache.set("b", body(10), tags=[("quiz", 1), "quizzes"], generation=0)
+    cache.set("c", body(10), tags=["quizzes"], generation=cache.generation)
+
+    cache.invalidate(("quiz", 1))
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") == body(10)
+    assert cache.size_bytes == 10
+
+    # the response was read before the invalidation, so it may be outdated
+    cache.set("a", body(10), tags=[("quiz", 1)], generation=0)
+    assert cache.get("a") is None
+
+
+def test_response_cache_max_bytes():
+    cache = ResponseCache(max_bytes=100, ttl_sec=60)
+    for key in ["a", "b", "c"]:
+        cache.set(key, body(40), tags=[key], generation=cache.generation)
+    assert cache.get("a") is None
+
+    # replaced entries are not counted twice, and the least recently used is evicted
+    cache.get("b")
+    cache.set("c", body(30), tags=["c"], generation=cache.generation)
+    cache.set("d", body(30), tags=["d"], generation=cache.generation)
+    assert [key for key in "abcd" if cache.get(key)] == ["b", "c", "d"]
+    assert cache.size_bytes == 100
+
+    # bigger than the whole cache
+    cache.set("e", body(101), tags=["e"], generation=cache.generation)
+    assert cache.get("e") is None
+    assert cache.stats.evictions == 1
+
+
+@pytest.mark.parametrize("ttl_sec", [-1, 0])
+def test_response_cache_disabled(ttl_sec: float):
+    cache = ResponseCache(max_bytes=100, ttl_sec=ttl_sec)
+    cache.set("a", body(10), tags=["a"], generation=cache.generation)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,174 @@
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+from app.core.scoring import (
+    AnswerKey,
+    InvalidAnswersError,
+    answer_key_cache,
+    get_answer_key,
+    regrade_quiz,
+)
+from app.schemas import QuizAttemptScored, UserAnswerCreate
+from app.tests.factories.answer_options_factory import AnswerOptionFactory
+from app.tests.factories.question_factory import QuestionFactory
+from app.tests.factories.quiz_factory import QuizFactory
+from app.tests.factories.user_factory import UserFactory
+
+# (question id, points, answer option id, is_correct) of a quiz with 3 questions,
+# where the last one is an open question (without answer options)
+ANSWER_KEY_ROWS: list[tuple[int, int, int | None, bool | None]] = [
+    (1, 2, 10, True),
+    (1, 2, 11, False),
+    (2, 3, 20, False),
+    (2, 3, 21, True),
+    (3, 5, None, None),
+]
+
+
+def answers(*pairs: tuple[int, int]) -> list[UserAnswerCreate]:
+    return [
+        UserAnswerCreate(question_id=question_id, chosen_option_id=option_id)
+        for question_id, option_id in pairs
+    ]
+
+
+def test_score_batch():
+    answer_key = AnswerKey.compile(ANSWER_KEY_ROWS)
+
+    scores = answer_key.score_batch(
+        [
+            answers((1, 10), (2, 21)),
+            answers((2, 21), (1, 11)),
+            answers((1, 11), (2, 20)),
+            answers(),
+            answers((1, 10)),
+        ]
+    )
+
+    assert scores.tolist() == [5, 3, 0, 0, 2]
+    assert answer_key.score(answers((2, 21))) == 3
+
+
+@pytest.mark.parametrize(
+    "invalid, message",
+    [
+        (answers((4, 10)), "Question 4 does not belong to the quiz"),
+        (answers((1, 10), (1, 11)), "Question 1 is answered more than once"),
+        (answers((1, 20)), "Answer option 20 does not belong to question 1"),
+        (answers((1, 99)), "Answer option 99 does not belong to question 1"),
+        (answers((3, 10)), "Answer option 10 does not belong to question 3"),
+    ],
+)
+def test_score_batch_invalid(invalid: list[UserAnswerCreate], message: str):
+    answer_key = AnswerKey.compile(ANSWER_KEY_ROWS)
+
+    with pytest.raises(InvalidAnswersError, match=message) as error:
+        answer_key.score_batch([answers((1, 10)), answers((2, 20)), invalid])
+
+    assert error.value.attempt == 2
+
+
+async def test_get_answer_key_cache(
+    db_session: AsyncSession,
+    sql_statements: list[str],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    def selects() -> list[str]:
+        return [s for s in sql_statements if s.startswith("SELECT")]
+
+    async def score(answer_key: AnswerKey | None) -> int:
+        assert answer_key is not None
+        return answer_key.score(answers((question.id, option.id)))
+
+    monkeypatch.setattr(answer_key_cache, "trust_sec", 60)
+    quiz = await QuizFactory.create()
+    question = await QuestionFactory.create(quiz=quiz, points=4)
+    option = await AnswerOptionFactory.create(question=question, is_correct=True)
+
+    # version and key
+    sql_statements.clear()
+    answer_key = await get_answer_key(db=db_session, quiz_id=quiz.id)
+    assert await score(answer_key) == 4
+    assert len(selects()) == 2
+
+    # the same (read-only) key is used without reading the version again
+    assert await get_answer_key(db=db_session, quiz_id=quiz.id) is answer_key
+    assert len(selects()) == 2
+    assert answer_key is not None and not answer_key.option_points.flags.writeable
+
+    # changed by this process: the version is read again right away
+    await models.AnswerOption.update(
+        db=db_session, current=option, new={"is_correct": False}
+    )
+    sql_statements.clear()
+    answer_key = await get_answer_key(db=db_session, quiz_id=quiz.id)
+    assert await score(answer_key) == 0
+    assert len(selects()) == 2
+
+    # changed by another process: only seen once the version is checked again
+    await models.Quiz.bump_answer_key_version(db=db_session, id=quiz.id)
+    await db_session.commit()
+    await db_session.execute(
+        update(models.AnswerOption)
+        .where(models.AnswerOption.id == option.id)
+        .values(is_correct=True)
+    )
+    await db_session.commit()
+    assert await get_answer_key(db=db_session, quiz_id=quiz.id) is answer_key
+    monkeypatch.setattr(answer_key_cache, "trust_sec", 0)
+    sql_statements.clear()
+    assert await score(await get_answer_key(db=db_session, quiz_id=quiz.id)) == 4
+    assert len(selects()) == 2
+
+    # version checked again, but the key did not change
+    sql_statements.clear()
+    await get_answer_key(db=db_session, quiz_id=quiz.id)
+    assert len(selects()) == 1
+
+    # cached keys of deleted quizzes are dropped
+    await models.Quiz.delete(
+        db=db_session,
+        db_obj=await models.Quiz.get(db=db_session, id=quiz.id),
+    )
+    assert answer_key_cache.get(quiz.id) is None
+    assert await get_answer_key(db=db_session, quiz_id=quiz.id) is None
+
+
+async def test_regrade_quiz(db_session: AsyncSession):
+    user = await UserFactory.create()
+    quiz = await QuizFactory.create()
+    question = await QuestionFactory.create(quiz=quiz, points=4)
+    right = await AnswerOptionFactory.create(question=question, is_correct=True)
+    wrong = await AnswerOptionFactory.create(question=question, is_correct=False)
+
+    created = await models.QuizAttempt.create_batch(
+        db=db_session,
+        attempts=[
+            QuizAttemptScored(
+                quiz_id=quiz.id,
+                user_id=user.id,
+                score=score,
+                answers=answers((question.id, option.id)),
+            )
+            for option, score in [(right, 4), (wrong, 0), (wrong, 0)]
+        ]
+        + [QuizAttemptScored(quiz_id=quiz.id, user_id=user.id, score=0, answers=[])],
+    )
+
+    # the correct option was the other one
+    await models.AnswerOption.update(
+        db=db_session, current=right, new={"is_correct": False}
+    )
+    await models.AnswerOption.update(
+        db=db_session, current=wrong, new={"is_correct": True}
+    )
+
+    assert await regrade_quiz(db=db_session, quiz_id=quiz.id) == 3
+    assert await models.QuizAttempt.get_scores_by_quiz(
+        db=db_session, quiz_id=quiz.id
+    ) == [(id, score) for (id, _), score in zip(created, [0, 4, 4, 0])]
+
+    # nothing changes if the answer key is the same
+    assert await regrade_quiz(db=db_session, quiz_id=quiz.id) == 0
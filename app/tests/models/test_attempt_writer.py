@@ -0,0 +1,133 @@
+import asyncio
+from contextlib import nullcontext
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+from app.models.attempt_writer import AttemptWriter
+from app.schemas import QuizAttemptScored, UserAnswerCreate
+from app.tests.factories.answer_options_factory import AnswerOptionFactory
+from app.tests.factories.user_factory import UserFactory
+
+
+def make_writer(db: AsyncSession, flush_size: int, flush_interval_sec: float):
+    return AttemptWriter(
+        session_factory=lambda: nullcontext(db),
+        flush_size=flush_size,
+        flush_interval_sec=flush_interval_sec,
+    )
+
+
+async def count_attempts(db: AsyncSession) -> int:
+    return await db.scalar(select(func.count(models.QuizAttempt.id))) or 0
+
+
+async def test_writer_batches(db_session: AsyncSession):
+    user = await UserFactory.create()
+    option = await AnswerOptionFactory.create()
+    answer = UserAnswerCreate(
+        question_id=option.question_id, chosen_option_id=option.id
+    )
+    quiz_id = option.question.quiz_id
+    # long interval, so batches are only written when they are full
+    writer = make_writer(db_session, flush_size=4, flush_interval_sec=60)
+
+    created = await asyncio.gather(
+        *[
+            writer.submit(
+                QuizAttemptScored(
+                    quiz_id=quiz_id, user_id=user.id, score=score, answers=[answer]
+                )
+            )
+            for score in range(8)
+        ]
+    )
+    await writer.close()
+
+    # each submitter gets the id of its own attempt
+    for score, (attempt_id, _) in enumerate(created):
+        db_attempt = await models.QuizAttempt.get(db=db_session, id=attempt_id)
+        assert db_attempt
+        assert db_attempt.score == score
+    assert await count_attempts(db_session) == 8
+    assert writer.stats.as_dict() == {
+        "flushes": 2,
+        "written": 8,
+        "failed": 0,
+        "max_batch": 4,
+    }
+
+
+async def test_writer_flush_interval(db_session: AsyncSession):
+    user = await UserFactory.create()
+    option = await AnswerOptionFactory.create()
+    writer = make_writer(db_session, flush_size=100, flush_interval_sec=0.01)
+
+    # a single attempt is written after the flush interval
+    attempt = QuizAttemptScored(
+        quiz_id=option.question.quiz_id, user_id=user.id, score=1, answers=[]
+    )
+    await asyncio.wait_for(writer.submit(attempt), timeout=5)
+    await writer.close()
+
+    assert await count_attempts(db_session) == 1
+    assert writer.stats.flushes == 1
+
+
+async def test_writer_failed_attempt(db_session: AsyncSession):
+    user = await UserFactory.create()
+    option = await AnswerOptionFactory.create()
+    writer = make_writer(db_session, flush_size=3, flush_interval_sec=60)
+
+    # an attempt for a quiz that does not exist makes the batch fail, but only that
+    # attempt is lost
+    quiz_ids = [option.question.quiz_id, 12345, option.question.quiz_id]
+    results = await asyncio.gather(
+        *[
+            writer.submit(
+                QuizAttemptScored(quiz_id=quiz_id, user_id=user.id, score=0, answers=[])
+            )
+            for quiz_id in quiz_ids
+        ],
+        return_exceptions=True,
+    )
+    await writer.close()
+
+    assert isinstance(results[1], IntegrityError)
+    assert not isinstance(results[0], Exception)
+    assert not isinstance(results[2], Exception)
+    assert await count_attempts(db_session) == 2
+    assert (writer.stats.written, writer.stats.failed) == (2, 1)
+
+
+@pytest.mark.parametrize("n_pending", [0, 5])
+async def test_writer_close(db_session: AsyncSession, n_pending: int):
+    user = await UserFactory.create()
+    option = await AnswerOptionFactory.create()
+    writer = make_writer(db_session, flush_size=100, flush_interval_sec=60)
+
+    tasks = [
+        asyncio.create_task(
+            writer.submit(
+                QuizAttemptScored(
+                    quiz_id=option.question.quiz_id,
+                    user_id=user.id,
+                    score=0,
+                    answers=[],
+                )
+            )
+        )
+        for _ in range(n_pending)
+    ]
+    await asyncio.sleep(0)
+    assert writer.pending == n_pending
+
+    # closing the writer writes the pending attempts
+    await writer.close()
+    await asyncio.gather(*tasks)
+
+    assert writer.pending == 0
+    assert await count_attempts(db_session) == n_pending
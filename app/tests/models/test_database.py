@@ -0,0 +1,260 @@
+from datetime import datetime, timedelta
+from typing import Any, Coroutine
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+import app.schemas as schemas
+from app.core.response_cache import response_cache
+from app.models.database import (
+    AsyncSessionLocal,
+    Base,
+    get_read_session_factory,
+    replica_router,
+    settings,
+)
+from app.schemas import (
+    AnswerOptionCreate,
+    QuestionCreate,
+    QuestionWithOptionsCreate,
+    QuizCreate,
+    QuizUpdate,
+    UserCreate,
+)
+from app.tests.factories.answer_options_factory import AnswerOptionFactory
+from app.tests.factories.question_factory import QuestionFactory
+from app.tests.factories.quiz_factory import QuizFactory
+from app.tests.factories.user_factory import UserFactory
+
+
+def dml_statements(statements: list[str]) -> list[str]:
+    # ignore transaction handling (SAVEPOINT, RELEASE, etc.)
+    return [
+        s
+        for s in statements
+        if s.split()[0] in ("SELECT", "INSERT", "UPDATE", "DELETE")
+    ]
+
+
+@pytest.mark.parametrize("cases", ["changed", "partially_changed", "unchanged"])
+async def test_update_single_statement(
+    db_session: AsyncSession, sql_statements: list[str], cases: str
+):
+    quiz = await QuizFactory.create(
+        title="Title",
+        description="Description",
+        updated_at=datetime.utcnow() - timedelta(hours=5),
+    )
+    previous_updated_at = quiz.updated_at
+
+    update_data = {"title": "Title", "description": "Description"}
+    if cases != "unchanged":
+        update_data["title"] = "New title"
+    if cases == "changed":
+        update_data["description"] = "New description"
+
+    sql_statements.clear()
+    updated_quiz = await models.Quiz.update(
+        db=db_session, current=quiz, new=QuizUpdate(**update_data)
+    )
+
+    statements = dml_statements(sql_statements)
+    if cases == "unchanged":
+        assert statements == []
+        assert updated_quiz.updated_at == previous_updated_at
+        return
+
+    # a single UPDATE ... RETURNING, with only the modified columns
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE quizzes SET title=?")
+    assert "RETURNING" in statements[0]
+    assert ("description=?" in statements[0]) == (cases == "changed")
+
+    assert updated_quiz.updated_at > previous_updated_at
+    assert not db_session.is_modified(updated_quiz)
+
+    db_quiz = await models.Quiz.get(db=db_session, id=quiz.id)
+    assert db_quiz
+    for key, value in update_data.items():
+        assert getattr(db_quiz, key) == value
+
+
+@pytest.mark.parametrize("model", ["user", "quiz", "question", "answer_option"])
+async def test_create_single_statement(
+    db_session: AsyncSession, sql_statements: list[str], model: str
+):
+    create: Coroutine[Any, Any, Base]
+    if model == "user":
+        create = models.User.create(
+            db=db_session,
+            user=UserCreate(username="user", email="user@example.com", password="1234"),
+        )
+    elif model == "quiz":
+        user = await UserFactory.create()
+        create = models.Quiz.create(
+            db=db_session, quiz=QuizCreate(title="Quiz", created_by=user.id)
+        )
+    elif model == "question":
+        quiz = await QuizFactory.create()
+        create = models.Question.create(
+            db=db_session, question=QuestionCreate(content="Question", quiz_id=quiz.id)
+        )
+    else:
+        question = await QuestionFactory.create()
+        create = models.AnswerOption.create(
+            db=db_session,
+            option=AnswerOptionCreate(content="Option", question_id=question.id),
+        )
+
+    sql_statements.clear()
+    created = await create
+
+    # a single INSERT ... RETURNING, no SELECT to load the generated values (and
+    # an UPDATE of the answer key version of the quiz, for questions and options)
+    statements = dml_statements(sql_statements)
+    inserts = [statement for statement in statements if statement.startswith("INSERT")]
+    assert len(inserts) == 1
+    if model in ["question", "answer_option"]:
+        assert len(statements) == 2
+        assert statements[0].startswith("UPDATE quizzes SET answer_key_version")
+    else:
+        assert len(statements) == 1
+    for key in ["id", "created_at", "updated_at"]:
+        if hasattr(created, key):
+            assert key in created.__dict__
+            assert getattr(created, key) is not None
+
+
+@pytest.mark.parametrize("method", ["delete", "delete_by_id"])
+async def test_delete_cascade_single_statement(
+    db_session: AsyncSession, sql_statements: list[str], method: str
+):
+    quiz = await QuizFactory.create()
+    questions = await QuestionFactory.create_batch(5, quiz=quiz)
+    for question in questions:
+        await AnswerOptionFactory.create_batch(3, question=question)
+
+    sql_statements.clear()
+    deleted: models.Quiz | None
+    if method == "delete":
+        deleted = await models.Quiz.delete(db=db_session, db_obj=quiz)
+    else:
+        deleted = await models.Quiz.delete_by_id(db=db_session, id=quiz.id)
+
+    # questions and answer options are deleted by the database
+    statements = dml_statements(sql_statements)
+    assert len(statements) == 1
+    assert statements[0].startswith("DELETE FROM quizzes WHERE quizzes.id = ?")
+    assert deleted
+    assert deleted.id == quiz.id
+
+    for model in [models.Question, models.AnswerOption]:
+        result = await db_session.execute(select(func.count()).select_from(model))
+        assert result.scalar() == 0
+
+
+async def test_delete_by_id_not_found(db_session: AsyncSession):
+    assert await models.Quiz.delete_by_id(db=db_session, id=1234) is None
+
+
+@pytest.mark.parametrize(
+    "cases",
+    [
+        "create_question",
+        "create_batch",
+        "update_question",
+        "delete_question",
+        "create_option",
+        "update_option",
+        "delete_option",
+        "update_quiz",
+    ],
+)
+async def test_answer_key_version(db_session: AsyncSession, cases: str):
+    quiz = await QuizFactory.create()
+    question = await QuestionFactory.create(quiz=quiz)
+    option = await AnswerOptionFactory.create(question=question)
+    assert await models.Quiz.get_answer_key_version(db=db_session, id=quiz.id) == 0
+
+    if cases == "create_question":
+        await models.Question.create(
+            db=db_session, question=QuestionCreate(content="New", quiz_id=quiz.id)
+        )
+    elif cases == "create_batch":
+        await models.Question.create_batch(
+            db=db_session,
+            quiz_id=quiz.id,
+            questions=[QuestionWithOptionsCreate(content="New")],
+        )
+    elif cases == "update_question":
+        await models.Question.update(
+            db=db_session, current=question, new={"points": question.points + 1}
+        )
+    elif cases == "delete_question":
+        await models.Question.delete(db=db_session, db_obj=question)
+    elif cases == "create_option":
+        await models.AnswerOption.create(
+            db=db_session,
+            option=AnswerOptionCreate(content="New", question_id=question.id),
+        )
+    elif cases == "update_option":
+        await models.AnswerOption.update(
+            db=db_session, current=option, new={"is_correct": not option.is_correct}
+        )
+    elif cases == "delete_option":
+        await models.AnswerOption.delete_by_id(db=db_session, id=option.id)
+    else:
+        await models.Quiz.update(db=db_session, current=quiz, new={"title": "New"})
+
+    # only changes to the questions and answer options affect the answer key
+    expected = 0 if cases == "update_quiz" else 1
+    assert (
+        await models.Quiz.get_answer_key_version(db=db_session, id=quiz.id) == expected
+    )
+
+
+async def test_get_rows(db_session: AsyncSession):
+    quizzes = await QuizFactory.create_batch(3)
+    questions = await QuestionFactory.create_batch(3, quiz=quizzes[0])
+    empty_quiz_id = quizzes[1].id
+
+    rows = await models.Quiz.get_multiple_rows(db=db_session, limit=10)
+    entities = await models.Quiz.get_multiple(db=db_session, limit=10)
+    assert [schemas.QuizReturn.model_validate(row) for row in rows] == [
+        schemas.QuizReturn.model_validate(quiz) for quiz in entities
+    ]
+
+    question_rows = await models.Question.get_rows_by_quiz_id(
+        db=db_session, quiz_id=quizzes[0].id
+    )
+    assert question_rows is not None
+    assert [row["id"] for row in question_rows] == sorted(q.id for q in questions)
+    assert (
+        await models.Question.get_rows_by_quiz_id(db=db_session, quiz_id=empty_quiz_id)
+        == []
+    )
+    assert (
+        await models.Question.get_rows_by_quiz_id(
+            db=db_session, quiz_id=quizzes[-1].id + 1
+        )
+        is None
+    )
+
+
+@pytest.mark.parametrize("cases", ["no_writes", "recent_write", "old_write"])
+def test_read_session_factory_after_write(monkeypatch: pytest.MonkeyPatch, cases: str):
+    monkeypatch.setattr(response_cache, "invalidated_at", float("-inf"))
+    if cases != "no_writes":
+        response_cache.invalidate(("quiz", 1))
+    if cases == "old_write":
+        response_cache.invalidated_at -= settings.DB_REPLICA_MAX_LAG_SEC
+
+    session_factory = get_read_session_factory()
+
+    # replicas may not have the rows written recently, which would then be cached
+    if cases == "recent_write":
+        assert session_factory is AsyncSessionLocal
+    else:
+        assert session_factory == replica_router.session
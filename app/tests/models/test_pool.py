@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.sql import text
+
+from app.models.pool import InstrumentedAsyncQueuePool, get_pool_metrics
+
+
+async def test_pool_metrics(tmp_path: Path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=1,
+    )
+
+    async with engine.connect() as conn_1, engine.connect() as conn_2:
+        await conn_1.execute(text("SELECT 1"))
+        await conn_2.execute(text("SELECT 1"))
+
+        metrics = get_pool_metrics(engine.pool)
+        assert metrics["checked_out"] == 2
+        assert metrics["overflow"] == 1
+
+    metrics = get_pool_metrics(engine.pool)
+    assert metrics["checked_out"] == 0
+    assert metrics["checkouts"] == 2
+    assert metrics["overflow_events"] == 1
+    assert metrics["wait_max_sec"] > 0
+
+    # metrics survive the pool being recreated
+    await engine.dispose()
+    assert get_pool_metrics(engine.pool)["checkouts"] == 2
+
+
+async def test_pool_metrics_endpoint(client: AsyncClient, db_session: AsyncSession):
+    response = await client.get("/api/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    # the test session itself holds a connection from the engine
+    assert response.json()["db_pool"]["checkouts"] >= 1
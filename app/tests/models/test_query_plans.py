@@ -0,0 +1,181 @@
+"""
+Check that the queries of the model methods use indexes instead of scanning whole
+tables, by running EXPLAIN on every SELECT sent to the database by each method.
+"""
+import json
+import re
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Generator
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+from app.models.database import async_engine
+from app.tests.factories.answer_options_factory import AnswerOptionFactory
+from app.tests.factories.question_factory import QuestionFactory
+from app.tests.factories.quiz_factory import QuizFactory
+from app.tests.factories.user_factory import UserFactory
+
+QUIZ_ID = 1000
+QUESTION_ID = 2000
+
+# model method to check -> function that calls it
+QueryCall = Callable[[AsyncSession], Awaitable[Any]]
+QUERIES: dict[str, QueryCall] = {
+    "Base.get": lambda db: models.Quiz.get(db=db, id=QUIZ_ID),
+    "Quiz.get_multiple": lambda db: models.Quiz.get_multiple(db=db, offset=10),
+    "Quiz.get_multiple_cursor": lambda db: models.Quiz.get_multiple(
+        db=db, after=(datetime.utcnow(), QUIZ_ID)
+    ),
+    "Quiz.get_multiple_rows": lambda db: models.Quiz.get_multiple_rows(
+        db=db, after=(datetime.utcnow(), QUIZ_ID)
+    ),
+    "Quiz.get_with_questions": lambda db: models.Quiz.get_with_questions(
+        db=db, id=QUIZ_ID
+    ),
+    "Quiz.get_full": lambda db: models.Quiz.get_full(db=db, id=QUIZ_ID),
+    "Quiz.get_answer_key": lambda db: models.Quiz.get_answer_key(db=db, id=QUIZ_ID),
+    "Quiz.get_answer_key_version": lambda db: models.Quiz.get_answer_key_version(
+        db=db, id=QUIZ_ID
+    ),
+    "Quiz.get_quiz_created_by": lambda db: models.Quiz.get_quiz_created_by(
+        db=db, id=QUIZ_ID
+    ),
+    "Quiz.get_updated_at": lambda db: models.Quiz.get_updated_at(db=db, id=QUIZ_ID),
+    "Quiz.get_questions_updated_at": lambda db: (
+        models.Quiz.get_questions_updated_at(db=db, id=QUIZ_ID)
+    ),
+    "Quiz.search": lambda db: models.Quiz.search(db=db, query="quiz question"),
+    "Question.get_by_quiz_id": lambda db: models.Question.get_by_quiz_id(
+        db=db, quiz_id=QUIZ_ID
+    ),
+    "Question.get_rows_by_quiz_id": lambda db: models.Question.get_rows_by_quiz_id(
+        db=db, quiz_id=QUIZ_ID
+    ),
+    "Question.get_updated_at": lambda db: models.Question.get_updated_at(
+        db=db, id=QUESTION_ID
+    ),
+    "Question.get_with_answers": lambda db: models.Question.get_with_answers(
+        db=db, id=QUESTION_ID
+    ),
+    "Question.get_with_quiz_owner": lambda db: models.Question.get_with_quiz_owner(
+        db=db, id=QUESTION_ID
+    ),
+    "QuizAttempt.get_scores_by_quiz": lambda db: (
+        models.QuizAttempt.get_scores_by_quiz(db=db, quiz_id=QUIZ_ID)
+    ),
+    "QuizAttempt.get_leaderboard": lambda db: models.QuizAttempt.get_leaderboard(
+        db=db, quiz_id=QUIZ_ID, limit=10
+    ),
+    "QuizAttempt.get_by_user": lambda db: models.QuizAttempt.get_by_user(
+        db=db, user_id=1, with_quiz_title=True
+    ),
+    "QuizAttempt.get_by_user_cursor": lambda db: models.QuizAttempt.get_by_user(
+        db=db, user_id=1, after=(datetime.utcnow(), 1)
+    ),
+    "QuizAttempt.get_answers_by_quiz": lambda db: (
+        models.QuizAttempt.get_answers_by_quiz(db=db, quiz_id=QUIZ_ID)
+    ),
+    "ScoreBucket.get_by_quiz": lambda db: models.ScoreBucket.get_by_quiz(
+        db=db, quiz_id=QUIZ_ID
+    ),
+    "User.get_by_username": lambda db: models.User.get_by_username(
+        db=db, username="user"
+    ),
+    "User.get_by_email": lambda db: models.User.get_by_email(
+        db=db, email="user@example.com"
+    ),
+}
+
+
+@pytest.fixture(scope="function")
+async def seeded_db(db_session: AsyncSession) -> AsyncSession:
+    users = await UserFactory.create_batch(3)
+    for i, user in enumerate(users):
+        quiz = await QuizFactory.create(id=QUIZ_ID + i, user=user)
+        questions = await QuestionFactory.create_batch(3, quiz=quiz)
+        for question in questions:
+            await AnswerOptionFactory.create_batch(2, question=question)
+    await QuestionFactory.create(id=QUESTION_ID)
+
+    return db_session
+
+
+@pytest.fixture(scope="function")
+def select_statements() -> Generator[list[tuple[str, Any]], None, None]:
+    statements: list[tuple[str, Any]] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record_statement)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record_statement)
+
+
+async def find_full_scans(db: AsyncSession, statement: str, parameters: Any) -> list:
+    """
+    Return the full table scans in the query plan of the statement.
+    """
+    connection = await db.connection()
+    dialect = connection.dialect.name
+
+    if dialect == "sqlite":
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        )
+        details = [row[-1] for row in result]
+        # rows of subqueries, whose own plans are checked too
+        subqueries = {
+            match[1]
+            for detail in details
+            if (match := re.match(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)$", detail))
+        }
+        # "SCAN table" without an index, or an index created just for this query
+        return [
+            detail
+            for detail in details
+            if (
+                (match := re.match(r"^SCAN (\w+)$", detail))
+                and match[1] not in subqueries
+            )
+            or "AUTOMATIC" in detail
+        ]
+
+    if dialect == "postgresql":
+        # with tiny test tables a sequential scan is always cheaper, so sequential
+        # scans are only used if there is no index that can be used instead
+        await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        plan = result.scalar_one()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        await connection.exec_driver_sql("SET LOCAL enable_seqscan = on")
+
+        def seq_scans(node: dict) -> list:
+            scans = [node["Relation Name"]] if node["Node Type"] == "Seq Scan" else []
+            for child in node.get("Plans", []):
+                scans.extend(seq_scans(child))
+            return scans
+
+        return seq_scans(plan[0]["Plan"])
+
+    pytest.skip(f"EXPLAIN not supported for {dialect}")
+
+
+@pytest.mark.parametrize("name", QUERIES)
+async def test_query_uses_indexes(
+    seeded_db: AsyncSession,
+    select_statements: list[tuple[str, Any]],
+    name: str,
+):
+    await QUERIES[name](seeded_db)
+
+    assert select_statements, f"{name} didn't run any query"
+    for statement, parameters in select_statements:
+        full_scans = await find_full_scans(seeded_db, statement, parameters)
+        assert not full_scans, f"{name} scans whole tables:\n{statement}\n{full_scans}"
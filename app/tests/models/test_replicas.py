@@ -0,0 +1,107 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.sql import text
+
+from app.models.replicas import ReplicaRouter
+
+
+def sqlite_engine(path: Path) -> AsyncEngine:
+    return create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+
+async def create_marker(engine: AsyncEngine, name: str) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE marker (name TEXT)"))
+        await conn.execute(text("INSERT INTO marker VALUES (:name)"), {"name": name})
+
+
+async def read_marker(router: ReplicaRouter) -> str:
+    async with router.session() as session:
+        result = await session.execute(text("SELECT name FROM marker"))
+        return result.scalar_one()
+
+
+@pytest.fixture(scope="function")
+async def engines(tmp_path: Path) -> dict[str, AsyncEngine]:
+    engines = {
+        name: sqlite_engine(tmp_path / f"{name}.db")
+        for name in ["primary", "a", "b", "c"]
+    }
+    for name, engine in engines.items():
+        await create_marker(engine, name)
+
+    return engines
+
+
+async def test_replica_router_round_robin(engines: dict[str, AsyncEngine]):
+    router = ReplicaRouter(
+        primary=engines["primary"],
+        replicas=[engines["a"], engines["b"]],
+        session_factory=async_sessionmaker(),
+    )
+
+    assert [await read_marker(router) for _ in range(4)] == ["a", "b", "a", "b"]
+
+
+async def test_replica_router_least_busy(engines: dict[str, AsyncEngine]):
+    router = ReplicaRouter(
+        primary=engines["primary"],
+        replicas=[engines["a"], engines["b"]],
+        session_factory=async_sessionmaker(),
+        strategy="least_busy",
+    )
+
+    async with router.session() as session:
+        result = await session.execute(text("SELECT name FROM marker"))
+        assert result.scalar_one() == "a"
+        # replica "a" is busy with the open session
+        assert await read_marker(router) == "b"
+
+    assert await read_marker(router) == "a"
+
+
+@pytest.mark.parametrize("cases", ["one_down", "all_down", "no_replicas"])
+async def test_replica_router_fallback(
+    engines: dict[str, AsyncEngine], tmp_path: Path, cases: str
+):
+    # SQLite can't create a database file in a directory that doesn't exist
+    broken_engine = sqlite_engine(tmp_path / "missing" / "replica.db")
+    if cases == "one_down":
+        replicas = [broken_engine, engines["b"]]
+    elif cases == "all_down":
+        replicas = [broken_engine]
+    else:
+        replicas = []
+
+    router = ReplicaRouter(
+        primary=engines["primary"],
+        replicas=replicas,
+        session_factory=async_sessionmaker(),
+    )
+
+    expected = "primary" if cases != "one_down" else "b"
+    # the next replica is tried right away, and the broken one is skipped from now on
+    assert await read_marker(router) == expected
+    assert await read_marker(router) == expected
+    if replicas:
+        assert router.available() == replicas[1:]
+
+
+async def test_replica_router_one_of_three_down(
+    engines: dict[str, AsyncEngine], tmp_path: Path
+):
+    broken_engine = sqlite_engine(tmp_path / "missing" / "replica.db")
+    router = ReplicaRouter(
+        primary=engines["primary"],
+        replicas=[engines["a"], broken_engine, engines["c"]],
+        session_factory=async_sessionmaker(),
+    )
+
+    markers = [await read_marker(router) for _ in range(6)]
+
+    # the load of the broken replica goes to the other replicas, not the primary
+    assert "primary" not in markers
+    assert set(markers) == {"a", "c"}
+    assert router.available() == [engines["a"], engines["c"]]
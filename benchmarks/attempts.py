@@ -0,0 +1,87 @@
+"""
+Compare writing each submitted attempt in its own transaction with the write-behind
+AttemptWriter (batches of attempts with one multi-row INSERT per table), for a burst
+of concurrent submissions.
+
+    $ poetry run python -m benchmarks.attempts
+"""
+import asyncio
+
+from sqlalchemy import insert
+
+import app.models as models
+from app.models.attempt_writer import AttemptWriter
+from app.schemas import QuizAttemptScored, UserAnswerCreate
+from benchmarks.common import measure, temporary_database
+
+N_ATTEMPTS = 2000
+N_QUESTIONS = 20
+
+
+async def main() -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            quiz = models.Quiz(title="Quiz", user=user)
+            db.add(quiz)
+            await db.flush()
+            question_ids = (
+                await db.scalars(
+                    insert(models.Question).returning(models.Question.id),
+                    [
+                        {
+                            "quiz_id": quiz.id,
+                            "content": "Question",
+                            "type": "open",
+                            "points": 1,
+                        }
+                        for _ in range(N_QUESTIONS)
+                    ],
+                )
+            ).all()
+            option_ids = (
+                await db.scalars(
+                    insert(models.AnswerOption).returning(models.AnswerOption.id),
+                    [{"question_id": id, "content": "Option"} for id in question_ids],
+                )
+            ).all()
+            await db.commit()
+
+        attempts = [
+            QuizAttemptScored(
+                quiz_id=quiz.id,
+                user_id=user.id,
+                score=i,
+                answers=[
+                    UserAnswerCreate(
+                        question_id=question_id, chosen_option_id=option_id
+                    )
+                    for question_id, option_id in zip(question_ids, option_ids)
+                ],
+            )
+            for i in range(N_ATTEMPTS)
+        ]
+
+        # all the submissions share the database (SQLite), so they are serialized
+        lock = asyncio.Lock()
+
+        async def submit_directly(attempt: QuizAttemptScored) -> None:
+            async with lock, session_factory() as db:
+                await models.QuizAttempt.create_batch(db=db, attempts=[attempt])
+
+        async with measure(engine, "transaction per attempt", N_ATTEMPTS) as m:
+            await asyncio.gather(*[submit_directly(a) for a in attempts])
+        print(m.report())
+
+        writer = AttemptWriter(
+            session_factory=session_factory, flush_size=500, flush_interval_sec=0.05
+        )
+        async with measure(engine, "write-behind (batches of 500)", N_ATTEMPTS) as m:
+            await asyncio.gather(*[writer.submit(a) for a in attempts])
+            await writer.close()
+        print(m.report())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
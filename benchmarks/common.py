@@ -0,0 +1,83 @@
+"""
+Helpers shared by the benchmarks, which run against a temporary SQLite database
+(with the same tables as the app) to compare different implementations.
+"""
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter, process_time
+from typing import AsyncGenerator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.settings import get_settings
+from app.models.database import AsyncSessionLocal, Base, create_engine
+
+
+@asynccontextmanager
+async def temporary_database() -> (
+    AsyncGenerator[tuple[AsyncEngine, async_sessionmaker[AsyncSession]], None]
+):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # same engine configuration as the app
+        engine = create_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'bench.db'}", get_settings()
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        # same session options as the app
+        session_options = {**AsyncSessionLocal.kw, "bind": engine}
+        yield engine, async_sessionmaker(**session_options)
+        await engine.dispose()
+
+
+@dataclass
+class Measurement:
+    name: str
+    operations: int = 0
+    cpu_sec: float = 0.0
+    wall_sec: float = 0.0
+    statements: list[str] = field(default_factory=list)
+    commits: int = 0
+
+    def report(self) -> str:
+        ops = max(self.operations, 1)
+        # every statement and every COMMIT is a round trip to the database
+        round_trips = (len(self.statements) + self.commits) / ops
+        return (
+            f"{self.name:<30} {self.operations:>7} ops  "
+            f"{self.cpu_sec / ops * 1e6:>9.1f} us CPU/op  "
+            f"{self.wall_sec / ops * 1e6:>9.1f} us wall/op  "
+            f"{round_trips:>5.2f} round trips/op  "
+            f"{ops / self.wall_sec if self.wall_sec else 0:>9.0f} ops/s"
+        )
+
+
+@asynccontextmanager
+async def measure(
+    engine: AsyncEngine, name: str, operations: int
+) -> AsyncGenerator[Measurement, None]:
+    """
+    Measure CPU and wall time, and count the statements/commits sent to the database.
+    """
+    measurement = Measurement(name=name, operations=operations)
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        measurement.statements.append(statement)
+
+    def record_commit(conn):
+        measurement.commits += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record_statement)
+    event.listen(engine.sync_engine, "commit", record_commit)
+    cpu_start, wall_start = process_time(), perf_counter()
+    try:
+        yield measurement
+    finally:
+        measurement.cpu_sec = process_time() - cpu_start
+        measurement.wall_sec = perf_counter() - wall_start
+        event.remove(engine.sync_engine, "before_cursor_execute", record_statement)
+        event.remove(engine.sync_engine, "commit", record_commit)
@@ -0,0 +1,66 @@
+"""
+Compare the previous create classmethods (INSERT, COMMIT and a SELECT to refresh
+the server generated values) with the current ones (INSERT ... RETURNING).
+
+    $ poetry run python -m benchmarks.create
+"""
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+import app.models as models
+from app.schemas import QuestionCreate, QuizCreate
+from benchmarks.common import measure, temporary_database
+
+N_CREATES = 2000
+
+
+async def legacy_create(db: AsyncSession, question: QuestionCreate):
+    new_question = models.Question(
+        quiz_id=question.quiz_id,
+        content=question.content,
+        type=question.type,
+        points=question.points,
+    )
+    new_question.updated_at = func.now()
+    db.add(new_question)
+    await db.commit()
+    await db.refresh(new_question)
+
+    return new_question
+
+
+async def main() -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            db.add(user)
+            await db.commit()
+
+            quiz = await models.Quiz.create(
+                db=db, quiz=QuizCreate(title="Quiz", created_by=user.id)
+            )
+
+        # previous session configuration, expiring everything on commit
+        async with session_factory(expire_on_commit=True) as db:
+            async with measure(engine, "INSERT + SELECT (refresh)", N_CREATES) as m:
+                for i in range(N_CREATES):
+                    await legacy_create(
+                        db, QuestionCreate(content=f"Legacy {i}", quiz_id=quiz.id)
+                    )
+            print(m.report())
+
+        async with session_factory() as db:
+            async with measure(engine, "INSERT ... RETURNING", N_CREATES) as m:
+                for i in range(N_CREATES):
+                    await models.Question.create(
+                        db=db,
+                        question=QuestionCreate(content=f"New {i}", quiz_id=quiz.id),
+                    )
+            print(m.report())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Export catalogs of different sizes as NDJSON, to check that the peak memory used
+by the export does not grow with the number of quizzes.
+
+    $ poetry run python -m benchmarks.export
+"""
+import asyncio
+import tracemalloc
+
+from sqlalchemy import insert
+
+import app.models as models
+from app.core.export import ExportStats, export_quizzes_ndjson
+from benchmarks.common import temporary_database
+
+N_QUIZZES = [1000, 10_000]
+QUESTIONS_PER_QUIZ = 2
+OPTIONS_PER_QUESTION = 3
+
+
+async def run(n_quizzes: int) -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            db.add(user)
+            await db.commit()
+
+            # rows with explicit ids, to insert each table with a single executemany
+            await db.execute(
+                insert(models.Quiz),
+                [
+                    {"id": i, "title": f"Quiz {i}", "created_by": user.id}
+                    for i in range(1, n_quizzes + 1)
+                ],
+            )
+            n_questions = n_quizzes * QUESTIONS_PER_QUIZ
+            await db.execute(
+                insert(models.Question),
+                [
+                    {
+                        "id": i,
+                        "quiz_id": (i - 1) // QUESTIONS_PER_QUIZ + 1,
+                        "content": f"Question {i}",
+                        "type": "multiple_choice",
+                        "points": 1,
+                    }
+                    for i in range(1, n_questions + 1)
+                ],
+            )
+            await db.execute(
+                insert(models.AnswerOption),
+                [
+                    {
+                        "question_id": (i - 1) // OPTIONS_PER_QUESTION + 1,
+                        "content": f"Option {i}",
+                        "is_correct": i % OPTIONS_PER_QUESTION == 0,
+                    }
+                    for i in range(1, n_questions * OPTIONS_PER_QUESTION + 1)
+                ],
+            )
+            await db.commit()
+
+        stats = ExportStats()
+        exported_bytes = 0
+        tracemalloc.start()
+        async for chunk in export_quizzes_ndjson(
+            session_factory=session_factory, stats=stats
+        ):
+            exported_bytes += len(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(
+            f"{n_quizzes:>7} quizzes  {exported_bytes / 2**20:>7.1f} MiB exported  "
+            f"{peak / 2**20:>6.1f} MiB peak  {stats.rows_per_sec:>8.0f} rows/s"
+        )
+
+
+async def main() -> None:
+    for n_quizzes in N_QUIZZES:
+        await run(n_quizzes)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Compare getting a whole quiz through the per-question endpoints (one request for the
+questions, then one request per question for its answer options) with the single
+GET /api/quizzes/{id}/full request, without and with the response cache.
+
+    $ poetry run python -m benchmarks.full_quiz
+"""
+import asyncio
+
+from httpx import AsyncClient
+
+import app.models as models
+from app.core.response_cache import response_cache
+from app.main import app
+from app.models.database import (
+    get_read_session,
+    get_read_session_factory,
+    get_session,
+)
+from app.schemas import AnswerOptionCreate, QuestionCreate, QuizCreate
+from benchmarks.common import measure, temporary_database
+
+N_QUESTIONS = 50
+N_OPTIONS = 4
+N_REPEATS = 20
+
+
+async def main() -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            db.add(user)
+            await db.commit()
+
+            quiz = await models.Quiz.create(
+                db=db, quiz=QuizCreate(title="Quiz", created_by=user.id)
+            )
+            for i in range(N_QUESTIONS):
+                question = await models.Question.create(
+                    db=db, question=QuestionCreate(content=f"Q{i}", quiz_id=quiz.id)
+                )
+                for j in range(N_OPTIONS):
+                    option = AnswerOptionCreate(
+                        content=f"O{j}", question_id=question.id
+                    )
+                    await models.AnswerOption.create(db=db, option=option)
+
+        async def override_get_session():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_session] = override_get_session
+        app.dependency_overrides[get_read_session] = override_get_session
+        app.dependency_overrides[get_read_session_factory] = lambda: session_factory
+
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            async with measure(engine, "per-question fan-out", N_REPEATS) as m:
+                for _ in range(N_REPEATS):
+                    response_cache.clear()
+                    await client.get(f"/api/quizzes/{quiz.id}")
+                    response = await client.get(f"/api/quizzes/{quiz.id}/questions")
+                    for question in response.json():
+                        await client.get(f"/api/questions/{question['id']}/options")
+            print(m.report())
+
+            async with measure(engine, "GET /quizzes/{id}/full", N_REPEATS) as m:
+                for _ in range(N_REPEATS):
+                    response_cache.clear()
+                    await client.get(f"/api/quizzes/{quiz.id}/full")
+            print(m.report())
+
+            async with measure(
+                engine, "GET /quizzes/{id}/full, cached", N_REPEATS
+            ) as m:
+                for _ in range(N_REPEATS):
+                    await client.get(f"/api/quizzes/{quiz.id}/full")
+            print(m.report())
+
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
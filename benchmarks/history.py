@@ -0,0 +1,107 @@
+"""
+Compare reading the attempt history of a heavy user with offset pagination and a
+query per quiz title (with only the user_id index), with keyset pagination over
+the covering (user_id, attempted_at DESC, id DESC) index and a join.
+
+    $ poetry run python -m benchmarks.history
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import desc, insert, select, text
+
+import app.models as models
+from benchmarks.common import measure, temporary_database
+
+N_ATTEMPTS = 20_000
+N_QUIZZES = 100
+PAGE_SIZE = 25
+# pages read, starting from the middle of the history
+N_PAGES = 100
+
+
+async def main() -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            db.add(user)
+            quizzes = [
+                models.Quiz(title=f"Quiz {i}", user=user) for i in range(N_QUIZZES)
+            ]
+            db.add_all(quizzes)
+            await db.flush()
+            start = datetime(2026, 1, 1)
+            await db.execute(
+                insert(models.QuizAttempt),
+                [
+                    {
+                        "quiz_id": random.choice(quizzes).id,
+                        "user_id": user.id,
+                        "score": random.randint(0, 10),
+                        "attempted_at": start + timedelta(minutes=i),
+                    }
+                    for i in range(N_ATTEMPTS)
+                ],
+            )
+            await db.commit()
+            first_page = N_ATTEMPTS // PAGE_SIZE // 2
+
+            # what the table had before the history index
+            await db.execute(
+                text("DROP INDEX ix_quiz_attempts_user_id_attempted_at_id")
+            )
+            await db.execute(
+                text("CREATE INDEX ix_quiz_attempts_user_id ON quiz_attempts (user_id)")
+            )
+            async with measure(engine, "offset + title per attempt", N_PAGES) as m:
+                naive = []
+                for page in range(first_page, first_page + N_PAGES):
+                    rows = await db.execute(
+                        select(models.QuizAttempt)
+                        .where(models.QuizAttempt.user_id == user.id)
+                        .order_by(
+                            desc(models.QuizAttempt.attempted_at),
+                            desc(models.QuizAttempt.id),
+                        )
+                        .offset(page * PAGE_SIZE)
+                        .limit(PAGE_SIZE)
+                    )
+                    for attempt in rows.scalars():
+                        quiz = await db.get(models.Quiz, attempt.quiz_id)
+                        assert quiz
+                        naive.append((attempt.id, quiz.title))
+            print(m.report())
+
+            await db.execute(text("DROP INDEX ix_quiz_attempts_user_id"))
+            await db.execute(
+                text(
+                    "CREATE INDEX ix_quiz_attempts_user_id_attempted_at_id "
+                    "ON quiz_attempts "
+                    "(user_id, attempted_at DESC, id DESC, quiz_id, score)"
+                )
+            )
+            await db.commit()
+            page = await models.QuizAttempt.get_by_user(
+                db=db, user_id=user.id, limit=first_page * PAGE_SIZE
+            )
+            after = (page[-1]["attempted_at"], page[-1]["id"])
+            async with measure(engine, "keyset + covering index + join", N_PAGES) as m:
+                keyset = []
+                for _ in range(N_PAGES):
+                    page = await models.QuizAttempt.get_by_user(
+                        db=db,
+                        user_id=user.id,
+                        limit=PAGE_SIZE,
+                        after=after,
+                        with_quiz_title=True,
+                    )
+                    keyset.extend((a["id"], a["quiz_title"]) for a in page)
+                    after = (page[-1]["attempted_at"], page[-1]["id"])
+            print(m.report())
+            assert keyset == naive
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+Compare loading quizzes with the per-entity create classmethods (one INSERT and one
+COMMIT per row) with the bulk importer (one statement per table for each chunk).
+
+    $ poetry run python -m benchmarks.importer
+"""
+import asyncio
+import io
+
+import app.models as models
+from app.core.importer import import_quizzes
+from app.schemas import AnswerOptionCreate, QuestionCreate, QuizCreate, QuizImport
+from benchmarks.common import measure, temporary_database
+
+N_QUIZZES = 10_000
+N_QUIZZES_CREATE = 100
+QUESTIONS_PER_QUIZ = 10
+OPTIONS_PER_QUESTION = 4
+
+
+def quiz_bundle(n_quizzes: int) -> list[QuizImport]:
+    return [
+        QuizImport.model_validate(
+            {
+                "title": f"Quiz {i}",
+                "questions": [
+                    {
+                        "content": f"Question {j}",
+                        "type": "multiple_choice",
+                        "answer_options": [
+                            {"content": f"Option {k}", "is_correct": k == 0}
+                            for k in range(OPTIONS_PER_QUESTION)
+                        ],
+                    }
+                    for j in range(QUESTIONS_PER_QUIZ)
+                ],
+            }
+        )
+        for i in range(n_quizzes)
+    ]
+
+
+async def main() -> None:
+    rows_per_quiz = 1 + QUESTIONS_PER_QUIZ * (1 + OPTIONS_PER_QUESTION)
+
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            db.add(user)
+            await db.commit()
+
+        rows = N_QUIZZES_CREATE * rows_per_quiz
+        async with session_factory() as db:
+            async with measure(engine, "create classmethods", rows) as m:
+                for quiz in quiz_bundle(N_QUIZZES_CREATE):
+                    new_quiz = await models.Quiz.create(
+                        db=db, quiz=QuizCreate(title=quiz.title, created_by=user.id)
+                    )
+                    for question in quiz.questions:
+                        new_question = await models.Question.create(
+                            db=db,
+                            question=QuestionCreate(
+                                content=question.content,
+                                type=question.type,
+                                quiz_id=new_quiz.id,
+                            ),
+                        )
+                        for option in question.answer_options:
+                            await models.AnswerOption.create(
+                                db=db,
+                                option=AnswerOptionCreate(
+                                    content=option.content,
+                                    is_correct=option.is_correct,
+                                    question_id=new_question.id,
+                                ),
+                            )
+            print(m.report())
+
+        ndjson = "\n".join(
+            quiz.model_dump_json() for quiz in quiz_bundle(N_QUIZZES)
+        ).encode()
+        rows = N_QUIZZES * rows_per_quiz
+        async with session_factory() as db:
+            async with measure(engine, "bulk import (executemany)", rows) as m:
+                await import_quizzes(
+                    db=db, file=io.BytesIO(ndjson), format="ndjson", created_by=user.id
+                )
+            print(m.report())
+
+        questions_per_sec = N_QUIZZES * QUESTIONS_PER_QUIZ / m.wall_sec
+        print(
+            f"1M questions (with {OPTIONS_PER_QUESTION} options each) in "
+            f"~{1_000_000 / questions_per_sec / 60:.1f} min"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+Compare the ways a large list of quizzes can be serialized: returning the entities
+with response_model (validated by FastAPI and encoded with the json module, or with
+orjson with FAST_JSON_RESPONSES), and with a TypeAdapter built once that validates
+and encodes them in a single pass (what the list endpoints do on cache misses).
+
+The quizzes are loaded once, so only the serialization (and the request itself) is
+measured.
+
+    $ poetry run python -m benchmarks.json_responses
+"""
+import asyncio
+from time import perf_counter
+from typing import Any
+
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from httpx import AsyncClient
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+
+import app.models as models
+import app.schemas as schemas
+from app.core.response_cache import to_json
+from benchmarks.common import temporary_database
+
+N_QUIZZES = 1000
+N_REQUESTS = 200
+
+quizzes_adapter = TypeAdapter(list[schemas.QuizReturn])
+
+
+async def main() -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            db.add(user)
+            await db.flush()
+            await db.execute(
+                insert(models.Quiz),
+                [
+                    {
+                        "title": f"Quiz {i}",
+                        "description": "A quiz used to measure the serialization",
+                        "created_by": user.id,
+                    }
+                    for i in range(N_QUIZZES)
+                ],
+            )
+            await db.commit()
+            quizzes = await models.Quiz.get_multiple(db=db, limit=N_QUIZZES)
+
+    async def response_model() -> Any:
+        return quizzes
+
+    apps = {}
+    for name, response_class in [
+        ("response_model + json", JSONResponse),
+        ("response_model + orjson", ORJSONResponse),
+    ]:
+        apps[name] = FastAPI(default_response_class=response_class)
+        apps[name].get("/quizzes", response_model=list[schemas.QuizReturn])(
+            response_model
+        )
+
+    async def type_adapter() -> Any:
+        return Response(
+            to_json(quizzes_adapter, quizzes), media_type="application/json"
+        )
+
+    apps["TypeAdapter"] = FastAPI()
+    apps["TypeAdapter"].get("/quizzes", response_model=list[schemas.QuizReturn])(
+        type_adapter
+    )
+
+    expected = None
+    for name, case_app in apps.items():
+        async with AsyncClient(app=case_app, base_url="http://bench") as client:
+            start = perf_counter()
+            for _ in range(N_REQUESTS):
+                response = await client.get("/quizzes")
+            elapsed = perf_counter() - start
+
+        expected = expected or response.json()
+        assert response.json() == expected
+        print(
+            f"{name:<30} {N_REQUESTS:>7} requests  "
+            f"{elapsed / N_REQUESTS * 1e3:>7.2f} ms/request  "
+            f"{N_REQUESTS / elapsed:>7.0f} requests/s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Compare reading the leaderboard of a popular quiz with ORDER BY score LIMIT k over
+all its attempts (with only the quiz_id index), with the (quiz_id, score DESC, id)
+index, and from the in-memory Leaderboards.
+
+    $ poetry run python -m benchmarks.leaderboard
+"""
+import asyncio
+import random
+
+from sqlalchemy import insert, text
+
+import app.models as models
+from app.core.leaderboard import Leaderboards
+from benchmarks.common import measure, temporary_database
+
+N_ATTEMPTS = 200_000
+N_READS = 500
+LIMIT = 10
+
+
+async def main() -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            quiz = models.Quiz(title="Quiz", user=user)
+            db.add(quiz)
+            await db.flush()
+            await db.execute(
+                insert(models.QuizAttempt),
+                [
+                    {
+                        "quiz_id": quiz.id,
+                        "user_id": user.id,
+                        "score": random.randint(0, 100),
+                    }
+                    for _ in range(N_ATTEMPTS)
+                ],
+            )
+            await db.commit()
+
+            # what the table had before the leaderboard index
+            await db.execute(text("DROP INDEX ix_quiz_attempts_quiz_id_score_id"))
+            await db.execute(
+                text("CREATE INDEX ix_quiz_attempts_quiz_id ON quiz_attempts (quiz_id)")
+            )
+            async with measure(engine, "ORDER BY, quiz_id index", N_READS) as m:
+                for _ in range(N_READS):
+                    naive = await models.QuizAttempt.get_leaderboard(
+                        db=db, quiz_id=quiz.id, limit=LIMIT
+                    )
+            print(m.report())
+
+            await db.execute(text("DROP INDEX ix_quiz_attempts_quiz_id"))
+            await db.execute(
+                text(
+                    "CREATE INDEX ix_quiz_attempts_quiz_id_score_id "
+                    "ON quiz_attempts (quiz_id, score DESC, id)"
+                )
+            )
+            async with measure(engine, "ORDER BY, leaderboard index", N_READS) as m:
+                for _ in range(N_READS):
+                    indexed = await models.QuizAttempt.get_leaderboard(
+                        db=db, quiz_id=quiz.id, limit=LIMIT
+                    )
+            print(m.report())
+            assert indexed == naive
+            await db.commit()
+
+        leaderboards = Leaderboards(
+            session_factory=session_factory, size=100, max_quizzes=10, ttl_sec=60
+        )
+        async with measure(engine, "in memory", N_READS) as m:
+            for _ in range(N_READS):
+                top = await leaderboards.top(quiz.id, limit=LIMIT)
+        print(m.report())
+        assert top is not None
+        assert [
+            (e.attempt_id, e.user_id, e.score, e.attempted_at) for e in top
+        ] == naive
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+Compare computing the percentile of a score with COUNT(*) over the attempts of a
+popular quiz, with loading its persisted histogram, and with the in-memory
+ScoreHistograms.
+
+    $ poetry run python -m benchmarks.percentiles
+"""
+import asyncio
+import random
+
+from sqlalchemy import func, insert, select
+
+import app.models as models
+from app.core.percentiles import ScoreHistograms
+from benchmarks.common import measure, temporary_database
+
+N_ATTEMPTS = 200_000
+N_READS = 500
+MAX_SCORE = 100
+
+
+async def count_percentile(db, quiz_id: int, score: int) -> float:
+    below, total = (
+        await db.execute(
+            select(
+                func.count().filter(models.QuizAttempt.score < score), func.count()
+            ).where(models.QuizAttempt.quiz_id == quiz_id)
+        )
+    ).one()
+    return 100 * below / total
+
+
+async def main() -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            quiz = models.Quiz(title="Quiz", user=user)
+            db.add(quiz)
+            await db.flush()
+            await db.execute(
+                insert(models.QuizAttempt),
+                [
+                    {
+                        "quiz_id": quiz.id,
+                        "user_id": user.id,
+                        "score": random.randint(0, MAX_SCORE),
+                    }
+                    for _ in range(N_ATTEMPTS)
+                ],
+            )
+            await models.ScoreBucket.recompute(db=db, bucket_width=1)
+            scores = [random.randint(0, MAX_SCORE) for _ in range(N_READS)]
+
+            async with measure(engine, "COUNT(*) per score", N_READS) as m:
+                exact = [await count_percentile(db, quiz.id, s) for s in scores]
+            print(m.report())
+
+        histograms = ScoreHistograms(
+            session_factory=session_factory, bucket_width=1, max_quizzes=10, ttl_sec=0
+        )
+        async with measure(engine, "load histogram per score", N_READS) as m:
+            loaded = [await histograms.percentile(quiz.id, s) for s in scores]
+        print(m.report())
+
+        histograms = ScoreHistograms(
+            session_factory=session_factory, bucket_width=1, max_quizzes=10, ttl_sec=60
+        )
+        async with measure(engine, "in memory", N_READS) as m:
+            cached = [await histograms.percentile(quiz.id, s) for s in scores]
+        print(m.report())
+
+        assert loaded == cached
+        assert max(abs(a - b) for a, b in zip(exact, cached)) < 1e-9
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
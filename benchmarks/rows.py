@@ -0,0 +1,78 @@
+"""
+Compare building the responses of large listings from entities (tracked by the
+session, with AsyncAttrs) and from Core rows with only the columns of the response
+(as plain dicts), measuring the CPU time (of the query, including the database
+thread, and the serialization) and the memory used per row.
+
+    $ poetry run python -m benchmarks.rows
+"""
+import asyncio
+import tracemalloc
+from time import process_time
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+
+import app.models as models
+import app.schemas as schemas
+from app.core.response_cache import to_json
+from benchmarks.common import temporary_database
+
+N_QUIZZES = 20_000
+N_REPEATS = 5
+
+quizzes_adapter = TypeAdapter(list[schemas.QuizReturn])
+
+
+async def main() -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            db.add(user)
+            await db.flush()
+            await db.execute(
+                insert(models.Quiz),
+                [
+                    {
+                        "title": f"Quiz {i}",
+                        "description": "A quiz used to measure the listings",
+                        "created_by": user.id,
+                    }
+                    for i in range(N_QUIZZES)
+                ],
+            )
+            await db.commit()
+
+        bodies = []
+        for name, method in [
+            ("entities", models.Quiz.get_multiple),
+            ("Core rows", models.Quiz.get_multiple_rows),
+        ]:
+            cpu_sec = 0.0
+            for _ in range(N_REPEATS):
+                # a new session per request, like the endpoints
+                async with session_factory() as db:
+                    start = process_time()
+                    quizzes = await method(db=db, limit=N_QUIZZES)
+                    body = to_json(quizzes_adapter, quizzes)
+                    cpu_sec += process_time() - start
+
+            async with session_factory() as db:
+                tracemalloc.start()
+                quizzes = await method(db=db, limit=N_QUIZZES)
+                memory, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                del quizzes
+
+            bodies.append(body)
+            print(
+                f"{name:<10} {cpu_sec / N_REPEATS / N_QUIZZES * 1e6:>6.1f} us CPU/row  "
+                f"{memory / N_QUIZZES:>6.0f} bytes/row"
+            )
+
+        assert bodies[0] == bodies[1]
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+"""
+Compare scoring attempts by going through the questions and answer options of the
+quiz (loaded for each attempt) with the compiled AnswerKey, one attempt at a time
+and in batches, and compiling the key for each attempt against using the cached one.
+
+    $ poetry run python -m benchmarks.scoring
+"""
+import asyncio
+import random
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+from app.core.scoring import AnswerKey, get_answer_key
+from app.schemas import UserAnswerCreate
+from benchmarks.common import measure, temporary_database
+
+N_QUESTIONS = 50
+OPTIONS_PER_QUESTION = 4
+N_ATTEMPTS = 20_000
+N_ATTEMPTS_ORM = 200
+
+
+async def orm_score(db: AsyncSession, quiz_id: int, answers: list[UserAnswerCreate]):
+    quiz = await models.Quiz.get_full(db=db, id=quiz_id)
+    assert quiz
+    questions = {question.id: question for question in quiz.questions}
+    score = 0
+    for answer in answers:
+        for option in questions[answer.question_id].answer_options:
+            if option.id == answer.chosen_option_id and option.is_correct:
+                score += questions[answer.question_id].points
+
+    return score
+
+
+async def main() -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            quiz = models.Quiz(title="Quiz", user=user)
+            db.add(quiz)
+            await db.flush()
+            question_ids = (
+                await db.scalars(
+                    insert(models.Question).returning(models.Question.id),
+                    [
+                        {
+                            "quiz_id": quiz.id,
+                            "content": "Question",
+                            "type": "multiple_choice",
+                            "points": random.randint(1, 5),
+                        }
+                        for _ in range(N_QUESTIONS)
+                    ],
+                )
+            ).all()
+            await db.execute(
+                insert(models.AnswerOption),
+                [
+                    {"question_id": id, "content": "Option", "is_correct": i == 0}
+                    for id in question_ids
+                    for i in range(OPTIONS_PER_QUESTION)
+                ],
+            )
+            await db.commit()
+
+            rows = await models.Quiz.get_answer_key(db=db, id=quiz.id)
+            options: dict[int, list[int]] = {}
+            for question_id, _, option_id, _ in rows:
+                options.setdefault(question_id, []).append(option_id)
+            attempts = [
+                [
+                    UserAnswerCreate(
+                        question_id=question_id,
+                        chosen_option_id=random.choice(options[question_id]),
+                    )
+                    for question_id in question_ids
+                ]
+                for _ in range(N_ATTEMPTS)
+            ]
+
+            async with measure(engine, "ORM traversal", N_ATTEMPTS_ORM) as m:
+                orm_scores = [
+                    await orm_score(db, quiz.id, answers)
+                    for answers in attempts[:N_ATTEMPTS_ORM]
+                ]
+            print(m.report())
+
+            async with measure(engine, "key compiled per attempt", N_ATTEMPTS_ORM) as m:
+                compiled_scores = [
+                    AnswerKey.compile(
+                        await models.Quiz.get_answer_key(db=db, id=quiz.id)
+                    ).score(answers)
+                    for answers in attempts[:N_ATTEMPTS_ORM]
+                ]
+            print(m.report())
+            assert compiled_scores == orm_scores
+
+            # what the attempt endpoint does: only the version is read per attempt
+            async with measure(engine, "cached key", N_ATTEMPTS_ORM) as m:
+                cached_scores = []
+                for answers in attempts[:N_ATTEMPTS_ORM]:
+                    version = await models.Quiz.get_answer_key_version(
+                        db=db, id=quiz.id
+                    )
+                    assert version is not None
+                    cached_key = await get_answer_key(
+                        db=db, quiz_id=quiz.id, version=version
+                    )
+                    cached_scores.append(cached_key.score(answers))
+            print(m.report())
+            assert cached_scores == orm_scores
+
+            answer_key = AnswerKey.compile(rows)
+            async with measure(engine, "answer key, one by one", N_ATTEMPTS) as m:
+                scores = [answer_key.score(answers) for answers in attempts]
+            print(m.report())
+            assert scores[:N_ATTEMPTS_ORM] == orm_scores
+
+            async with measure(engine, "answer key, batch", N_ATTEMPTS) as m:
+                batch_scores = answer_key.score_batch(attempts)
+            print(m.report())
+            assert batch_scores.tolist() == scores
+
+            # answers already in arrays (e.g. read from user_answers to regrade)
+            attempt_index = np.repeat(np.arange(N_ATTEMPTS), N_QUESTIONS)
+            question_array = np.array(
+                [a.question_id for answers in attempts for a in answers]
+            )
+            option_array = np.array(
+                [a.chosen_option_id for answers in attempts for a in answers]
+            )
+            async with measure(engine, "answer key, arrays", N_ATTEMPTS) as m:
+                array_scores = answer_key.score_arrays(
+                    attempt_index, question_array, option_array, N_ATTEMPTS
+                )
+            print(m.report())
+            assert array_scores.tolist() == scores
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+"""
+Compare searching quizzes with LIKE '%word%' (which has to scan every quiz and
+question) and with the full-text index (FTS5 in SQLite), for a rare and a common
+word, measuring the wall time per search (first page of 25 results).
+
+Every match is ranked before the page is cut (so the results are the same as
+ranking the whole corpus), so the time of a full-text search grows with the number
+of matches: the common word is in about 1 in 5 quizzes at every size.
+
+    $ poetry run python -m benchmarks.search
+"""
+import asyncio
+import random
+from time import perf_counter
+
+from sqlalchemy import insert, or_, select
+
+import app.models as models
+from benchmarks.common import temporary_database
+
+N_QUIZZES = [50_000, 1_000_000]
+QUESTIONS_PER_QUIZ = 4
+N_REPEATS = 5
+# quizzes inserted per statement (with their questions)
+CHUNK_SIZE = 50_000
+
+WORDS = [f"word{i}" for i in range(2_000)]
+# in about 1 in 1000 quizzes, and 1 in 5
+RARE_WORD = "volcano"
+COMMON_WORD = "planet"
+
+
+def text(rng: random.Random, n_words: int) -> str:
+    words = rng.choices(WORDS, k=n_words)
+    if rng.random() < 1 / 1000:
+        words.append(RARE_WORD)
+    if rng.random() < 1 / 5:
+        words.append(COMMON_WORD)
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+async def like_search(db, word: str) -> list[int]:
+    pattern = f"%{word}%"
+    question_matches = select(models.Question.quiz_id).where(
+        models.Question.content.like(pattern)
+    )
+    result = await db.execute(
+        select(models.Quiz.id)
+        .where(
+            or_(
+                models.Quiz.title.like(pattern),
+                models.Quiz.description.like(pattern),
+                models.Quiz.id.in_(question_matches),
+            )
+        )
+        .order_by(models.Quiz.id)
+        .limit(25)
+    )
+    return list(result.scalars())
+
+
+async def fts_search(db, word: str) -> list[int]:
+    return [quiz["id"] for quiz in await models.Quiz.search(db=db, query=word)]
+
+
+async def run(n_quizzes: int) -> None:
+    rng = random.Random(0)
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            db.add(user)
+            await db.flush()
+            for first_id in range(1, n_quizzes + 1, CHUNK_SIZE):
+                quiz_ids = range(first_id, min(first_id + CHUNK_SIZE, n_quizzes + 1))
+                await db.execute(
+                    insert(models.Quiz),
+                    [
+                        {
+                            "id": quiz_id,
+                            "title": text(rng, 4),
+                            "description": text(rng, 20),
+                            "created_by": user.id,
+                        }
+                        for quiz_id in quiz_ids
+                    ],
+                )
+                await db.execute(
+                    insert(models.Question),
+                    [
+                        {
+                            "quiz_id": quiz_id,
+                            "content": text(rng, 12),
+                            "type": "open",
+                            "points": 1,
+                        }
+                        for quiz_id in quiz_ids
+                        for _ in range(QUESTIONS_PER_QUIZ)
+                    ],
+                )
+            await db.commit()
+
+        for word in [RARE_WORD, COMMON_WORD]:
+            for name, search in [("LIKE", like_search), ("full-text", fts_search)]:
+                async with session_factory() as db:
+                    start = perf_counter()
+                    for _ in range(N_REPEATS):
+                        quiz_ids = await search(db, word)
+                    wall_sec = perf_counter() - start
+
+                ms = wall_sec / N_REPEATS * 1e3
+                print(
+                    f"{n_quizzes:>9} quizzes  {word:<8} {name:<10} "
+                    f"{ms:>9.2f} ms/search ({len(quiz_ids)})"
+                )
+
+
+async def main() -> None:
+    for n_quizzes in N_QUIZZES:
+        await run(n_quizzes)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""
+Compare the previous Base.update implementation (jsonable_encoder + commit + refresh)
+with the current one (UPDATE ... RETURNING of the modified columns only).
+
+    $ poetry run python -m benchmarks.update
+"""
+import asyncio
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+import app.models as models
+from app.schemas import QuizCreate, QuizUpdate
+from benchmarks.common import measure, temporary_database
+
+N_UPDATES = 2000
+
+
+async def legacy_update(db: AsyncSession, current: models.Quiz, new: QuizUpdate):
+    update_data = new.model_dump(exclude_unset=True)
+    current_data = jsonable_encoder(current)
+    for field in current_data:
+        if field in update_data:
+            setattr(current, field, update_data[field])
+
+    current.updated_at = func.now()
+    db.add(current)
+    await db.commit()
+    await db.refresh(current)
+
+    return current
+
+
+async def main() -> None:
+    async with temporary_database() as (engine, session_factory):
+        async with session_factory() as db:
+            user = models.User(username="bench", email="bench@example.com")
+            user.password_hash = "not a real hash"
+            db.add(user)
+            await db.commit()
+            await db.refresh(user)
+
+            quiz = await models.Quiz.create(
+                db=db, quiz=QuizCreate(title="Quiz", created_by=user.id)
+            )
+
+            async with measure(engine, "jsonable_encoder + refresh", N_UPDATES) as m:
+                for i in range(N_UPDATES):
+                    await legacy_update(db, quiz, QuizUpdate(title=f"Legacy {i}"))
+            print(m.report())
+
+            async with measure(engine, "UPDATE ... RETURNING", N_UPDATES) as m:
+                for i in range(N_UPDATES):
+                    await models.Quiz.update(
+                        db=db, current=quiz, new=QuizUpdate(title=f"Returning {i}")
+                    )
+            print(m.report())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())